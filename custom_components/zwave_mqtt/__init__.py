@@ -2,10 +2,13 @@
 import asyncio
 import json
 import logging
+import time
 
 from openzwavemqtt import OZWManager, OZWOptions
 from openzwavemqtt.const import (
+    EVENT_INSTANCE_ADDED,
     EVENT_INSTANCE_EVENT,
+    EVENT_INSTANCE_STATUS_CHANGED,
     EVENT_NODE_ADDED,
     EVENT_NODE_CHANGED,
     EVENT_NODE_REMOVED,
@@ -24,17 +27,38 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import async_get_registry as get_dev_reg
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
 
 from . import const
-from .const import DATA_UNSUBSCRIBE, DOMAIN, PLATFORMS, TOPIC_OPENZWAVE
-from .discovery import DISCOVERY_SCHEMAS, check_node_schema, check_value_schema
+from .commands import CommandTracker
+from .const import DATA_UNSUBSCRIBE, DOMAIN, TOPIC_OPENZWAVE
+from .context import ZWaveContext
+from .discovery_cache import DiscoveryCache
 from .entity import (
+    PlatformDispatcher,
+    StateUpdater,
     ZWaveDeviceEntityValues,
+    ZWaveNodeValues,
     create_device_id,
     create_device_name,
+    create_node_id,
     create_value_id,
 )
+from .ingest import MessageQueue
+from .latency import STAGE_DISCOVERY, STAGE_FAN_OUT, LatencyTracker
+from .rates import MessageRates
+from .recorder import RECEIVED, SENT, TrafficRecorder
+from .scheduler import CommandScheduler
 from .services import ZWaveServices
+from .snapshot import NetworkSnapshot
+from .subscriptions import SubscriptionPlanner
+from .topic import parse_topic
+from .trace import (
+    TRACE_VALUE_ADDED,
+    TRACE_VALUE_CHANGED,
+    TRACE_VALUE_REMOVED,
+    TraceBuffer,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,21 +77,40 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     @callback
     def async_receive_message(msg):
-        manager.receive_message(msg.topic, msg.payload)
-
-    platforms_loaded = []
+        started = time.perf_counter()
+        # the topic is split once, for all stages of the message
+        topic = parse_topic(msg.topic)
+        recorder.async_record(RECEIVED, msg.topic, msg.payload)
+        snapshot.async_process_message(topic, msg.payload)
+        messages.async_put(topic, msg.payload)
+        rates.async_message_received(topic, msg.payload)
+        latency.async_message_received(topic, started)
 
-    async def mark_platform_loaded(platform):
-        platforms_loaded.append(platform)
+    @callback
+    def async_process_message(topic, payload):
+        started = time.perf_counter()
+        manager.receive_message(topic.topic, payload)
+        latency.async_message_processed(topic, started)
+        parts = topic.parts
+        if ingest_timeout is not None and len(parts) == 4 and parts[2] == "status":
+            # the first status of an instance is not reported as a change
+            instance = manager.get_instance(int(parts[1]))
+            if instance is not None:
+                async_check_instance_ready(instance)
 
-        if len(platforms_loaded) != len(PLATFORMS):
-            return
+    @callback
+    def async_reconcile_snapshot(now):
+        for topic in snapshot.async_get_stale_topics():
+            if not subscriptions.is_subscribed(topic):
+                # not received on purpose, like the values of muted nodes
+                continue
+            _LOGGER.debug("Removing %s, it's no longer published", topic)
+            topic = parse_topic(topic)
+            snapshot.async_process_message(topic, "")
+            messages.async_put(topic, "")
 
-        hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(
-            await mqtt.async_subscribe(
-                hass, f"{TOPIC_OPENZWAVE}/#", async_receive_message
-            )
-        )
+    async def mark_platform_loaded(platform):
+        platforms.async_platform_loaded(platform)
 
     hass.data[DOMAIN][entry.entry_id] = {
         "mark_platform_loaded": mark_platform_loaded,
@@ -76,32 +119,138 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     data_nodes = {}
     data_values = {}
+    # Maps the unique id of a value to the values collections tracking it
+    value_routes = {}
     removed_nodes = []
+    # Number of state writes of the entities, and writes skipped as nothing changed
+    state_writes = {"written": 0, "suppressed": 0}
+    # Values collections removed in this iteration of the event loop, per node
+    pending_removals = {}
+    # While the OZW daemon (re)publishes the network the model is updated silently,
+    # entities are updated all at once when the driver reports the nodes as queried.
+    ingest_timeout = None
 
     @callback
-    def send_message(topic, payload):
-        mqtt.async_publish(hass, topic, json.dumps(payload))
+    def async_node_reachable(instance_id, node_id):
+        # sleeping and failed nodes don't respond until they wake up or recover
+        instance = manager.get_instance(instance_id)
+        node = instance and instance.get_node(node_id)
+        return node is None or (node.is_awake is not False and not node.is_failed)
 
-    options = OZWOptions(send_message=send_message, topic_prefix=f"{TOPIC_OPENZWAVE}/")
+    @callback
+    def send_message(topic, payload):
+        payload = json.dumps(payload)
+        recorder.async_record(SENT, topic, payload)
+        mqtt.async_publish(hass, topic, payload)
+
+    recorder = TrafficRecorder(hass)
+    latency = LatencyTracker()
+    updates = StateUpdater(hass)
+    trace = TraceBuffer(hass)
+    rates = MessageRates(hass)
+    commands = CommandTracker(hass)
+    scheduler = CommandScheduler(
+        hass,
+        send_message,
+        on_sent=commands.async_command_sent,
+        is_reachable=async_node_reachable,
+    )
+    hass.data[DOMAIN][entry.entry_id]["scheduler"] = scheduler
+    hass.data[DOMAIN][entry.entry_id]["commands"] = commands
+    options = OZWOptions(
+        send_message=scheduler.async_send, topic_prefix=f"{TOPIC_OPENZWAVE}/"
+    )
     manager = OZWManager(options)
+    platforms = PlatformDispatcher(hass, entry)
+    hass.data[DOMAIN][entry.entry_id]["platforms"] = platforms
+    messages = MessageQueue(hass, async_process_message)
+    subscriptions = SubscriptionPlanner(hass, entry, async_receive_message)
+    hass.data[DOMAIN][entry.entry_id]["subscriptions"] = subscriptions
+    snapshot = NetworkSnapshot(hass, entry.entry_id)
+    snapshot_messages = await snapshot.async_load()
+    discovery = DiscoveryCache(hass, entry.entry_id)
+    await discovery.async_load()
+    context = ZWaveContext(
+        hass=hass,
+        options=options,
+        manager=manager,
+        data_nodes=data_nodes,
+        value_routes=value_routes,
+        platforms=platforms,
+        discovery=discovery,
+        messages=messages,
+        scheduler=scheduler,
+        commands=commands,
+        updates=updates,
+        state_writes=state_writes,
+        latency=latency,
+        recorder=recorder,
+        trace=trace,
+        rates=rates,
+    )
 
-    for component in PLATFORMS:
-        hass.async_create_task(
-            hass.config_entries.async_forward_entry_setup(entry, component)
-        )
+    @callback
+    def async_start_ingest():
+        nonlocal ingest_timeout
+        if ingest_timeout is not None:
+            return
+        _LOGGER.debug("Holding back entity updates until all nodes are queried")
+        ingest_timeout = async_call_later(hass, const.INGEST_TIMEOUT, async_end_ingest)
+
+    @callback
+    def async_end_ingest(now=None):
+        nonlocal ingest_timeout
+        if ingest_timeout is None:
+            return
+        if now is None:
+            # ended before the timeout fired
+            ingest_timeout()
+        ingest_timeout = None
+        _LOGGER.debug("Updating all entities after ingest of OZW messages")
+        async_dispatcher_send(hass, const.SIGNAL_INSTANCE_UPDATED, None)
+
+    @callback
+    def async_cancel_ingest():
+        nonlocal ingest_timeout
+        if ingest_timeout is not None:
+            ingest_timeout()
+            ingest_timeout = None
+
+    @callback
+    def async_check_instance_ready(instance):
+        if ingest_timeout is None:
+            return
+        instance_status = instance.get_status()
+        if instance_status and instance_status.status in const.INSTANCE_READY_STATES:
+            async_end_ingest()
+
+    @callback
+    def async_instance_status_changed(instance_status):
+        _LOGGER.debug("[INSTANCE STATUS CHANGED]: %s", instance_status.status)
+        if ingest_timeout is not None:
+            if instance_status.status in const.INSTANCE_READY_STATES:
+                async_end_ingest()
+            return
+        async_dispatcher_send(hass, const.SIGNAL_INSTANCE_UPDATED, instance_status)
+        if instance_status.status not in const.INSTANCE_READY_STATES:
+            # the daemon is (re)starting and will publish the whole network again
+            async_start_ingest()
 
     @callback
     def async_node_added(node):
         # Caution: This is also called on (re)start.
         _LOGGER.debug("[NODE ADDED] node_id: %s", node.id)
+        async_check_instance_ready(node.parent)
         data_nodes[node.id] = node
         if node.id not in data_values:
-            data_values[node.id] = []
+            data_values[node.id] = ZWaveNodeValues()
+        subscriptions.async_node_added(create_node_id(node))
 
     @callback
     def async_node_changed(node):
         _LOGGER.debug("[NODE CHANGED] node_id: %s", node.id)
         data_nodes[node.id] = node
+        scheduler.async_node_reported(node.parent.id, node.id)
         # notify devices about the node change
         if node.id not in removed_nodes:
             hass.async_create_task(handle_node_update(hass, node))
@@ -110,6 +259,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     def async_node_removed(node):
         _LOGGER.debug("[NODE REMOVED] node_id: %s", node.id)
         data_nodes.pop(node.id)
+        data_values.pop(node.id, None)
+        subscriptions.async_node_removed(create_node_id(node))
         # node added/removed events also happen on (re)starts of hass/mqtt/ozw
         # cleanup device/entity registry if we know this node is permanently deleted
         # entities itself are removed by the values logic
@@ -129,6 +280,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     @callback
     def async_value_added(value):
+        started = time.perf_counter()
+        async_discover_value(value)
+        latency.async_record(STAGE_DISCOVERY, value.command_class, started)
+        trace.async_record(
+            TRACE_VALUE_ADDED, value.node.id, value.value_id_key, started
+        )
+
+    @callback
+    def async_discover_value(value):
         node = value.node
         node_id = value.node.node_id
 
@@ -140,52 +300,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         ]:
             return
 
-        _LOGGER.debug(
-            "[VALUE ADDED] node_id: %s - label: %s - value: %s - value_id: %s - CC: %s",
-            value.node.id,
-            value.label,
-            value.value,
-            value.value_id_key,
-            value.command_class,
-        )
-
-        node_data_values = data_values[node_id]
+        node_values = data_values[node_id]
 
         # Check if this value should be tracked by an existing entity
-        value_unique_id = create_value_id(value)
-        for values in node_data_values:
-            values.check_value(value)
-            if values.values_id == value_unique_id:
-                return  # this value already has an entity
+        node_values.check_value(value)
+        if create_value_id(value) in node_values:
+            return  # this value already has an entity
 
         # Run discovery on it and see if any entities need created
-        for schema in DISCOVERY_SCHEMAS:
-            if not check_node_schema(node, schema):
-                continue
-            if not check_value_schema(
-                value, schema[const.DISC_VALUES][const.DISC_PRIMARY]
-            ):
-                continue
-
-            values = ZWaveDeviceEntityValues(hass, options, schema, value)
+        for schema in discovery.get_matching_schemas(node, value):
+            values = ZWaveDeviceEntityValues(context, schema, value)
             values.setup()
-
-            # We create a new list and update the reference here so that
-            # the list can be safely iterated over in the main thread
-            data_values[node_id] = node_data_values + [values]
+            node_values.add(values)
 
     @callback
     def async_value_changed(value):
+        started = time.perf_counter()
+        async_notify_value_changed(value)
+        latency.async_record(STAGE_FAN_OUT, value.command_class, started)
+        trace.async_record(
+            TRACE_VALUE_CHANGED, value.node.id, value.value_id_key, started
+        )
+
+    @callback
+    def async_notify_value_changed(value):
         # if an entity belonging to this value needs updating,
         # it's handled within the entity logic
-        _LOGGER.debug(
-            "[VALUE CHANGED] node_id: %s - label: %s - value: %s - value_id: %s - CC: %s",
-            value.node.id,
-            value.label,
-            value.value,
-            value.value_id_key,
-            value.command_class,
+        # The node reported the value, so it's done with a command setting it
+        scheduler.async_value_reported(
+            value.ozw_instance.id, value.node.id, value.value_id_key
         )
+        commands.async_value_changed(value)
+
         # Handle a scene activation message
         if value.command_class in [
             CommandClass.SCENE_ACTIVATION,
@@ -194,26 +340,52 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             handle_scene_activated(hass, value)
             return
 
+        if ingest_timeout is not None:
+            return  # entities are updated when the ingest is done
+
+        # Only notify the values collections (and their entities) tracking this value
+        routes = value_routes.get(create_value_id(value), ())
+        for values in routes:
+            async_dispatcher_send(hass, f"{values.values_id}_value_changed", value)
+        if any(values.primary is value for values in routes):
+            latency.async_value_dispatched(value)
+
     @callback
     def async_value_removed(value):
-        _LOGGER.debug(
-            "[VALUE REMOVED] node_id: %s - label: %s - value: %s - value_id: %s - CC: %s",
-            value.node.id,
-            value.label,
-            value.value,
-            value.value_id_key,
-            value.command_class,
+        started = time.perf_counter()
+        async_remove_value(value)
+        trace.async_record(
+            TRACE_VALUE_REMOVED, value.node.id, value.value_id_key, started
         )
-        # signal all entities using this value for removal
-        value_unique_id = create_value_id(value)
-        async_dispatcher_send(hass, const.SIGNAL_DELETE_ENTITY, value_unique_id)
-        # remove value from our local list
-        node_data_values = data_values[value.node.id]
-        node_data_values[:] = [
-            item for item in node_data_values if item.values_id != value_unique_id
-        ]
-
-    # Listen to events for node and value changes
+
+    @callback
+    def async_remove_value(value):
+        # remove value from our local collections
+        values = data_values[value.node.id].remove(create_value_id(value))
+        if values is None:
+            return  # no entity uses this value as primary value
+        values.remove_routes()
+        platforms.async_discard(values)
+
+        # the entity is removed with the others removed in this iteration
+        if not pending_removals:
+            hass.async_create_task(async_remove_entities())
+        pending_removals.setdefault(value.node, []).append(values.values_id)
+
+    async def async_remove_entities():
+        removals = dict(pending_removals)
+        pending_removals.clear()
+        for node, values_ids in removals.items():
+            if node.id not in data_nodes:
+                # the node itself is removed, remove all its entities at once
+                async_dispatcher_send(hass, f"{create_node_id(node)}_delete")
+                continue
+            for values_id in values_ids:
+                async_dispatcher_send(hass, f"{values_id}_delete")
+
+    # Listen to events for instance, node and value changes
+    options.listen(EVENT_INSTANCE_ADDED, async_check_instance_ready)
+    options.listen(EVENT_INSTANCE_STATUS_CHANGED, async_instance_status_changed)
     options.listen(EVENT_NODE_ADDED, async_node_added)
     options.listen(EVENT_VALUE_ADDED, async_value_added)
     options.listen(EVENT_NODE_CHANGED, async_node_changed)
@@ -222,21 +394,53 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     options.listen(EVENT_VALUE_REMOVED, async_value_removed)
     options.listen(EVENT_INSTANCE_EVENT, async_instance_event)
 
+    async_start_ingest()
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(async_cancel_ingest)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(scheduler.async_stop)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(commands.async_stop)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(messages.async_stop)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(recorder.async_stop)
+    rates.async_start()
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(rates.async_stop)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(
+        entry.add_update_listener(async_options_updated)
+    )
+
+    # Restore the network of the last run while the live messages are on their way
+    for topic, payload in snapshot_messages:
+        messages.async_put(parse_topic(topic), payload)
+
+    # The platforms are set up once their first entity is discovered, the model
+    # is built in the meantime and the entities are sent once it is set up
+    await subscriptions.async_subscribe()
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(subscriptions.async_stop)
+    hass.data[DOMAIN][entry.entry_id][DATA_UNSUBSCRIBE].append(
+        async_call_later(hass, const.SNAPSHOT_RECONCILE_DELAY, async_reconcile_snapshot)
+    )
+
     # Register Services
-    services = ZWaveServices(hass, manager, data_nodes)
+    services = ZWaveServices(context)
     services.register()
 
     return True
 
 
+async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the config entry when the options change the subscriptions."""
+    subscriptions = hass.data[DOMAIN][entry.entry_id]["subscriptions"]
+    if subscriptions.options_changed(entry.options):
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
-    # cleanup platforms
+    # cleanup the platforms that are set up
+    platforms = hass.data[DOMAIN][entry.entry_id]["platforms"]
     unload_ok = all(
         await asyncio.gather(
             *[
                 hass.config_entries.async_forward_entry_unload(entry, component)
-                for component in PLATFORMS
+                for component in platforms.platforms
             ]
         )
     )
@@ -22,7 +22,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -256,6 +256,7 @@ NOTIFICATION_SENSORS = [
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave binary_sensor from config entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_binary_sensor(values):
@@ -292,7 +293,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             _LOGGER.warning("Sensor not implemented for value %s", values.primary.label)
             return
 
-        async_add_entities(sensors_to_add)
+        batch_add_entities(sensors_to_add)
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(
@@ -1,4 +1,5 @@
 """Support for Z-Wave climate devices."""
+import asyncio
 from enum import IntEnum
 from typing import Optional, Tuple
 
@@ -32,7 +33,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 VALUE_LIST = "List"
 VALUE_ID = "Value"
@@ -136,6 +137,7 @@ HVAC_MODE_ZW_MAPPINGS = {
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave Climate from Config Entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_climate(values):
@@ -147,7 +149,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             climate = ZWaveClimateMultipleSetpoint(values)
 
         if climate is not None:
-            async_add_entities([climate])
+            batch_add_entities([climate])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_climate", async_add_climate)
@@ -158,6 +160,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 class ZWaveClimateBase(ZWaveDeviceEntity, ClimateDevice):
     """Representation of a Z-Wave Climate device."""
 
+    # A thermostat report often updates mode, state, setpoints and temperature
+    update_window = 0.02
+
     def __init__(self, values):
         """Initialize the Z-Wave climate device."""
         super().__init__(values)
@@ -424,22 +429,24 @@ class ZWaveClimateBase(ZWaveDeviceEntity, ClimateDevice):
             setpoint = current_setpoints[0]
             target_temp = kwargs.get(ATTR_TEMPERATURE)
             if setpoint is not None and target_temp is not None:
-                setpoint.send_value(target_temp)
+                await self.async_send_value(setpoint, target_temp)
         elif len(current_setpoints) == 2:
             (setpoint_low, setpoint_high) = current_setpoints
             target_temp_low = kwargs.get(ATTR_TARGET_TEMP_LOW)
             target_temp_high = kwargs.get(ATTR_TARGET_TEMP_HIGH)
+            sends = []
             if setpoint_low is not None and target_temp_low is not None:
-                setpoint_low.send_value(target_temp_low)
+                sends.append(self.async_send_value(setpoint_low, target_temp_low))
             if setpoint_high is not None and target_temp_high is not None:
-                setpoint_high.send_value(target_temp_high)
+                sends.append(self.async_send_value(setpoint_high, target_temp_high))
+            await asyncio.gather(*sends)
 
     async def async_set_fan_mode(self, fan_mode):
         """Set new target fan mode."""
         if not self.values.fan_mode:
             return
         fan_mode_value = self._fan_label_value_mapping[fan_mode]
-        self.values.fan_mode.send_value(fan_mode_value)
+        await self.async_send_value(self.values.fan_mode, fan_mode_value)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
@@ -447,17 +454,17 @@ class ZWaveClimateBase(ZWaveDeviceEntity, ClimateDevice):
             return
         hvac_mode_value = HVAC_MODE_ZW_MAPPINGS[hvac_mode]
         self._preset_mode = PRESET_NONE
-        self._mode().send_value(hvac_mode_value)
+        await self.async_send_value(self._mode(), hvac_mode_value)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
         if not self._mode():
             return
         if preset_mode == PRESET_NONE:
-            self._mode().send_value(self._zw_hvac_mode)
+            await self.async_send_value(self._mode(), self._zw_hvac_mode)
         else:
             preset_mode_value = self._hvac_label_value_mapping[preset_mode.lower()]
-            self._mode().send_value(preset_mode_value)
+            await self.async_send_value(self._mode(), preset_mode_value)
 
     @property
     def device_state_attributes(self):
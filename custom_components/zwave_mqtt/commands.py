@@ -0,0 +1,200 @@
+"""Tracking of the values sent to Z-Wave nodes until the nodes report them back."""
+import logging
+import time
+
+from homeassistant.core import callback
+
+from . import const
+from .scheduler import get_command_instance_id
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wait for a report of the value that was sent
+SENT_VALUE = object()
+
+
+def get_value_key(value):
+    """Return the key of a value, ValueIDKeys are only unique per OZW instance."""
+    return value.ozw_instance.id, value.value_id_key
+
+
+def value_matches(reported, expected):
+    """Return if a reported value confirms the expected value."""
+    if expected is None:
+        # any report will do
+        return True
+    if isinstance(reported, dict):
+        # list values report the selected item
+        return expected in (reported.get("Selected_id"), reported.get("Selected"))
+    return reported == expected
+
+
+class PendingCommand:
+    """A value sent to a node that is not yet confirmed."""
+
+    def __init__(self, value, new_value, expected, future):
+        """Initialize the pending command."""
+        self.value = value
+        self.new_value = new_value
+        self.expected = expected
+        self.future = future
+        self.attempts = 0
+        self.sent_at = None
+        self.timeout_handle = None
+
+    @callback
+    def resolve(self, confirmed):
+        """Resolve the future of the command."""
+        if self.timeout_handle is not None:
+            self.timeout_handle.cancel()
+        if not self.future.done():
+            self.future.set_result(confirmed)
+
+
+class CommandTracker:
+    """Keep track of the values sent to nodes, keyed by OZW instance and ValueIDKey.
+
+    A command is confirmed when the node reports the sent value. When it doesn't
+    report back in time the value is sent again, up to a limited number of retries.
+    The time starts when the scheduler actually publishes the command, not while
+    it waits in the queue. The round trip times are recorded per node.
+    """
+
+    def __init__(
+        self, hass, timeout=const.COMMAND_TIMEOUT, retries=const.COMMAND_RETRIES
+    ):
+        """Initialize the tracker."""
+        self._hass = hass
+        self.timeout = timeout
+        self.retries = retries
+        self._pending = {}
+        self._round_trips = {}
+        self._num_retries = 0
+        self._num_failures = 0
+
+    async def async_send_value(self, value, new_value, expected=SENT_VALUE):
+        """Send a new value to a node and wait until the node confirms it.
+
+        Expected is the value the node should report, None to accept any report.
+        Returns if the value was confirmed. A node that never reports keeps the
+        caller waiting (retries + 1) * timeout after the command is published, 30
+        seconds by default, on top of the wait in the queue of the scheduler.
+        """
+        if expected is SENT_VALUE:
+            expected = new_value
+
+        # a newer value for the same ValueIDKey supersedes the pending one
+        key = get_value_key(value)
+        previous = self._pending.pop(key, None)
+        if previous is not None:
+            previous.resolve(False)
+
+        pending = PendingCommand(
+            value, new_value, expected, self._hass.loop.create_future()
+        )
+        self._pending[key] = pending
+        self._send(pending)
+        return await pending.future
+
+    @callback
+    def async_value_changed(self, value):
+        """Confirm the pending command of a reported value."""
+        key = get_value_key(value)
+        pending = self._pending.get(key)
+        if pending is None or not value_matches(value.value, pending.expected):
+            return
+
+        del self._pending[key]
+        if pending.sent_at is None:
+            # the node reported the value while the command was still queued
+            pending.resolve(True)
+            return
+        round_trip = time.monotonic() - pending.sent_at
+        stats = self._round_trips.setdefault(
+            (key[0], value.node.id), {"count": 0, "total": 0.0, "max": 0.0}
+        )
+        stats["count"] += 1
+        stats["total"] += round_trip
+        stats["max"] = max(stats["max"], round_trip)
+        stats["last"] = round_trip
+        pending.resolve(True)
+
+    @callback
+    def async_command_sent(self, topic, payload):
+        """Start the timeout of a pending command, when the scheduler publishes it."""
+        if not isinstance(payload, dict) or "ValueIDKey" not in payload:
+            return
+        pending = self._pending.get(
+            (get_command_instance_id(topic), payload["ValueIDKey"])
+        )
+        if (
+            pending is None
+            or pending.timeout_handle is not None
+            # a superseded command that was still queued
+            or payload.get("Value") != pending.new_value
+        ):
+            return
+        pending.sent_at = time.monotonic()
+        pending.timeout_handle = self._hass.loop.call_later(
+            self.timeout, self._timeout, pending
+        )
+
+    @callback
+    def async_stop(self):
+        """Stop waiting for all pending commands."""
+        for pending in self._pending.values():
+            pending.resolve(False)
+        self._pending.clear()
+
+    def get_statistics(self):
+        """Return the statistics of the tracker."""
+        return {
+            "pending": len(self._pending),
+            "retries": self._num_retries,
+            "failures": self._num_failures,
+            "round_trip": {
+                node: {
+                    "count": stats["count"],
+                    "avg": stats["total"] / stats["count"],
+                    "max": stats["max"],
+                    "last": stats["last"],
+                }
+                for node, stats in self._round_trips.items()
+            },
+        }
+
+    @callback
+    def _send(self, pending):
+        """Queue the value of a pending command (again), see async_command_sent."""
+        pending.attempts += 1
+        pending.sent_at = None
+        pending.timeout_handle = None
+        pending.value.send_value(pending.new_value)
+
+    @callback
+    def _timeout(self, pending):
+        """Retry or give up on a command that was not confirmed in time."""
+        key = get_value_key(pending.value)
+        if self._pending.get(key) is not pending:
+            return
+
+        if pending.attempts <= self.retries:
+            _LOGGER.debug(
+                "Node %s did not confirm value %s, sending it again",
+                pending.value.node.id,
+                pending.value.value_id_key,
+            )
+            self._num_retries += 1
+            self._send(pending)
+            return
+
+        _LOGGER.warning(
+            "Node %s did not confirm value %s for %s after %s attempts",
+            pending.value.node.id,
+            pending.new_value,
+            pending.value.label,
+            pending.attempts,
+        )
+        self._num_failures += 1
+        del self._pending[key]
+        pending.resolve(False)
@@ -1,14 +1,29 @@
 """Config flow for zwave_mqtt integration."""
 import logging
 
+import voluptuous as vol
+
 from homeassistant import config_entries
+from homeassistant.components.sensor import DEVICE_CLASSES
+from homeassistant.core import callback
+from homeassistant.helpers.entity_registry import async_get_registry
 
+from . import const
 from .const import DOMAIN  # pylint:disable=unused-import
 
 _LOGGER = logging.getLogger(__name__)
 
 TITLE = "Z-Wave MQTT"
 
+# Throttle target to leave the throttle settings as they are
+THROTTLE_NONE = "none"
+THROTTLE_SETTINGS = (
+    const.CONF_MIN_INTERVAL,
+    const.CONF_DELTA,
+    const.CONF_RELATIVE_DELTA,
+    const.CONF_MAX_AGE,
+)
+
 
 class DomainConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for zwave_mqtt."""
@@ -19,3 +34,97 @@ class DomainConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         return self.async_create_entry(title=TITLE, data={})
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+def parse_instance_ids(value):
+    """Parse a comma separated list of OZW instance ids."""
+    return [int(instance_id) for instance_id in value.split(",") if instance_id.strip()]
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of zwave_mqtt: subscriptions and sensor throttling."""
+
+    def __init__(self, config_entry):
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+        self._options = dict(config_entry.options)
+        self._target = None
+
+    async def async_step_init(self, user_input=None):
+        """Configure the subscriptions and select the sensors to throttle."""
+        errors = {}
+        if user_input is not None:
+            try:
+                self._options[const.CONF_INSTANCE_IDS] = parse_instance_ids(
+                    user_input[const.CONF_INSTANCE_IDS]
+                )
+            except ValueError:
+                errors[const.CONF_INSTANCE_IDS] = "invalid_instance_ids"
+            else:
+                self._options[const.CONF_DROP_TOPICS] = [
+                    family
+                    for family in const.OPTIONAL_TOPIC_FAMILIES
+                    if user_input[f"drop_{family}"]
+                ]
+                self._target = user_input[const.CONF_THROTTLE_TARGET]
+                if self._target == THROTTLE_NONE:
+                    return self.async_create_entry(title="", data=self._options)
+                return await self.async_step_throttle()
+
+        registry = await async_get_registry(self.hass)
+        entity_ids = sorted(
+            entry.entity_id
+            for entry in registry.entities.values()
+            if entry.config_entry_id == self.config_entry.entry_id
+            and entry.domain == "sensor"
+        )
+        targets = [THROTTLE_NONE, const.THROTTLE_DEFAULT, *DEVICE_CLASSES, *entity_ids]
+        instance_ids = self._options.get(const.CONF_INSTANCE_IDS, [])
+        drop_topics = self._options.get(const.CONF_DROP_TOPICS, [])
+        schema = {
+            vol.Optional(
+                const.CONF_INSTANCE_IDS,
+                default=", ".join(str(instance_id) for instance_id in instance_ids),
+            ): str
+        }
+        for family in const.OPTIONAL_TOPIC_FAMILIES:
+            schema[vol.Optional(f"drop_{family}", default=family in drop_topics)] = bool
+        schema[
+            vol.Required(const.CONF_THROTTLE_TARGET, default=THROTTLE_NONE)
+        ] = vol.In(targets)
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(schema), errors=errors
+        )
+
+    async def async_step_throttle(self, user_input=None):
+        """Configure the throttling of the selected sensors."""
+        throttle = dict(self._options.get(const.CONF_THROTTLE, {}))
+
+        if user_input is not None:
+            if any(user_input.values()):
+                throttle[self._target] = user_input
+            else:
+                # nothing to throttle, fall back to the device class or default
+                throttle.pop(self._target, None)
+            self._options[const.CONF_THROTTLE] = throttle
+            return self.async_create_entry(title="", data=self._options)
+
+        settings = throttle.get(self._target, {})
+        return self.async_show_form(
+            step_id="throttle",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(key, default=settings.get(key, 0)): vol.All(
+                        vol.Coerce(float), vol.Range(min=0)
+                    )
+                    for key in THROTTLE_SETTINGS
+                }
+            ),
+            description_placeholders={"target": self._target},
+        )
@@ -1,4 +1,5 @@
 """Constants for the zwave_mqtt integration."""
+from datetime import timedelta
 
 DOMAIN = "zwave_mqtt"
 DATA_UNSUBSCRIBE = "unsubscribe"
@@ -6,6 +7,116 @@ PLATFORMS = ["binary_sensor", "cover", "climate", "fan", "sensor", "switch", "li
 
 # MQTT Topics
 TOPIC_OPENZWAVE = "OpenZWave"
+# Families of topics that can be left out of the subscriptions
+TOPIC_FAMILY_ASSOCIATION = "association"
+TOPIC_FAMILY_STATISTICS = "statistics"
+OPTIONAL_TOPIC_FAMILIES = (TOPIC_FAMILY_ASSOCIATION, TOPIC_FAMILY_STATISTICS)
+# Options of the config entry: the OZW instances to subscribe to (all if empty)
+# and the families of topics not to subscribe to
+CONF_INSTANCE_IDS = "instance_ids"
+CONF_DROP_TOPICS = "drop_topics"
+
+# OZW Instance status
+INSTANCE_READY_STATES = (
+    "driverAllNodesQueriedSomeDead",
+    "driverAllNodesQueried",
+    "driverAwakeNodesQueried",
+)
+
+# Time window (in seconds) in which value changes of an entity are combined into
+# a single state update, 0 means the next iteration of the event loop
+DEFAULT_UPDATE_WINDOW = 0
+
+# Maximum time (in seconds) entity updates are held back while the OZW daemon
+# (re)publishes the network
+INGEST_TIMEOUT = 120
+
+# Time (in seconds) changes of the network are collected before the snapshot of
+# the network is saved
+SNAPSHOT_SAVE_DELAY = 300
+# Time (in seconds) after subscribing before items of the snapshot that are not
+# published (anymore) by the OZW daemon are removed
+SNAPSHOT_RECONCILE_DELAY = 30
+# Time (in seconds) new discovery plans are collected before they are saved
+DISCOVERY_CACHE_SAVE_DELAY = 60
+
+# Command scheduling
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+# Maximum number of commands the Z-Wave network is working on at the same time
+MAX_COMMANDS_IN_FLIGHT = 8
+# Time (in seconds) after which a command without response is considered done
+COMMAND_TIMEOUT = 10
+# Number of times a value is sent again when the node doesn't confirm it
+COMMAND_RETRIES = 2
+# Number of times waiting background commands are passed over before one of them
+# is sent
+COMMAND_STARVATION_LIMIT = 10
+
+# Throttling of sensor state writes, configured per entity id, per device class
+# or as default in the options of the config entry
+CONF_THROTTLE = "throttle"
+CONF_THROTTLE_TARGET = "target"
+# Minimum time (in seconds) between two state writes
+CONF_MIN_INTERVAL = "min_interval"
+# Minimum absolute change of the state to write it
+CONF_DELTA = "delta"
+# Minimum change of the state, in percent of the last written state, to write it
+CONF_RELATIVE_DELTA = "relative_delta"
+# Maximum time (in seconds) a changed state is held back, 0 means no limit
+CONF_MAX_AGE = "max_age"
+THROTTLE_DEFAULT = "default"
+
+# Processing of received messages
+PRIORITY_DEFAULT = "default"
+MESSAGE_PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_DEFAULT, PRIORITY_BACKGROUND)
+# Maximum number of received messages waiting to be processed
+MESSAGE_QUEUE_SIZE = 5000
+# Time (in seconds) spent processing received messages before yielding to the
+# event loop
+MESSAGE_TIME_SLICE = 0.02
+# Number of times waiting messages of a lower priority are passed over before
+# one of them is processed
+MESSAGE_STARVATION_LIMIT = 20
+
+# Recording of the MQTT traffic, to a file in the config directory by default
+RECORDER_FILENAME = "zwave_mqtt_traffic.jsonl.gz"
+# Interval at which the recorded messages are written to the file
+RECORDER_FLUSH_INTERVAL = timedelta(seconds=5)
+
+# Number of records kept in the trace of the values, and the file it's dumped to
+TRACE_SIZE = 10000
+TRACE_FILENAME = "zwave_mqtt_trace.jsonl"
+
+# Message rates per node and per value: the number of nodes and values counted,
+# the interval at which the counts start over and the number of nodes and values
+# reported
+RATES_NODE_CAPACITY = 256
+RATES_VALUE_CAPACITY = 1000
+RATES_WINDOW = timedelta(minutes=15)
+RATES_TOP = 10
+
+# Upper bounds (in seconds) of the buckets of the latency histograms, longer
+# durations are counted in an overflow bucket
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
 
 # Common Attributes
 ATTR_INSTANCE_ID = "instance_id"
@@ -18,6 +129,8 @@ ATTR_SCENE_ID = "scene_id"
 ATTR_SCENE_LABEL = "scene_label"
 ATTR_SCENE_VALUE_ID = "scene_value_id"
 ATTR_SCENE_VALUE_LABEL = "scene_value_label"
+ATTR_FILENAME = "filename"
+ATTR_COUNT = "count"
 
 # Service specific
 SERVICE_ADD_NODE = "add_node"
@@ -26,12 +139,17 @@ SERVICE_REMOVE_FAILED_NODE = "remove_failed_node"
 SERVICE_REPLACE_FAILED_NODE = "replace_failed_node"
 SERVICE_CANCEL_COMMAND = "cancel_command"
 SERVICE_SET_CONFIG_PARAMETER = "set_config_parameter"
+SERVICE_PRINT_STATISTICS = "print_statistics"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_PRINT_MESSAGE_RATES = "print_message_rates"
 
 # Home Assistant Events
 EVENT_SCENE_ACTIVATED = f"{DOMAIN}.scene_activated"
 
 # Signals
-SIGNAL_DELETE_ENTITY = f"{DOMAIN}_delete_entity"
+SIGNAL_INSTANCE_UPDATED = f"{DOMAIN}_instance_updated"
 
 # Discovery Information
 DISC_COMMAND_CLASS = "command_class"
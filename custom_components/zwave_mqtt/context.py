@@ -0,0 +1,41 @@
+"""Objects shared by the parts of the integration handling an OZW instance."""
+from typing import Dict, List, NamedTuple
+
+from openzwavemqtt import OZWManager, OZWOptions
+from openzwavemqtt.models.node import OZWNode
+
+from homeassistant.core import HomeAssistant
+
+from .commands import CommandTracker
+from .discovery_cache import DiscoveryCache
+from .entity import PlatformDispatcher, StateUpdater
+from .ingest import MessageQueue
+from .latency import LatencyTracker
+from .rates import MessageRates
+from .recorder import TrafficRecorder
+from .scheduler import CommandScheduler
+from .trace import TraceBuffer
+
+
+class ZWaveContext(NamedTuple):
+    """The objects of a config entry, shared by its values collections and services."""
+
+    hass: HomeAssistant
+    options: OZWOptions
+    manager: OZWManager
+    # Per node id the node
+    data_nodes: Dict[int, OZWNode]
+    # Per unique id of a value the values collections tracking it
+    value_routes: Dict[str, List]
+    platforms: PlatformDispatcher
+    discovery: DiscoveryCache
+    messages: MessageQueue
+    scheduler: CommandScheduler
+    commands: CommandTracker
+    updates: StateUpdater
+    # Number of state writes of the entities, and writes skipped as nothing changed
+    state_writes: Dict[str, int]
+    latency: LatencyTracker
+    recorder: TrafficRecorder
+    trace: TraceBuffer
+    rates: MessageRates
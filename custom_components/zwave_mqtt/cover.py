@@ -1,4 +1,5 @@
 """Support for Z-Wave cover."""
+import asyncio
 import logging
 
 from openzwavemqtt.const import CommandClass
@@ -18,7 +19,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,12 +28,16 @@ SUPPORTED_FEATURES_TILT = (
     SUPPORT_OPEN_TILT | SUPPORT_CLOSE_TILT | SUPPORT_SET_TILT_POSITION
 )
 
+# Z-Wave levels go up to 99, 99 and up mean fully open
+MAX_POSITION = 99
+
 MANUFACTURER_ID_FIBARO = "0x010f"
 PRODUCT_TYPE_FIBARO_FGRM222 = "0x0302"
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave Cover from Config Entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_cover(values):
@@ -50,7 +55,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         else:
             cover = ZWaveCover(values)
 
-        async_add_entities([cover])
+        batch_add_entities([cover])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_cover", async_add_cover)
@@ -79,18 +84,27 @@ class ZWaveCover(ZWaveDeviceEntity, CoverDevice):
 
     async def async_set_cover_position(self, **kwargs):
         """Move the cover to a specific position."""
-        self.values.primary.send_value(kwargs[ATTR_POSITION])
+        await self.async_send_position(
+            self.values.primary, min(kwargs[ATTR_POSITION], MAX_POSITION)
+        )
 
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
-        self.values.primary.send_value(99)
+        await self.async_send_position(self.values.primary, MAX_POSITION)
 
     async def async_close_cover(self, **kwargs):
         """Close cover."""
-        self.values.primary.send_value(0)
+        await self.async_send_position(self.values.primary, 0)
+
+    async def async_send_position(self, value, position):
+        """Send a position, any report confirms the cover started moving.
+
+        Covers can take longer than the command timeout to reach the position.
+        """
+        return await self.async_send_value(value, position, expected=None)
 
 
-class FibaroFGRM222Cover(ZWaveDeviceEntity, CoverDevice):
+class FibaroFGRM222Cover(ZWaveCover):
     """Representation of a Fibaro FGRM-222 cover."""
 
     @property
@@ -115,26 +129,35 @@ class FibaroFGRM222Cover(ZWaveDeviceEntity, CoverDevice):
 
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
-        self.values.fgrm222_slat_position.send_value(99)
-        self.values.fgrm222_tilt_position.send_value(99)
+        await asyncio.gather(
+            self.async_send_position(self.values.fgrm222_slat_position, MAX_POSITION),
+            self.async_send_position(self.values.fgrm222_tilt_position, MAX_POSITION),
+        )
 
     async def async_close_cover(self, **kwargs):
         """Close cover."""
-        self.values.fgrm222_slat_position.send_value(0)
-        self.values.fgrm222_tilt_position.send_value(0)
+        await asyncio.gather(
+            self.async_send_position(self.values.fgrm222_slat_position, 0),
+            self.async_send_position(self.values.fgrm222_tilt_position, 0),
+        )
 
     async def async_set_cover_position(self, **kwargs):
         """Move the cover to a specific position."""
-        self.values.fgrm222_slat_position.send_value(kwargs[ATTR_POSITION])
+        await self.async_send_position(
+            self.values.fgrm222_slat_position, min(kwargs[ATTR_POSITION], MAX_POSITION)
+        )
 
     async def async_set_cover_tilt_position(self, **kwargs):
         """Move the cover tilt to a specific position."""
-        self.values.fgrm222_tilt_position.send_value(kwargs[ATTR_TILT_POSITION])
+        await self.async_send_position(
+            self.values.fgrm222_tilt_position,
+            min(kwargs[ATTR_TILT_POSITION], MAX_POSITION),
+        )
 
     async def async_open_cover_tilt(self, **kwargs):
         """Open the cover tilt."""
-        self.values.fgrm222_tilt_position.send_value(99)
+        await self.async_send_position(self.values.fgrm222_tilt_position, MAX_POSITION)
 
     async def async_close_cover_tilt(self, **kwargs):
         """Close the cover tilt."""
-        self.values.fgrm222_tilt_position.send_value(0)
+        await self.async_send_position(self.values.fgrm222_tilt_position, 0)
@@ -1,6 +1,9 @@
 """Map Z-Wave nodes and values to Home Assistant entities."""
 
+from itertools import product
 import logging
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, NamedTuple
 
 import openzwavemqtt.const as const_ozw
 from openzwavemqtt.const import CommandClass, ValueGenre, ValueIndex, ValueType
@@ -395,60 +398,196 @@ DISCOVERY_SCHEMAS = [
 ]
 
 
-def check_node_schema(node, schema):
-    """Check if node matches the passed node schema."""
+class CompiledSchema(NamedTuple):
+    """A discovery schema compiled once and shared by all matching entities."""
+
+    component: str
+    node_schema: Mapping
+    values: Mapping
+    optional: FrozenSet[str]
+
+
+def compile_schema(schema):
+    """Compile a discovery schema to an immutable schema."""
+    values = schema[const.DISC_VALUES]
+    return CompiledSchema(
+        schema[const.DISC_COMPONENT],
+        compile_node_schema(schema),
+        MappingProxyType({name: compile_value_schema(values[name]) for name in values}),
+        frozenset(
+            name
+            for name, value_schema in values.items()
+            if value_schema.get(const.DISC_OPTIONAL)
+        ),
+    )
+
+
+def compile_node_schema(schema):
+    """Compile the node part of a discovery schema to frozenset based predicates."""
+    compiled = {}
+    for key in (
+        const.DISC_NODE_ID,
+        const.DISC_GENERIC_DEVICE_CLASS,
+        const.DISC_SPECIFIC_DEVICE_CLASS,
+    ):
+        if key in schema:
+            compiled[key] = frozenset(ensure_list(schema[key]))
+    return MappingProxyType(compiled)
+
+
+def compile_value_schema(schema):
+    """Compile a value schema to frozenset based predicates."""
+    compiled = {}
+    for key in (
+        const.DISC_COMMAND_CLASS,
+        const.DISC_TYPE,
+        const.DISC_GENRE,
+        const.DISC_INDEX,
+        const.DISC_INSTANCE,
+    ):
+        if key in schema:
+            compiled[key] = frozenset(ensure_list(schema[key]))
+    if const.DISC_SCHEMAS in schema:
+        compiled[const.DISC_SCHEMAS] = tuple(
+            compile_value_schema(schema_item)
+            for schema_item in schema[const.DISC_SCHEMAS]
+        )
+    return MappingProxyType(compiled)
+
+
+def build_discovery_index(schemas):
+    """Build an index of compiled schemas keyed by primary command class and index.
+
+    Schemas whose primary value does not limit the index are part of every index
+    bucket of their command class and are also stored under index None.
+    Schemas without a command class for their primary value are returned separately
+    as they need to be checked for every value.
+    """
+    index = {}
+    wildcard = []
+    for schema in schemas:
+        primary = schema.values[const.DISC_PRIMARY]
+        if const.DISC_COMMAND_CLASS not in primary:
+            wildcard.append(schema)
+            continue
+        for command_class in primary[const.DISC_COMMAND_CLASS]:
+            for value_index in primary.get(const.DISC_INDEX, (None,)):
+                index.setdefault((command_class, value_index), [])
+
+    for (command_class, value_index), bucket in index.items():
+        for schema in schemas:
+            primary = schema.values[const.DISC_PRIMARY]
+            if command_class not in primary.get(const.DISC_COMMAND_CLASS, ()):
+                continue
+            if value_index is None and const.DISC_INDEX in primary:
+                continue
+            if value_index not in primary.get(const.DISC_INDEX, (value_index,)):
+                continue
+            if schema not in bucket:
+                bucket.append(schema)
+
+    return {key: tuple(bucket) for key, bucket in index.items()}, tuple(wildcard)
+
+
+def get_matching_schemas(node, value):
+    """Return the compiled schemas for which the value is a primary value."""
+    command_class = value.parent.command_class_id
+    candidates = DISCOVERY_INDEX.get((command_class, value.index))
+    if candidates is None:
+        candidates = DISCOVERY_INDEX.get((command_class, None), ())
+    if DISCOVERY_WILDCARD:
+        candidates = candidates + DISCOVERY_WILDCARD
+
+    return [
+        schema
+        for schema in candidates
+        if match_node_schema(node, schema.node_schema)
+        and match_value_schema(value, schema.values[const.DISC_PRIMARY])
+    ]
+
+
+def match_node_schema(node, schema, node_id=None):
+    """Check if node matches the passed compiled node schema.
+
+    Node id limits the match to a single node on top of the schema.
+    """
+    if node_id is not None and node.node_id != node_id:
+        return False
     if const.DISC_NODE_ID in schema and node.node_id not in schema[const.DISC_NODE_ID]:
         return False
     if (
         const.DISC_GENERIC_DEVICE_CLASS in schema
-        and node.node_generic
-        not in ensure_list(schema[const.DISC_GENERIC_DEVICE_CLASS])
+        and node.node_generic not in schema[const.DISC_GENERIC_DEVICE_CLASS]
     ):
         return False
     if (
         const.DISC_SPECIFIC_DEVICE_CLASS in schema
-        and node.node_specific
-        not in ensure_list(schema[const.DISC_SPECIFIC_DEVICE_CLASS])
+        and node.node_specific not in schema[const.DISC_SPECIFIC_DEVICE_CLASS]
     ):
         return False
     return True
 
 
-def check_value_schema(value, schema):
-    """Check if the value matches the passed value schema."""
+def match_value_schema(value, schema):
+    """Check if the value matches the passed compiled value schema."""
     if (
         const.DISC_COMMAND_CLASS in schema
         and value.parent.command_class_id not in schema[const.DISC_COMMAND_CLASS]
     ):
         return False
-    if const.DISC_TYPE in schema and value.type not in ensure_list(
-        schema[const.DISC_TYPE]
-    ):
+    if const.DISC_TYPE in schema and value.type not in schema[const.DISC_TYPE]:
         return False
-    if const.DISC_GENRE in schema and value.genre not in ensure_list(
-        schema[const.DISC_GENRE]
-    ):
+    if const.DISC_GENRE in schema and value.genre not in schema[const.DISC_GENRE]:
+        return False
+    if const.DISC_INDEX in schema and value.index not in schema[const.DISC_INDEX]:
         return False
-    if const.DISC_INDEX in schema and value.index not in ensure_list(
-        schema[const.DISC_INDEX]
+    if (
+        const.DISC_INSTANCE in schema
+        and value.instance not in schema[const.DISC_INSTANCE]
     ):
         return False
-    if const.DISC_INSTANCE in schema and value.instance not in ensure_list(
-        schema[const.DISC_INSTANCE]
+    if const.DISC_SCHEMAS in schema and not any(
+        match_value_schema(value, schema_item)
+        for schema_item in schema[const.DISC_SCHEMAS]
     ):
         return False
-    if const.DISC_SCHEMAS in schema:
-        found = False
-        for schema_item in schema[const.DISC_SCHEMAS]:
-            found = found or check_value_schema(value, schema_item)
-        if not found:
-            return False
-
     return True
 
 
+def get_value_schema_keys(schema, instance=None):
+    """Return the (command class, index, instance) keys of values matching a schema.
+
+    The schema is a compiled value schema, instance overrides the instances of the
+    schema. None means the schema doesn't limit that part of the key.
+    """
+    if instance is not None:
+        instances = (instance,)
+    else:
+        instances = schema.get(const.DISC_INSTANCE, (None,))
+    return set(
+        product(
+            schema.get(const.DISC_COMMAND_CLASS, (None,)),
+            schema.get(const.DISC_INDEX, (None,)),
+            instances,
+        )
+    )
+
+
+def get_value_keys(value):
+    """Return the keys under which value schemas matching the value are indexed."""
+    return product(
+        (value.parent.command_class_id, None),
+        (value.index, None),
+        (value.instance, None),
+    )
+
+
 def ensure_list(value):
     """Convert a value to a list if needed."""
     if isinstance(value, list):
         return value
     return [value]
+
+
+COMPILED_SCHEMAS = tuple(compile_schema(schema) for schema in DISCOVERY_SCHEMAS)
+DISCOVERY_INDEX, DISCOVERY_WILDCARD = build_discovery_index(COMPILED_SCHEMAS)
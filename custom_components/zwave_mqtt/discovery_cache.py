@@ -0,0 +1,167 @@
+"""Cache of the discovery results per device model."""
+import hashlib
+import logging
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from . import const
+from .discovery import (
+    COMPILED_SCHEMAS,
+    DISCOVERY_SCHEMAS,
+    get_matching_schemas,
+    match_value_schema,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Cached plans are only valid for the schemas they were discovered with
+SCHEMAS_HASH = hashlib.sha1(repr(DISCOVERY_SCHEMAS).encode()).hexdigest()
+SCHEMA_IDS = {
+    id(schema): schema_id for schema_id, schema in enumerate(COMPILED_SCHEMAS)
+}
+
+# Schemas limited to node ids make the discovery results specific to a node
+NODE_ID_SCHEMAS = any(
+    const.DISC_NODE_ID in schema.node_schema for schema in COMPILED_SCHEMAS
+)
+
+
+def get_node_fingerprint(node):
+    """Return the fingerprint of the device model of a node, None while unknown."""
+    if not node.node_manufacturer_id or not node.node_product_id:
+        return None
+    parts = [
+        node.node_manufacturer_id,
+        node.node_product_type,
+        node.node_product_id,
+        node.node_generic,
+        node.node_specific,
+    ]
+    if NODE_ID_SCHEMAS:
+        parts.append(node.node_id)
+    return ":".join(str(part) for part in parts)
+
+
+def get_value_layout_key(value):
+    """Return the key of a value in the layout of its node.
+
+    The key holds everything of the value that discovery matches on.
+    """
+    return "/".join(
+        str(part)
+        for part in (
+            value.parent.command_class_id,
+            value.data.get("Index"),
+            value.instance,
+            value.data.get("Type"),
+            value.data.get("Genre"),
+        )
+    )
+
+
+class DiscoveryCache:
+    """Keep a discovery plan per device model, keyed by node fingerprint.
+
+    The plan of a model maps the values in its layout to the schemas they are the
+    primary value of and to the values of a schema they fill. Identical devices
+    discovered after the first one only need dictionary lookups.
+    The plans are stored so they are available right away after a restart.
+    """
+
+    def __init__(self, hass, entry_id):
+        """Initialize the discovery cache of a config entry."""
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{const.DOMAIN}.{entry_id}.discovery"
+        )
+        self._plans = {}
+        self._save_scheduled = False
+
+    async def async_load(self):
+        """Load the plans from storage, unless the schemas changed since."""
+        data = await self._store.async_load()
+        if data is None:
+            return
+        if data["schemas"] != SCHEMAS_HASH:
+            _LOGGER.debug("Discovery schemas changed, dropping cached plans")
+            return
+        self._plans = data["plans"]
+
+    @callback
+    def get_matching_schemas(self, node, value):
+        """Return the compiled schemas for which the value is a primary value."""
+        plan = self._get_plan(node)
+        if plan is None:
+            return get_matching_schemas(node, value)
+
+        key = get_value_layout_key(value)
+        schema_ids = plan["primary"].get(key)
+        if schema_ids is not None:
+            return [COMPILED_SCHEMAS[schema_id] for schema_id in schema_ids]
+
+        schemas = get_matching_schemas(node, value)
+        plan["primary"][key] = [SCHEMA_IDS[id(schema)] for schema in schemas]
+        self._schedule_save()
+        return schemas
+
+    @callback
+    def get_value_names(self, node, schema, value):
+        """Return the names of the values in a compiled schema matching the value."""
+        plan = self._get_plan(node)
+        if plan is None:
+            return self._match_value_names(schema, value)
+
+        key = f"{SCHEMA_IDS[id(schema)]}:{get_value_layout_key(value)}"
+        names = plan["values"].get(key)
+        if names is not None:
+            return names
+
+        names = self._match_value_names(schema, value)
+        plan["values"][key] = names
+        self._schedule_save()
+        return names
+
+    @callback
+    def _get_plan(self, node):
+        """Return the plan of the device model of a node, None while unknown."""
+        fingerprint = get_node_fingerprint(node)
+        if fingerprint is None:
+            return None
+        plan = self._plans.get(fingerprint)
+        if plan is None:
+            plan = self._plans[fingerprint] = {"primary": {}, "values": {}}
+        return plan
+
+    @staticmethod
+    def _match_value_names(schema, value):
+        """Match the value against the values in a compiled schema."""
+        return [
+            name
+            for name, value_schema in schema.values.items()
+            if match_value_schema(value, value_schema)
+        ]
+
+    @callback
+    def _schedule_save(self):
+        """Save the plans once discovery settles."""
+        if not self._save_scheduled:
+            self._save_scheduled = True
+            self._store.async_delay_save(
+                self._data_to_save, const.DISCOVERY_CACHE_SAVE_DELAY
+            )
+
+    @callback
+    def _data_to_save(self):
+        """Return the data of the cache to store."""
+        self._save_scheduled = False
+        # the store serializes the data in the executor while discovery goes on
+        plans = {
+            fingerprint: {
+                "primary": dict(plan["primary"]),
+                "values": dict(plan["values"]),
+            }
+            for fingerprint, plan in self._plans.items()
+        }
+        return {"schemas": SCHEMAS_HASH, "plans": plans}
@@ -1,9 +1,8 @@
 """Generic Z-Wave Entity Classes."""
 
-import copy
 import logging
+import time
 
-from openzwavemqtt.const import EVENT_INSTANCE_STATUS_CHANGED, EVENT_VALUE_CHANGED
 from openzwavemqtt.models.node import OZWNode
 from openzwavemqtt.models.value import OZWValue
 
@@ -16,7 +15,7 @@ from homeassistant.helpers.entity import Entity
 
 from . import const
 from .const import DOMAIN, PLATFORMS
-from .discovery import check_node_schema, check_value_schema
+from .discovery import get_value_keys, get_value_schema_keys, match_node_schema
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,23 +23,25 @@ _LOGGER = logging.getLogger(__name__)
 class ZWaveDeviceEntityValues:
     """Manages entity access to the underlying Z-Wave value objects."""
 
-    def __init__(self, hass, options, schema, primary_value):
+    def __init__(self, context, schema, primary_value):
         """Initialize the values object with the passed entity schema."""
-        self._hass = hass
+        self._hass = context.hass
+        self._platforms = context.platforms
         self._entity_created = False
-        self._schema = copy.deepcopy(schema)
-        self._values = {}
-        self.options = options
-
-        # Go through values listed in the discovery schema, initialize them,
-        # and add a check to the schema to make sure the Instance matches.
-        for name, disc_settings in self._schema[const.DISC_VALUES].items():
-            self._values[name] = None
-            disc_settings[const.DISC_INSTANCE] = [primary_value.instance]
+        # The compiled schema is shared, values are limited to the node and
+        # instance of the primary value when they are matched.
+        self._schema = schema
+        self._values = dict.fromkeys(schema.values)
+        self._value_routes = context.value_routes
+        self._discovery = context.discovery
+        self.context = context
+        self.options = context.options
 
         self._values[const.DISC_PRIMARY] = primary_value
         self._node = primary_value.node
-        self._schema[const.DISC_NODE_ID] = [self._node.node_id]
+        self._node_id = self._node.node_id
+        self._instance = primary_value.instance
+        self._add_route(primary_value)
 
     def setup(self):
         """Set up values instance."""
@@ -72,20 +73,21 @@ class ZWaveDeviceEntityValues:
         If a match is found, it is added to the values mapping.
         """
         # Make sure the node matches the schema for this entity.
-        if not check_node_schema(value.node, self._schema):
+        if not match_node_schema(value.node, self._schema.node_schema, self._node_id):
+            return
+        # All values of the entity belong to the instance of the primary value.
+        if value.instance != self._instance:
             return
 
-        # Go through the possible values for this entity defined by the schema.
-        for name in self._values:
+        # Go through the values for this entity the value matches in the schema.
+        for name in self._discovery.get_value_names(self._node, self._schema, value):
             # Skip if it's already been added.
             if self._values[name] is not None:
                 continue
-            # Skip if the value doesn't match the schema.
-            if not check_value_schema(value, self._schema[const.DISC_VALUES][name]):
-                continue
 
             # Add value to mapping.
             self._values[name] = value
+            self._add_route(value)
 
             # If the entity has already been created, notify it of the new value.
             if self._entity_created:
@@ -94,6 +96,35 @@ class ZWaveDeviceEntityValues:
             # Check if entity has all required values and create the entity if needed.
             self._check_entity_ready()
 
+    def get_missing_value_keys(self):
+        """Return the keys of the values this collection is still missing."""
+        keys = set()
+        for name, value in self._values.items():
+            if value is None:
+                keys |= get_value_schema_keys(self._schema.values[name], self._instance)
+        return keys
+
+    @callback
+    def remove_routes(self):
+        """Stop routing changes of the tracked values to this collection."""
+        for value in self:
+            if value is None:
+                continue
+            value_id = create_value_id(value)
+            routes = self._value_routes.get(value_id)
+            if routes is None or self not in routes:
+                continue
+            routes.remove(self)
+            if not routes:
+                self._value_routes.pop(value_id)
+
+    @callback
+    def _add_route(self, value):
+        """Route changes of the given value to this collection."""
+        routes = self._value_routes.setdefault(create_value_id(value), [])
+        if self not in routes:
+            routes.append(self)
+
     @callback
     def _check_entity_ready(self):
         """Check if all required values are discovered and create entity."""
@@ -102,14 +133,12 @@ class ZWaveDeviceEntityValues:
             return
 
         # Go through values defined in the schema and abort if a required value is missing.
-        for name, disc_settings in self._schema[const.DISC_VALUES].items():
-            if self._values[name] is None and not disc_settings.get(
-                const.DISC_OPTIONAL
-            ):
+        for name, value in self._values.items():
+            if value is None and name not in self._schema.optional:
                 return
 
         # We have all the required values, so create the entity.
-        component = self._schema[const.DISC_COMPONENT]
+        component = self._schema.component
 
         _LOGGER.debug(
             "Adding Node_id=%s Generic_command_class=%s, "
@@ -128,7 +157,7 @@ class ZWaveDeviceEntityValues:
         self._entity_created = True
 
         if component in PLATFORMS:
-            async_dispatcher_send(self._hass, f"zwave_new_{component}", self)
+            self._platforms.async_send(component, self)
 
     @property
     def values_id(self):
@@ -136,13 +165,140 @@ class ZWaveDeviceEntityValues:
         return create_value_id(self.primary)
 
 
+class ZWaveNodeValues:
+    """The values collections of a node, keyed by values_id.
+
+    Collections are also indexed by the values they are missing, so a new value
+    is only checked by the collections that could use it.
+    """
+
+    def __init__(self):
+        """Initialize the values collections of a node."""
+        self._collections = {}
+        # Maps a value key to the collections missing a value with that key
+        self._missing = {}
+        # Maps a values_id to the keys it is indexed under
+        self._missing_keys = {}
+
+    def __contains__(self, values_id):
+        """Check if there is a values collection with the values_id."""
+        return values_id in self._collections
+
+    def __iter__(self):
+        """Allow iteration over all values collections."""
+        return iter(list(self._collections.values()))
+
+    @callback
+    def add(self, values):
+        """Add a values collection."""
+        self._collections[values.values_id] = values
+        self._index(values)
+
+    @callback
+    def remove(self, values_id):
+        """Remove and return the values collection with the values_id."""
+        self._unindex(values_id)
+        return self._collections.pop(values_id, None)
+
+    @callback
+    def check_value(self, value):
+        """Offer a new value to the collections missing a value like it."""
+        candidates = []
+        for key in get_value_keys(value):
+            for values in self._missing.get(key, ()):
+                if values not in candidates:
+                    candidates.append(values)
+
+        for values in candidates:
+            values.check_value(value)
+            self._index(values)
+
+    @callback
+    def _index(self, values):
+        """(Re)index a collection by the values it is missing."""
+        keys = values.get_missing_value_keys()
+        if keys == self._missing_keys.get(values.values_id):
+            return
+        self._unindex(values.values_id)
+        for key in keys:
+            self._missing.setdefault(key, []).append(values)
+        self._missing_keys[values.values_id] = keys
+
+    @callback
+    def _unindex(self, values_id):
+        """Remove a collection from the index of missing values."""
+        for key in self._missing_keys.pop(values_id, ()):
+            collections = self._missing[key]
+            collections[:] = [
+                values for values in collections if values.values_id != values_id
+            ]
+            if not collections:
+                del self._missing[key]
+
+
+class PlatformDispatcher:
+    """Send the values collections that are ready to their platform.
+
+    A platform is only set up once the first entity for it is discovered, the
+    collections of a platform that isn't set up yet are sent once it is.
+    """
+
+    def __init__(self, hass, entry):
+        """Initialize the dispatcher, no platform is set up yet."""
+        self._hass = hass
+        self._entry = entry
+        # The platforms that are set up, or being set up
+        self.platforms = set()
+        # Per platform that is being set up, the collections waiting for it
+        self._pending = {}
+
+    @callback
+    def async_send(self, component, values):
+        """Send a values collection to the platform creating its entity."""
+        if component not in self.platforms:
+            _LOGGER.debug("Setting up platform %s", component)
+            self.platforms.add(component)
+            self._pending[component] = []
+            self._hass.async_create_task(
+                self._hass.config_entries.async_forward_entry_setup(
+                    self._entry, component
+                )
+            )
+        if component in self._pending:
+            self._pending[component].append(values)
+            return
+        async_dispatcher_send(self._hass, f"zwave_new_{component}", values)
+
+    @callback
+    def async_discard(self, values):
+        """Drop a values collection that is removed before its platform is set up."""
+        for pending in self._pending.values():
+            if values in pending:
+                pending.remove(values)
+
+    @callback
+    def async_platform_loaded(self, component):
+        """Send the collections that waited for a platform that is now set up."""
+        pending = self._pending.pop(component, ())
+        if pending:
+            _LOGGER.debug("Sending %s discovered %s entities", len(pending), component)
+        for values in pending:
+            async_dispatcher_send(self._hass, f"zwave_new_{component}", values)
+
+
 class ZWaveDeviceEntity(Entity):
     """Generic Entity Class for a Z-Wave Device."""
 
+    # Seconds to wait for more changes before updating the state of the entity
+    update_window = const.DEFAULT_UPDATE_WINDOW
+
     def __init__(self, values):
         """Initilize a generic Z-Wave device entity."""
         self.values = values
         self.options = values.options
+        self._scheduled_update = None
+        # What the state was built from when it was last written
+        self._written_fingerprint = None
 
     @callback
     def on_value_update(self):
@@ -154,13 +310,23 @@ class ZWaveDeviceEntity(Entity):
 
     async def async_added_to_hass(self):
         """Call when entity is added."""
-        # add dispatcher and OZW listeners callbacks,
-        self.options.listen(EVENT_VALUE_CHANGED, self._value_changed)
-        self.options.listen(EVENT_INSTANCE_STATUS_CHANGED, self._instance_updated)
+        # add dispatcher callbacks,
         # add to on_remove so they will be cleaned up on entity removal
         self.async_on_remove(
             async_dispatcher_connect(
-                self.hass, const.SIGNAL_DELETE_ENTITY, self._delete_callback
+                self.hass, const.SIGNAL_INSTANCE_UPDATED, self._instance_updated
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, f"{self.values.values_id}_delete", self._delete_callback
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{create_node_id(self.values.primary.node)}_delete",
+                self._delete_callback,
             )
         )
         self.async_on_remove(
@@ -168,6 +334,11 @@ class ZWaveDeviceEntity(Entity):
                 self.hass, f"{self.values.values_id}_value_added", self._value_added
             )
         )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, f"{self.values.values_id}_value_changed", self._value_changed
+            )
+        )
 
     @property
     def device_info(self):
@@ -209,22 +380,28 @@ class ZWaveDeviceEntity(Entity):
         """Return entity availability."""
         # Use OZW Daemon status for availability.
         instance_status = self.values.primary.ozw_instance.get_status()
-        return instance_status and instance_status.status in [
-            "driverAllNodesQueriedSomeDead",
-            "driverAllNodesQueried",
-            "driverAwakeNodesQueried",
-        ]
+        return instance_status and instance_status.status in const.INSTANCE_READY_STATES
+
+    @property
+    def should_poll(self):
+        """No polling needed, the OZW daemon pushes all changes."""
+        return False
+
+    async def async_send_value(self, value, new_value, **kwargs):
+        """Send a new value to the node and wait until the node confirms it."""
+        return await self.values.context.commands.async_send_value(
+            value, new_value, **kwargs
+        )
 
     @callback
     def _value_changed(self, value):
         """
         Call when a value from ZWaveDeviceEntityValues is changed.
 
+        Only called for values tracked by this entity's values collection.
         Should not be overriden by subclasses.
         """
-        if value.value_id_key in (v.value_id_key for v in self.values if v):
-            self.on_value_update()
-            self.async_write_ha_state()
+        self._schedule_update()
 
     @callback
     def _value_added(self):
@@ -238,27 +415,132 @@ class ZWaveDeviceEntity(Entity):
     @callback
     def _instance_updated(self, new_status):
         """
-        Call when the instance status changes.
+        Call when the instance status changes or the ingest of OZW messages is done.
 
         Should not be overriden by subclasses.
         """
+        self._schedule_update()
+
+    @callback
+    def _schedule_update(self):
+        """Schedule a single update for all changes within the update window."""
+        if not self.update_window:
+            self.values.context.updates.async_schedule(self)
+        elif self._scheduled_update is None:
+            self._scheduled_update = self.hass.loop.call_later(
+                self.update_window, self.async_update_state
+            )
+
+    @callback
+    def async_update_state(self):
+        """Update the entity after (a burst of) changes."""
+        self._scheduled_update = None
         self.on_value_update()
+        self.async_write_state()
+
+    @callback
+    def async_write_state(self):
+        """
+        Write the state of the entity after (a burst of) changes.
+
+        The write is skipped when the properties async_write_ha_state builds the
+        state from didn't change since the last write, unless the entity forces
+        updates. To be overriden by platforms that hold back state writes.
+        """
+        context = self.values.context
+        started = time.perf_counter()
+        fingerprint = (
+            self.available,
+            self.state,
+            self.capability_attributes,
+            self.state_attributes,
+            self.device_state_attributes,
+            self.unit_of_measurement,
+            self.name,
+            self.icon,
+            self.entity_picture,
+            self.hidden,
+            self.assumed_state,
+            self.supported_features,
+            self.device_class,
+        )
+        if fingerprint == self._written_fingerprint and not self.force_update:
+            context.state_writes["suppressed"] += 1
+            context.latency.async_state_skipped(self.values.primary)
+            return
+        self._written_fingerprint = fingerprint
         self.async_write_ha_state()
+        context.state_writes["written"] += 1
+        context.latency.async_state_written(self.values.primary, started)
 
-    async def _delete_callback(self, values_id):
+    async def _delete_callback(self):
         """Remove this entity."""
-        if not self.values:
-            return  # race condition: delete already requested
-        if values_id == self.values.values_id:
-            await self.async_remove()
+        await self.async_remove()
 
     async def async_will_remove_from_hass(self) -> None:
         """Call when entity will be removed from hass."""
-        # cleanup OZW listeners
-        self.options.listeners[EVENT_VALUE_CHANGED].remove(self._value_changed)
-        self.options.listeners[EVENT_INSTANCE_STATUS_CHANGED].remove(
-            self._instance_updated
-        )
+        if self._scheduled_update is not None:
+            self._scheduled_update.cancel()
+            self._scheduled_update = None
+        self.values.context.updates.async_discard(self)
+
+
+class StateUpdater:
+    """Update the entities with changed values once per event loop iteration.
+
+    A burst of changes, like the values of a meter report, results in a single
+    update per entity. The updates of all entities share one task.
+    """
+
+    def __init__(self, hass):
+        """Initialize without pending updates."""
+        self._hass = hass
+        # Entities can't be hashed, they are keyed by id
+        self._pending = {}
+
+    @callback
+    def async_schedule(self, entity):
+        """Update an entity in the next iteration of the event loop."""
+        if not self._pending:
+            self._hass.async_create_task(self._async_flush())
+        self._pending[id(entity)] = entity
+
+    @callback
+    def async_discard(self, entity):
+        """Drop the pending update of an entity that is removed."""
+        self._pending.pop(id(entity), None)
+
+    async def _async_flush(self):
+        """Update the entities with pending updates."""
+        pending = self._pending
+        self._pending = {}
+        for entity in pending.values():
+            entity.async_update_state()
+
+
+@callback
+def async_batch_add_entities(hass, async_add_entities):
+    """Return a function that adds entities in one batch per event loop iteration.
+
+    Discovery creates entities one by one, adding them to the platform together
+    saves many separate add cycles on startup.
+    """
+    pending = []
+
+    async def async_flush():
+        entities = pending[:]
+        pending.clear()
+        async_add_entities(entities)
+
+    @callback
+    def async_add(entities):
+        if not entities:
+            return
+        if not pending:
+            hass.async_create_task(async_flush())
+        pending.extend(entities)
+
+    return async_add
 
 
 def create_device_name(node: OZWNode):
@@ -281,6 +563,12 @@ def create_device_id(node: OZWNode, node_instance: int = 1):
     return dev_id
 
 
+def create_node_id(node: OZWNode):
+    """Generate unique node_id from an OZWNode."""
+    # [OZW_INSTANCE_ID]-[NODE_ID]
+    return f"{node.parent.id}-{node.id}"
+
+
 def create_value_id(value: OZWValue):
     """Generate unique value_id from an OZWValue."""
     # [OZW_INSTANCE_ID]-[NODE_ID]-[VALUE_ID_KEY]
@@ -13,7 +13,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 SPEED_LIST = [SPEED_OFF, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH]
 
@@ -27,12 +27,13 @@ SPEED_TO_VALUE = {SPEED_OFF: 0, SPEED_LOW: 1, SPEED_MEDIUM: 50, SPEED_HIGH: 99}
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave Fan from Config Entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_fan(values):
         """Add Z-Wave Fan."""
         fan = ZwaveFan(values)
-        async_add_entities([fan])
+        batch_add_entities([fan])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_fan", async_add_fan)
@@ -46,19 +47,19 @@ class ZwaveFan(ZWaveDeviceEntity, FanEntity):
 
     async def async_set_speed(self, speed):
         """Set the speed of the fan."""
-        self.values.primary.send_value(SPEED_TO_VALUE[speed])
+        await self.async_send_value(self.values.primary, SPEED_TO_VALUE[speed])
 
     async def async_turn_on(self, speed=None, **kwargs):
         """Turn the device on."""
         if speed is None:
             # Value 255 tells device to return to previous value
-            self.values.primary.send_value(255)
+            await self.async_send_value(self.values.primary, 255, expected=None)
         else:
             await self.async_set_speed(speed)
 
     async def async_turn_off(self, **kwargs):
         """Turn the device off."""
-        self.values.primary.send_value(0)
+        await self.async_send_value(self.values.primary, 0)
 
     @property
     def is_on(self):
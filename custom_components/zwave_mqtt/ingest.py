@@ -0,0 +1,231 @@
+"""Queue between the MQTT subscription and the OZW manager."""
+import asyncio
+from collections import OrderedDict
+from itertools import count
+import logging
+import time
+
+from openzwavemqtt.const import CommandClass
+
+from homeassistant.core import callback
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Messages that are no state, every one of them needs to be processed
+UNMERGEABLE_TOPIC_PARTS = {"command", "event"}
+UNMERGEABLE_COMMAND_CLASSES = {
+    CommandClass.SCENE_ACTIVATION,
+    CommandClass.CENTRAL_SCENE,
+}
+
+# Messages a user is waiting for, processed before all others
+INTERACTIVE_TOPIC_PARTS = {"command", "event"}
+INTERACTIVE_COMMAND_CLASSES = {
+    CommandClass.SCENE_ACTIVATION,
+    CommandClass.CENTRAL_SCENE,
+    CommandClass.SWITCH_ALL,
+    CommandClass.SWITCH_BINARY,
+    CommandClass.SWITCH_COLOR,
+    CommandClass.SWITCH_MULTILEVEL,
+    CommandClass.SWITCH_TOGGLE_BINARY,
+    CommandClass.SWITCH_TOGGLE_MULTILEVEL,
+}
+# Periodic telemetry, processed after all others
+BACKGROUND_TOPIC_PARTS = {"statistics"}
+BACKGROUND_COMMAND_CLASSES = {
+    CommandClass.METER,
+    CommandClass.METER_PULSE,
+    CommandClass.METER_TBL_MONITOR,
+    CommandClass.SENSOR_MULTILEVEL,
+}
+
+
+def is_mergeable(topic):
+    """Return if a newer message on the (parsed) topic supersedes an older message."""
+    if not UNMERGEABLE_TOPIC_PARTS.isdisjoint(topic.parts):
+        return False
+    return topic.command_class not in UNMERGEABLE_COMMAND_CLASSES
+
+
+def get_message_priority(topic):
+    """Return the priority of a message received on the (parsed) topic."""
+    if not INTERACTIVE_TOPIC_PARTS.isdisjoint(topic.parts):
+        return const.PRIORITY_INTERACTIVE
+    if not BACKGROUND_TOPIC_PARTS.isdisjoint(topic.parts):
+        return const.PRIORITY_BACKGROUND
+    command_class = topic.command_class
+    if command_class in INTERACTIVE_COMMAND_CLASSES:
+        return const.PRIORITY_INTERACTIVE
+    if command_class in BACKGROUND_COMMAND_CLASSES:
+        return const.PRIORITY_BACKGROUND
+    return const.PRIORITY_DEFAULT
+
+
+class MessageQueue:
+    """Bounded queue of the messages received from the OZW daemon.
+
+    Messages are queued per priority and the queue is drained in time slices,
+    yielding to the event loop in between. A lower priority that is passed over
+    too many times gets its turn, so it is never starved.
+    A message on a topic with a queued message replaces that message (latest wins),
+    unless the messages are events. When the queue is full a time slice of it is
+    processed right away.
+    The removal of an item is a barrier: queued messages of the item and its
+    children are dropped, and messages of them that are received later are queued
+    behind the removal.
+    """
+
+    def __init__(
+        self,
+        hass,
+        process,
+        max_size=const.MESSAGE_QUEUE_SIZE,
+        time_slice=const.MESSAGE_TIME_SLICE,
+        starvation_limit=const.MESSAGE_STARVATION_LIMIT,
+    ):
+        """Initialize the queue with the function that processes a message."""
+        self._hass = hass
+        self._process = process
+        self.max_size = max_size
+        self.time_slice = time_slice
+        self.starvation_limit = starvation_limit
+        # Per priority the messages keyed by topic, or a unique key for messages
+        # that can't be merged
+        self._queues = {
+            priority: OrderedDict() for priority in const.MESSAGE_PRIORITIES
+        }
+        self._passed_over = {priority: 0 for priority in const.MESSAGE_PRIORITIES}
+        self._size = 0
+        self._sequence = count()
+        # Per removed item the sequence number and priority of its latest removal
+        self._removals = {}
+        self._drain_task = None
+        self._high_water_mark = 0
+        self._num_merged = 0
+        self._processed = {priority: 0 for priority in const.MESSAGE_PRIORITIES}
+
+    @callback
+    def async_put(self, topic, payload):
+        """Queue a message received from the OZW daemon, on a parsed topic."""
+        sequence = next(self._sequence)
+        priority = get_message_priority(topic)
+        if self._removals:
+            barrier = self._get_barrier(topic.topic, -1)
+            if barrier is not None:
+                # stay behind the removal of the item or its parent
+                priority = barrier[1]
+        queue = self._queues[priority]
+
+        mergeable = is_mergeable(topic)
+        if mergeable and queue.pop(topic.topic, None) is not None:
+            # keep the order in which the latest messages were received
+            self._size -= 1
+            self._num_merged += 1
+        if mergeable and payload == "":
+            # queued messages of the item and its children are moot, the removal
+            # itself is not merged with the messages that follow it
+            self._removals[topic.topic] = (sequence, priority)
+            mergeable = False
+        key = topic.topic if mergeable else (topic.topic, sequence)
+        queue[key] = (topic, payload, sequence)
+        self._size += 1
+        self._high_water_mark = max(self._high_water_mark, self._size)
+
+        if self._size >= self.max_size:
+            _LOGGER.debug("Message queue is full, processing a time slice of it")
+            self._process_queue(time.monotonic() + self.time_slice)
+        if self._size and self._drain_task is None:
+            self._drain_task = self._hass.async_create_task(self._async_drain())
+
+    @callback
+    def async_stop(self):
+        """Drop the queued messages."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        for queue in self._queues.values():
+            queue.clear()
+        self._removals.clear()
+        self._size = 0
+
+    def get_statistics(self):
+        """Return the statistics of the queue."""
+        stats = {
+            "queued": self._size,
+            "max_size": self.max_size,
+            "high_water_mark": self._high_water_mark,
+            "merged": self._num_merged,
+        }
+        for priority in const.MESSAGE_PRIORITIES:
+            stats[priority] = {
+                "queued": len(self._queues[priority]),
+                "processed": self._processed[priority],
+            }
+        return stats
+
+    async def _async_drain(self):
+        """Process the queued messages a time slice at a time."""
+        while self._size:
+            self._process_queue(time.monotonic() + self.time_slice)
+            if self._size:
+                await asyncio.sleep(0)
+        self._drain_task = None
+
+    @callback
+    def _process_queue(self, deadline):
+        """Process queued messages until the deadline, None to process all."""
+        while self._size:
+            priority = self._next_priority()
+            _, (topic, payload, sequence) = self._queues[priority].popitem(last=False)
+            self._size -= 1
+            moot = (
+                self._removals and self._get_barrier(topic.topic, sequence) is not None
+            )
+            if not self._size:
+                self._removals.clear()
+            if moot:
+                # the item or its parent was removed after this message
+                self._num_merged += 1
+                continue
+            self._processed[priority] += 1
+            self._process(topic, payload)
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+    @callback
+    def _next_priority(self):
+        """Return the priority of the next message to process."""
+        waiting = [
+            priority for priority in const.MESSAGE_PRIORITIES if self._queues[priority]
+        ]
+        next_priority = waiting[0]
+        for priority in waiting[1:]:
+            if self._passed_over[priority] >= self.starvation_limit:
+                next_priority = priority
+                break
+
+        for priority in waiting:
+            if priority == next_priority:
+                self._passed_over[priority] = 0
+            else:
+                self._passed_over[priority] += 1
+        return next_priority
+
+    @callback
+    def _get_barrier(self, topic, sequence):
+        """Return the latest removal of the item or a parent, after a sequence number.
+
+        Returns the sequence number and priority of the removal, None if there is
+        none.
+        """
+        barrier = None
+        index = topic.find("/")
+        while index != -1:
+            removal = self._removals.get(topic[: index + 1])
+            if removal is not None and removal[0] > sequence:
+                if barrier is None or removal[0] > barrier[0]:
+                    barrier = removal
+            index = topic.find("/", index + 1)
+        return barrier
@@ -0,0 +1,155 @@
+"""Latency histograms of the stages from an MQTT message to a state write."""
+from bisect import bisect_left
+import time
+
+from openzwavemqtt.const import CommandClass
+
+from homeassistant.core import callback
+
+from . import const
+
+# Stages of the processing of a message. Processing by the OZW manager includes the
+# listeners (fan out to the entities, discovery of new values).
+STAGE_RECEIVE = "receive"
+STAGE_PROCESS = "process"
+STAGE_FAN_OUT = "fan_out"
+STAGE_DISCOVERY = "discovery"
+STAGE_STATE_WRITE = "state_write"
+# From receiving a value report to the state write of the entity of that value
+STAGE_END_TO_END = "end_to_end"
+
+PERCENTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+def get_command_class_name(command_class):
+    """Return the name of a command class, for the statistics."""
+    try:
+        return CommandClass(command_class).name
+    except ValueError:
+        return str(command_class)
+
+
+class Histogram:
+    """Counts of durations in the fixed buckets of LATENCY_BUCKETS."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(const.LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        """Count a duration, in seconds."""
+        self.counts[bisect_left(const.LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def percentile(self, share):
+        """Return the upper bound of the bucket of the duration at a share."""
+        rank = share * self.count
+        seen = 0
+        for bound, count in zip(const.LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def get_statistics(self):
+        """Return the count, average, maximum and percentiles in seconds."""
+        stats = {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for name, share in PERCENTILES.items():
+            stats[name] = self.percentile(share)
+        return stats
+
+
+class LatencyTracker:
+    """Keep latency histograms per stage, in total and per command class.
+
+    A stage is timed by its caller, with time.perf_counter(). The time a value
+    report is received is kept while it's processed, and only when it's handed to
+    an entity with that primary value until the entity writes its state.
+    """
+
+    def __init__(self):
+        """Initialize the tracker."""
+        # Per stage the histograms by command class, None for all messages
+        self._stages = {}
+        # Time value reports were received, per instance id and ValueIDKey
+        self._received = {}
+        # Time reports of primary values handed to their entities were received
+        self._dispatched = {}
+
+    @callback
+    def async_record(self, stage, command_class, started):
+        """Record the duration of a stage, for a command class or None."""
+        duration = time.perf_counter() - started
+        histograms = self._stages.get(stage)
+        if histograms is None:
+            histograms = self._stages[stage] = {None: Histogram()}
+        histograms[None].add(duration)
+        if command_class is not None:
+            histogram = histograms.get(command_class)
+            if histogram is None:
+                histogram = histograms[command_class] = Histogram()
+            histogram.add(duration)
+
+    @callback
+    def async_message_received(self, topic, started):
+        """Record the receive stage of a message, on a parsed topic."""
+        if topic.value_id_key is not None:
+            self._received[(int(topic.parts[1]), topic.value_id_key)] = started
+        self.async_record(STAGE_RECEIVE, topic.command_class, started)
+
+    @callback
+    def async_message_processed(self, topic, started):
+        """Record the processing of a message by the OZW manager."""
+        if topic.value_id_key is not None:
+            # the report didn't reach an entity that writes its state
+            self._received.pop((int(topic.parts[1]), topic.value_id_key), None)
+        self.async_record(STAGE_PROCESS, topic.command_class, started)
+
+    @callback
+    def async_value_dispatched(self, value):
+        """Keep the time of a report of a primary value handed to its entities."""
+        key = (value.ozw_instance.id, value.value_id_key)
+        received = self._received.pop(key, None)
+        if received is not None:
+            self._dispatched[key] = received
+
+    @callback
+    def async_state_written(self, value, started):
+        """Record a state write of the entity of a (primary) value."""
+        self.async_record(STAGE_STATE_WRITE, value.command_class, started)
+        received = self._dispatched.pop(
+            (value.ozw_instance.id, value.value_id_key), None
+        )
+        if received is not None:
+            self.async_record(STAGE_END_TO_END, value.command_class, received)
+
+    @callback
+    def async_state_skipped(self, value):
+        """Forget the report of a value that didn't change the state of its entity."""
+        self._dispatched.pop((value.ozw_instance.id, value.value_id_key), None)
+
+    def get_statistics(self):
+        """Return the statistics per stage, in total and per command class."""
+        stats = {}
+        for stage, histograms in self._stages.items():
+            stats[stage] = {
+                "total": histograms[None].get_statistics(),
+                "command_classes": {
+                    get_command_class_name(command_class): histogram.get_statistics()
+                    for command_class, histogram in histograms.items()
+                    if command_class is not None
+                },
+            }
+        return stats
@@ -12,19 +12,20 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave Light from Config Entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_light(values):
         """Add Z-Wave Light."""
         light = ZwaveDimmer(values)
-        async_add_entities([light])
+        batch_add_entities([light])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_light", async_add_light)
@@ -127,13 +128,15 @@ class ZwaveDimmer(ZWaveDeviceEntity, Light):
         if ATTR_BRIGHTNESS in kwargs:
             brightness = kwargs[ATTR_BRIGHTNESS]
             brightness = byte_to_zwave_brightness(brightness)
+            expected = brightness
         else:
             brightness = 255
+            expected = None
 
-        self.values.primary.send_value(brightness)
+        await self.async_send_value(self.values.primary, brightness, expected=expected)
 
     async def async_turn_off(self, **kwargs):
         """Turn the device off."""
         await self.async_set_duration(**kwargs)
 
-        self.values.primary.send_value(0)
+        await self.async_send_value(self.values.primary, 0)
@@ -0,0 +1,186 @@
+"""Message rates per node and per value, to find chatty devices."""
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from . import const
+from .latency import get_command_class_name
+from .scheduler import get_command_class_from_value_id_key
+
+
+def get_rate_statistics(messages, num_bytes, error, seconds):
+    """Return the counts and rates per minute of a node or value."""
+    return {
+        "messages": messages,
+        "bytes": num_bytes,
+        "error": error,
+        "messages_per_minute": round(messages / seconds * 60, 2),
+        "bytes_per_minute": round(num_bytes / seconds * 60),
+    }
+
+
+class HeavyHitters:
+    """Approximate counts of the keys seen most, in bounded memory (Space-Saving).
+
+    Up to capacity keys are counted. A new key replaces a key with the lowest
+    count and takes over its count and bytes, the count it took over is the
+    maximum overestimate (error) of its count. Keys are kept in buckets per count,
+    so a key with the lowest count is found in constant time.
+    """
+
+    def __init__(self, capacity):
+        """Initialize without counters."""
+        self.capacity = capacity
+        # Per key the count, bytes and error
+        self._counters = {}
+        # Per count the keys with that count
+        self._buckets = {}
+        self._min_count = 0
+
+    def add(self, key, size):
+        """Count a message of a size for a key."""
+        counter = self._counters.get(key)
+        if counter is None:
+            if len(self._counters) < self.capacity:
+                counter = self._counters[key] = [0, 0, 0]
+                self._min_count = 0
+            else:
+                evicted = self._buckets[self._min_count].pop()
+                counter = self._counters.pop(evicted)
+                counter[2] = counter[0]
+                self._counters[key] = counter
+                self._remove_from_bucket(key, counter[0])
+        else:
+            self._remove_from_bucket(key, counter[0])
+
+        counter[0] += 1
+        counter[1] += size
+        self._buckets.setdefault(counter[0], set()).add(key)
+        if self._min_count == 0:
+            self._min_count = counter[0]
+
+    def top(self, count):
+        """Return the keys with the highest counts, with their count, bytes and error."""
+        return sorted(
+            ((key, *counter) for key, counter in self._counters.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:count]
+
+    def _remove_from_bucket(self, key, count):
+        """Remove a key from the bucket of its count, the lowest count can go up."""
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            return
+        bucket.discard(key)
+        if not bucket:
+            del self._buckets[count]
+            if count == self._min_count:
+                # the key moves to the next count
+                self._min_count = count + 1
+
+
+class MessageRates:
+    """Count the messages received per node and per value, in windows of time.
+
+    The counts start over every window, the top of the last complete window is
+    kept to report next to the window in progress.
+    """
+
+    def __init__(
+        self,
+        hass,
+        node_capacity=const.RATES_NODE_CAPACITY,
+        value_capacity=const.RATES_VALUE_CAPACITY,
+        window=const.RATES_WINDOW,
+    ):
+        """Initialize the counters."""
+        self._hass = hass
+        self.node_capacity = node_capacity
+        self.value_capacity = value_capacity
+        self.window = window
+        self._nodes = HeavyHitters(node_capacity)
+        self._values = HeavyHitters(value_capacity)
+        self._window_start = time.monotonic()
+        self._last_window = None
+        self._stop_interval = None
+
+    @callback
+    def async_start(self):
+        """Start a new window at every interval."""
+        self._stop_interval = async_track_time_interval(
+            self._hass, self._async_next_window, self.window
+        )
+
+    @callback
+    def async_stop(self):
+        """Stop starting new windows."""
+        if self._stop_interval is not None:
+            self._stop_interval()
+            self._stop_interval = None
+
+    @callback
+    def async_message_received(self, topic, payload):
+        """Count a message of a node or value, on a parsed topic."""
+        # OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/
+        parts = topic.parts
+        if len(parts) < 5 or parts[2] != "node":
+            return
+        size = len(payload)
+        self._nodes.add((parts[1], parts[3]), size)
+        if topic.value_id_key is not None:
+            self._values.add((parts[1], parts[3], topic.value_id_key), size)
+
+    def get_statistics(self, count=const.RATES_TOP):
+        """Return the nodes and values with the most messages, per window."""
+        last_window = self._last_window
+        if last_window is not None:
+            last_window = dict(
+                last_window,
+                nodes=last_window["nodes"][:count],
+                values=last_window["values"][:count],
+            )
+        return {
+            "current_window": self._get_window_statistics(count),
+            "last_window": last_window,
+        }
+
+    @callback
+    def _async_next_window(self, now):
+        """Keep the top of the window that ended and start counting again."""
+        self._last_window = self._get_window_statistics(
+            max(self.node_capacity, self.value_capacity)
+        )
+        self._nodes = HeavyHitters(self.node_capacity)
+        self._values = HeavyHitters(self.value_capacity)
+        self._window_start = time.monotonic()
+
+    def _get_window_statistics(self, count):
+        """Return the top nodes and values of the window in progress."""
+        seconds = max(time.monotonic() - self._window_start, 1)
+        nodes = []
+        for key, messages, num_bytes, error in self._nodes.top(count):
+            instance_id, node_id = key
+            nodes.append(
+                {
+                    "instance_id": int(instance_id),
+                    "node_id": int(node_id),
+                    **get_rate_statistics(messages, num_bytes, error, seconds),
+                }
+            )
+        values = []
+        for key, messages, num_bytes, error in self._values.top(count):
+            instance_id, node_id, value_id_key = key
+            values.append(
+                {
+                    "instance_id": int(instance_id),
+                    "node_id": int(node_id),
+                    "value_id_key": value_id_key,
+                    "command_class": get_command_class_name(
+                        get_command_class_from_value_id_key(value_id_key)
+                    ),
+                    **get_rate_statistics(messages, num_bytes, error, seconds),
+                }
+            )
+        return {"seconds": round(seconds), "nodes": nodes, "values": values}
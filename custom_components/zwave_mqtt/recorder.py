@@ -0,0 +1,98 @@
+"""Recording of the MQTT traffic with the OZW daemon."""
+import asyncio
+import gzip
+import json
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Direction of a recorded message
+RECEIVED = "<"
+SENT = ">"
+
+
+def read_recording(path):
+    """Yield the (timestamp, direction, topic, payload) records of a recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        for line in fp:
+            yield tuple(json.loads(line))
+
+
+class TrafficRecorder:
+    """Record the messages received from and sent to the OZW daemon.
+
+    Records are collected in memory and appended to a gzipped file of JSON lines
+    periodically, outside the event loop. Starting a recording to an existing file
+    continues that recording.
+    """
+
+    def __init__(self, hass):
+        """Initialize the recorder, not recording."""
+        self._hass = hass
+        self.path = None
+        self._records = []
+        self._num_records = 0
+        self._stop_interval = None
+        # Only one write to the file at a time
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def recording(self):
+        """Return if messages are recorded."""
+        return self.path is not None
+
+    @callback
+    def async_start(self, path):
+        """Start recording the messages to a file."""
+        self.async_stop()
+        _LOGGER.info("Recording the MQTT traffic to %s", path)
+        self.path = path
+        self._num_records = 0
+        self._stop_interval = async_track_time_interval(
+            self._hass, self._async_flush, const.RECORDER_FLUSH_INTERVAL
+        )
+
+    @callback
+    def async_stop(self):
+        """Stop recording, the remaining records are written in the background."""
+        if not self.recording:
+            return
+        self._stop_interval()
+        self._async_flush()
+        _LOGGER.info("Recorded %s messages to %s", self._num_records, self.path)
+        self.path = None
+
+    @callback
+    def async_record(self, direction, topic, payload):
+        """Record a message, if recording."""
+        if self.path is None:
+            return
+        self._records.append((round(time.time(), 3), direction, topic, payload))
+        self._num_records += 1
+
+    @callback
+    def _async_flush(self, now=None):
+        """Append the collected records to the file, outside the event loop."""
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        self._hass.async_create_task(self._async_write(self.path, records))
+
+    async def _async_write(self, path, records):
+        """Append records to a file, in the order they are flushed."""
+        async with self._write_lock:
+            await self._hass.async_add_executor_job(self._write, path, records)
+
+    @staticmethod
+    def _write(path, records):
+        """Append records to a file."""
+        with gzip.open(path, "at", encoding="utf-8") as fp:
+            for record in records:
+                fp.write(json.dumps(record, separators=(",", ":")))
+                fp.write("\n")
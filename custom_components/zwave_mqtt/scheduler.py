@@ -0,0 +1,261 @@
+"""Scheduling of the commands that are sent to the Z-Wave network."""
+from collections import OrderedDict, deque
+import logging
+import time
+
+from openzwavemqtt.const import CommandClass
+
+from homeassistant.core import callback
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Commands which keep the mesh busy while no user is waiting for the result
+BACKGROUND_COMMANDS = ("refreshnodeinfo", "healnetworknode")
+BACKGROUND_COMMAND_CLASSES = (CommandClass.CONFIGURATION,)
+
+
+def get_node_id_from_value_id_key(value_id_key):
+    """Return the node id encoded in a ValueIDKey."""
+    return (value_id_key >> 24) & 0xFF
+
+
+def get_command_class_from_value_id_key(value_id_key):
+    """Return the command class encoded in a ValueIDKey."""
+    return (value_id_key >> 14) & 0xFF
+
+
+def get_command_instance_id(topic):
+    """Return the id of the OZW instance a command topic is sent to."""
+    # OpenZWave/1/command/setvalue/
+    return int(topic.split("/", 2)[1])
+
+
+def get_command_node(topic, payload):
+    """Return the OZW instance id and node id a command is sent to.
+
+    None for controller commands.
+    """
+    if not isinstance(payload, dict):
+        return None
+    if "ValueIDKey" in payload:
+        node_id = get_node_id_from_value_id_key(payload["ValueIDKey"])
+    else:
+        node_id = payload.get("node")
+    if node_id is None:
+        return None
+    return get_command_instance_id(topic), node_id
+
+
+def get_command_priority(command, payload):
+    """Return the priority class of a command."""
+    if command in BACKGROUND_COMMANDS:
+        return const.PRIORITY_BACKGROUND
+    if command == "setvalue":
+        command_class = get_command_class_from_value_id_key(payload["ValueIDKey"])
+        if command_class in BACKGROUND_COMMAND_CLASSES:
+            return const.PRIORITY_BACKGROUND
+    return const.PRIORITY_INTERACTIVE
+
+
+class CommandScheduler:
+    """Pace the commands for the nodes in the Z-Wave network.
+
+    Commands are queued per node (FIFO) and per priority, a node is keyed by the
+    OZW instance id and its node id. Only a limited amount of
+    commands is in flight at the same time, the next command is picked round robin
+    from the nodes with pending commands of the highest priority. A lower priority
+    that is passed over too many times gets its turn, so it is never starved.
+    A command is considered done when its node reports the value that was set, the
+    node reports its info for other commands, or it timed out.
+    Commands for nodes that can't respond now, as they are asleep or failed, are
+    published right away without a slot. The OZW daemon holds on to them.
+    The function on_sent is called with the topic and payload of every command that
+    is published to a node.
+    """
+
+    def __init__(
+        self,
+        hass,
+        publish,
+        max_in_flight=const.MAX_COMMANDS_IN_FLIGHT,
+        timeout=const.COMMAND_TIMEOUT,
+        starvation_limit=const.COMMAND_STARVATION_LIMIT,
+        on_sent=None,
+        is_reachable=None,
+    ):
+        """Initialize the scheduler with the function that publishes a command."""
+        self._hass = hass
+        self._publish = publish
+        self._on_sent = on_sent
+        self._is_reachable = is_reachable
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.starvation_limit = starvation_limit
+        # Per priority the nodes with pending commands, in round robin order
+        self._queues = {priority: OrderedDict() for priority in const.PRIORITIES}
+        self._passed_over = {priority: 0 for priority in const.PRIORITIES}
+        # Per node the commands in flight, as [ValueIDKey, timeout handle]
+        self._in_flight = {}
+        self._num_in_flight = 0
+        self._num_timeouts = 0
+        self._num_unreachable = 0
+        self._sent = {priority: 0 for priority in const.PRIORITIES}
+        self._wait_total = {priority: 0.0 for priority in const.PRIORITIES}
+        self._wait_max = {priority: 0.0 for priority in const.PRIORITIES}
+
+    @callback
+    def async_send(self, topic, payload):
+        """Queue a command, used as send_message of the OZW options."""
+        node = get_command_node(topic, payload)
+        if node is None:
+            # controller commands don't travel the mesh
+            self._publish(topic, payload)
+            return
+        if not self._node_reachable(node):
+            self._send_unscheduled(topic, payload)
+            return
+
+        command = topic.rstrip("/").rsplit("/", 1)[-1]
+        priority = get_command_priority(command, payload)
+        queue = self._queues[priority].setdefault(node, deque())
+        queue.append((topic, payload, time.monotonic()))
+        self._process_queues()
+
+    @callback
+    def async_value_reported(self, instance_id, node_id, value_id_key):
+        """Release the command in flight that set a value the node reported."""
+        self._release_reported((instance_id, node_id), value_id_key)
+
+    @callback
+    def async_node_reported(self, instance_id, node_id):
+        """Release the oldest command in flight for a node that reported its info."""
+        self._release_reported((instance_id, node_id), None)
+
+    @callback
+    def async_stop(self):
+        """Drop all pending commands and cancel the timeouts."""
+        for commands in self._in_flight.values():
+            for command in commands:
+                command[1].cancel()
+        self._in_flight.clear()
+        self._num_in_flight = 0
+        for queues in self._queues.values():
+            queues.clear()
+
+    def get_statistics(self):
+        """Return the statistics of the scheduler."""
+        stats = {
+            "in_flight": self._num_in_flight,
+            "max_in_flight": self.max_in_flight,
+            "timeouts": self._num_timeouts,
+            "unreachable": self._num_unreachable,
+        }
+        for priority in const.PRIORITIES:
+            queues = self._queues[priority]
+            sent = self._sent[priority]
+            stats[priority] = {
+                "queued": sum(len(queue) for queue in queues.values()),
+                "queued_per_node": {node: len(queue) for node, queue in queues.items()},
+                "sent": sent,
+                "wait_avg": self._wait_total[priority] / sent if sent else 0.0,
+                "wait_max": self._wait_max[priority],
+            }
+        return stats
+
+    @callback
+    def _node_reachable(self, node):
+        """Return if a node can respond to commands now."""
+        return self._is_reachable is None or self._is_reachable(*node)
+
+    @callback
+    def _send_unscheduled(self, topic, payload):
+        """Publish a command for a node that can't respond now, without a slot."""
+        self._num_unreachable += 1
+        self._publish(topic, payload)
+        if self._on_sent is not None:
+            self._on_sent(topic, payload)
+
+    @callback
+    def _process_queues(self):
+        """Send pending commands as long as the in flight budget allows."""
+        while self._num_in_flight < self.max_in_flight:
+            priority = self._next_priority()
+            if priority is None:
+                return
+
+            # Take the command of the first node in line and move it to the back
+            queues = self._queues[priority]
+            node, queue = next(iter(queues.items()))
+            topic, payload, queued_at = queue.popleft()
+            if queue:
+                queues.move_to_end(node)
+            else:
+                del queues[node]
+
+            if not self._node_reachable(node):
+                # the node fell asleep or failed while the command waited
+                self._send_unscheduled(topic, payload)
+                continue
+
+            wait = time.monotonic() - queued_at
+            self._sent[priority] += 1
+            self._wait_total[priority] += wait
+            self._wait_max[priority] = max(self._wait_max[priority], wait)
+
+            value_id_key = payload.get("ValueIDKey")
+            command = [value_id_key, None]
+            command[1] = self._hass.loop.call_later(
+                self.timeout, self._timeout, node, command
+            )
+            self._in_flight.setdefault(node, []).append(command)
+            self._num_in_flight += 1
+            self._publish(topic, payload)
+            if self._on_sent is not None:
+                self._on_sent(topic, payload)
+
+    @callback
+    def _next_priority(self):
+        """Return the priority of the next command to send, None if none is queued."""
+        waiting = [priority for priority in const.PRIORITIES if self._queues[priority]]
+        if not waiting:
+            return None
+        next_priority = waiting[0]
+        for priority in waiting[1:]:
+            if self._passed_over[priority] >= self.starvation_limit:
+                next_priority = priority
+                break
+
+        for priority in waiting:
+            if priority == next_priority:
+                self._passed_over[priority] = 0
+            else:
+                self._passed_over[priority] += 1
+        return next_priority
+
+    @callback
+    def _release_reported(self, node, value_id_key):
+        """Release the oldest command in flight for a node with a ValueIDKey."""
+        for command in self._in_flight.get(node, ()):
+            if command[0] == value_id_key:
+                command[1].cancel()
+                self._release(node, command)
+                return
+
+    @callback
+    def _timeout(self, node, command):
+        """Handle a command that got no response in time."""
+        _LOGGER.debug("Command for node %s of instance %s timed out", node[1], node[0])
+        self._num_timeouts += 1
+        self._release(node, command)
+
+    @callback
+    def _release(self, node, command):
+        """Free the slot of a command in flight for a node."""
+        commands = self._in_flight[node]
+        commands.remove(command)
+        if not commands:
+            del self._in_flight[node]
+        self._num_in_flight -= 1
+        self._process_queues()
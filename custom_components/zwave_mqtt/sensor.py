@@ -1,6 +1,7 @@
 """Representation of Z-Wave sensors."""
 
 import logging
+import time
 
 from openzwavemqtt.const import CommandClass
 
@@ -15,31 +16,34 @@ from homeassistant.components.sensor import (
 from homeassistant.const import TEMP_CELSIUS, TEMP_FAHRENHEIT
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
 
+from . import const
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave sensor from config entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_sensor(value):
         """Add Z-Wave Sensor."""
         # Basic Sensor types
         if isinstance(value.primary.value, (float, int)):
-            sensor = ZWaveNumericSensor(value)
+            sensor = ZWaveNumericSensor(value, config_entry)
 
         elif isinstance(value.primary.value, dict):
-            sensor = ZWaveListSensor(value)
+            sensor = ZWaveListSensor(value, config_entry)
 
         else:
             _LOGGER.warning("Sensor not implemented for value %s", value.primary.label)
             return
 
-        async_add_entities([sensor])
+        batch_add_entities([sensor])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_sensor", async_add_sensor)
@@ -48,8 +52,126 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     await hass.data[DOMAIN][config_entry.entry_id]["mark_platform_loaded"]("sensor")
 
 
+def get_throttle_settings(options, entity_id, device_class):
+    """Return the throttle settings of a sensor, None if it is not throttled."""
+    throttle = options.get(const.CONF_THROTTLE, {})
+    for target in (entity_id, device_class, const.THROTTLE_DEFAULT):
+        if target in throttle:
+            return throttle[target]
+    return None
+
+
+# Reason of a pending write of a held back state: the minimum interval passed, or
+# the state is too old to hold back any longer
+FLUSH_INTERVAL = "interval"
+FLUSH_MAX_AGE = "max_age"
+
+
+def is_below_delta(state, written_state, settings):
+    """Return if the change of a state is too small to write it."""
+    delta = settings.get(const.CONF_DELTA, 0)
+    relative_delta = settings.get(const.CONF_RELATIVE_DELTA, 0)
+    if not delta and not relative_delta:
+        return False
+    if not isinstance(state, (float, int)) or not isinstance(
+        written_state, (float, int)
+    ):
+        return False
+    change = abs(state - written_state)
+    if delta and change >= delta:
+        return False
+    if relative_delta and change >= abs(written_state) * relative_delta / 100:
+        return False
+    return True
+
+
 class ZwaveSensorBase(ZWaveDeviceEntity):
-    """Basic Representation of a Z-Wave sensor."""
+    """Basic Representation of a Z-Wave sensor.
+
+    State writes can be throttled through the options of the config entry: a
+    minimum interval between writes, a minimum change of the state and a maximum
+    age of a state that is held back.
+    """
+
+    def __init__(self, values, config_entry):
+        """Initialize the sensor."""
+        super().__init__(values)
+        self._config_entry = config_entry
+        self._written_state = None
+        self._written_available = None
+        self._written_at = None
+        self._flush_listener = None
+        # Time (monotonic) and reason of the pending write of a held back state
+        self._flush_at = None
+        self._flush_reason = None
+        # Reason of the pending write that is being done
+        self._flushing = None
+
+    @callback
+    def async_write_state(self):
+        """Write the state of the sensor, unless it is held back."""
+        settings = get_throttle_settings(
+            self._config_entry.options, self.entity_id, self.device_class
+        )
+        flushing, self._flushing = self._flushing, None
+        if (
+            settings is not None
+            and self._written_at is not None
+            and self.available == self._written_available
+        ):
+            elapsed = time.monotonic() - self._written_at
+            max_age = settings.get(const.CONF_MAX_AGE, 0)
+            too_old = flushing == FLUSH_MAX_AGE or (max_age and elapsed >= max_age)
+            if not too_old and is_below_delta(
+                self.state, self._written_state, settings
+            ):
+                if max_age:
+                    self._schedule_flush(max_age - elapsed, FLUSH_MAX_AGE)
+                else:
+                    self._cancel_flush()
+                return
+            min_interval = settings.get(const.CONF_MIN_INTERVAL, 0)
+            if flushing is None and not too_old and elapsed < min_interval:
+                self._schedule_flush(min_interval - elapsed, FLUSH_INTERVAL)
+                return
+
+        self._cancel_flush()
+        self._written_state = self.state
+        self._written_available = self.available
+        self._written_at = time.monotonic()
+        super().async_write_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Call when entity will be removed from hass."""
+        await super().async_will_remove_from_hass()
+        self._cancel_flush()
+
+    @callback
+    def _schedule_flush(self, delay, reason):
+        """Check the held back state again after the delay, unless that's sooner."""
+        delay = max(delay, 0)
+        flush_at = time.monotonic() + delay
+        if self._flush_listener is not None:
+            if self._flush_at <= flush_at:
+                return
+            self._flush_listener()
+        self._flush_at = flush_at
+        self._flush_reason = reason
+        self._flush_listener = async_call_later(self.hass, delay, self._flush)
+
+    @callback
+    def _flush(self, now):
+        """Write the held back state, if it changed enough or is too old."""
+        self._flush_listener = None
+        self._flushing = self._flush_reason
+        self.async_write_state()
+
+    @callback
+    def _cancel_flush(self):
+        """Cancel the pending check of a held back state."""
+        if self._flush_listener is not None:
+            self._flush_listener()
+            self._flush_listener = None
 
     @property
     def device_class(self):
@@ -1,5 +1,6 @@
 """Methods and classes related to executing Z-Wave commands and publishing these to hass."""
 import logging
+import os
 
 from openzwavemqtt.const import CommandClass, ValueType
 import voluptuous as vol
@@ -12,14 +13,44 @@ from . import const
 _LOGGER = logging.getLogger(__name__)
 
 
+def get_output_path(hass, filename):
+    """Return the path of a file a service writes to, None if it's not allowed.
+
+    A file name is a file in the config directory, other paths have to be in one
+    of the whitelist_external_dirs.
+    """
+    if os.path.basename(filename) == filename and filename not in (
+        os.curdir,
+        os.pardir,
+    ):
+        return hass.config.path(filename)
+    path = hass.config.path(filename)
+    if hass.config.is_allowed_path(path):
+        return path
+    _LOGGER.warning(
+        "Not allowed to write to %s, use a file name or a path in "
+        "whitelist_external_dirs",
+        filename,
+    )
+    return None
+
+
 class ZWaveServices:
     """Class that holds our services ( Zwave Commands) that should be published to hass."""
 
-    def __init__(self, hass, manager, data_nodes):
-        """Initialize with both hass and ozwmanager objects."""
-        self._hass = hass
-        self._manager = manager
-        self._data_nodes = data_nodes
+    def __init__(self, context):
+        """Initialize with the objects shared in the context of the OZW instance."""
+        self._hass = context.hass
+        self._manager = context.manager
+        self._data_nodes = context.data_nodes
+        self._scheduler = context.scheduler
+        self._commands = context.commands
+        self._messages = context.messages
+        self._state_writes = context.state_writes
+        self._latency = context.latency
+        self._recorder = context.recorder
+        self._trace = context.trace
+        self._rates = context.rates
 
     @callback
     def register(self):
@@ -89,6 +120,48 @@ class ZWaveServices:
                 }
             ),
         )
+        self._hass.services.async_register(
+            const.DOMAIN, const.SERVICE_PRINT_STATISTICS, self.print_statistics
+        )
+        self._hass.services.async_register(
+            const.DOMAIN,
+            const.SERVICE_START_RECORDING,
+            self.start_recording,
+            schema=vol.Schema(
+                {
+                    vol.Optional(
+                        const.ATTR_FILENAME, default=const.RECORDER_FILENAME
+                    ): cv.string
+                }
+            ),
+        )
+        self._hass.services.async_register(
+            const.DOMAIN, const.SERVICE_STOP_RECORDING, self.stop_recording
+        )
+        self._hass.services.async_register(
+            const.DOMAIN,
+            const.SERVICE_DUMP_TRACE,
+            self.async_dump_trace,
+            schema=vol.Schema(
+                {
+                    vol.Optional(
+                        const.ATTR_FILENAME, default=const.TRACE_FILENAME
+                    ): cv.string
+                }
+            ),
+        )
+        self._hass.services.async_register(
+            const.DOMAIN,
+            const.SERVICE_PRINT_MESSAGE_RATES,
+            self.print_message_rates,
+            schema=vol.Schema(
+                {
+                    vol.Optional(const.ATTR_COUNT, default=const.RATES_TOP): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    )
+                }
+            ),
+        )
 
     @callback
     def add_node(self, service):
@@ -169,3 +242,40 @@ class ZWaveServices:
             node_id,
             selection,
         )
+
+    @callback
+    def print_statistics(self, service):
+        """Print the statistics of commands, messages, state writes and latencies."""
+        _LOGGER.info(
+            "Command scheduler statistics: %s", self._scheduler.get_statistics()
+        )
+        _LOGGER.info("Command tracker statistics: %s", self._commands.get_statistics())
+        _LOGGER.info("Message queue statistics: %s", self._messages.get_statistics())
+        _LOGGER.info("Entity state writes: %s", self._state_writes)
+        _LOGGER.info("Latency statistics: %s", self._latency.get_statistics())
+
+    @callback
+    def start_recording(self, service):
+        """Start recording the MQTT traffic to a file."""
+        path = get_output_path(self._hass, service.data[const.ATTR_FILENAME])
+        if path is not None:
+            self._recorder.async_start(path)
+
+    @callback
+    def stop_recording(self, service):
+        """Stop recording the MQTT traffic."""
+        self._recorder.async_stop()
+
+    @callback
+    def print_message_rates(self, service):
+        """Print the nodes and values that send the most messages."""
+        _LOGGER.info(
+            "Message rates: %s",
+            self._rates.get_statistics(service.data[const.ATTR_COUNT]),
+        )
+
+    async def async_dump_trace(self, service):
+        """Write the trace of the values to a file."""
+        path = get_output_path(self._hass, service.data[const.ATTR_FILENAME])
+        if path is not None:
+            await self._trace.async_dump(path)
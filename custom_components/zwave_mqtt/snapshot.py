@@ -0,0 +1,97 @@
+"""Persisted snapshot of the Z-Wave network as published by the OZW daemon."""
+import logging
+import re
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Topics that don't describe the state of the network. The status of the daemon
+# only counts when it's live: without it the restored entities are unavailable
+# and the ingest of the network isn't ended early.
+SKIP_TOPIC_PARTS = {"command", "event", "statistics", "status"}
+# The TimeStamp of a payload changes with every report, it's not stored
+TIMESTAMP = re.compile(
+    r'"TimeStamp"\s*:\s*\d+\s*,\s*|,\s*"TimeStamp"\s*:\s*\d+(?=\s*\})'
+)
+
+
+def strip_timestamp(payload):
+    """Return a (raw) payload without its TimeStamp."""
+    return TIMESTAMP.sub("", payload)
+
+
+class NetworkSnapshot:
+    """Keep the last message of every topic describing the network.
+
+    The messages are replayed on startup so entities exist right away, before the
+    live messages of the OZW daemon are received. They are available once the
+    daemon publishes its status.
+    """
+
+    def __init__(self, hass, entry_id):
+        """Initialize the snapshot of a config entry."""
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{const.DOMAIN}.{entry_id}.snapshot"
+        )
+        self._messages = {}
+        self._live_topics = set()
+        self._save_scheduled = False
+
+    async def async_load(self):
+        """Load the snapshot from storage and return its messages."""
+        data = await self._store.async_load()
+        if data is not None:
+            # snapshots of earlier versions have the status of the daemon
+            self._messages = {
+                topic: payload
+                for topic, payload in data["messages"].items()
+                if SKIP_TOPIC_PARTS.isdisjoint(topic.split("/"))
+            }
+        return list(self._messages.items())
+
+    @callback
+    def async_process_message(self, topic, payload):
+        """Update the snapshot with a message received from the OZW daemon."""
+        if not SKIP_TOPIC_PARTS.isdisjoint(topic.parts):
+            return
+        topic = topic.topic
+        self._live_topics.add(topic)
+        if payload == "":
+            # the item was removed
+            if self._messages.pop(topic, None) is None:
+                return
+        else:
+            payload = strip_timestamp(payload)
+            if self._messages.get(topic) == payload:
+                return
+            self._messages[topic] = payload
+
+        if not self._save_scheduled:
+            self._save_scheduled = True
+            self._store.async_delay_save(self._data_to_save, const.SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_get_stale_topics(self):
+        """Return the topics of the snapshot that were not received live.
+
+        Topics are ordered from the deepest to the shallowest, so values are
+        removed before the nodes they belong to.
+        """
+        if not self._live_topics:
+            # nothing is published (yet), keep the snapshot
+            return []
+        stale_topics = set(self._messages) - self._live_topics
+        return sorted(stale_topics, key=lambda topic: topic.count("/"), reverse=True)
+
+    @callback
+    def _data_to_save(self):
+        """Return the data of the snapshot to store."""
+        self._save_scheduled = False
+        # the copy is serialized outside the event loop
+        return {"messages": dict(self._messages)}
@@ -0,0 +1,185 @@
+"""Planning of the MQTT subscriptions to the topics of the OZW daemon."""
+import logging
+
+from openzwavemqtt.const import CommandClass
+
+from homeassistant.components import mqtt
+from homeassistant.core import callback
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+    async_get_registry,
+)
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Command classes of events, which are received even when all entities of their
+# node are disabled
+EVENT_COMMAND_CLASSES = {
+    str(command_class.value)
+    for command_class in (
+        CommandClass.ALARM,
+        CommandClass.CENTRAL_SCENE,
+        CommandClass.SCENE_ACTIVATION,
+    )
+}
+
+
+def get_instance_topics(instance_id, drop_topics=()):
+    """Return the topic filters of an OZW instance, except the node values.
+
+    Command topics are left out, the OZW manager discards them anyway.
+    """
+    prefix = f"{const.TOPIC_OPENZWAVE}/{instance_id}"
+    topics = [f"{prefix}/status/", f"{prefix}/event/#", f"{prefix}/node/+/"]
+    if const.TOPIC_FAMILY_ASSOCIATION not in drop_topics:
+        topics.append(f"{prefix}/node/+/association/#")
+    if const.TOPIC_FAMILY_STATISTICS not in drop_topics:
+        topics.append(f"{prefix}/statistics/")
+        topics.append(f"{prefix}/node/+/statistics/")
+    return topics
+
+
+def get_node_topics(node_id, muted=False):
+    """Return the topic filters of the values of a node, by node id of create_node_id.
+
+    A muted node only has the values of its scenes and notifications, and the
+    instances they belong to.
+    """
+    instance_id, node_id = node_id.split("-")
+    prefix = f"{const.TOPIC_OPENZWAVE}/{instance_id}/node/{node_id}/instance"
+    if not muted:
+        return [f"{prefix}/#"]
+    return [f"{prefix}/+/"] + [
+        f"{prefix}/+/commandclass/{command_class}/#"
+        for command_class in sorted(EVENT_COMMAND_CLASSES)
+    ]
+
+
+class SubscriptionPlanner:
+    """Subscribe to the topics of the OZW daemon the integration uses.
+
+    The values of every node get their own subscription, so the values of nodes
+    without any enabled entity are left to the broker. Their scenes and
+    notifications are still received, they are events rather than state.
+    """
+
+    def __init__(self, hass, entry, receive_message):
+        """Initialize the subscriptions of a config entry."""
+        self._hass = hass
+        self._entry_id = entry.entry_id
+        self._receive_message = receive_message
+        self.instance_ids = entry.options.get(const.CONF_INSTANCE_IDS) or ["+"]
+        self.drop_topics = entry.options.get(const.CONF_DROP_TOPICS, [])
+        self._unsubscribe = []
+        # Per node id if it is muted and the unsubscribe callbacks of its topics
+        self._nodes = {}
+        # Node ids of which all entities are disabled
+        self._muted_nodes = set()
+
+    async def async_subscribe(self):
+        """Subscribe to the topics of the configured OZW instances."""
+        await self._async_update_muted_nodes()
+        self._unsubscribe.append(
+            self._hass.bus.async_listen(
+                EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+            )
+        )
+        for instance_id in self.instance_ids:
+            for topic in get_instance_topics(instance_id, self.drop_topics):
+                self._unsubscribe.append(
+                    await mqtt.async_subscribe(self._hass, topic, self._receive_message)
+                )
+
+    def options_changed(self, options):
+        """Return if the options of the config entry change the subscriptions."""
+        instance_ids = options.get(const.CONF_INSTANCE_IDS) or ["+"]
+        drop_topics = options.get(const.CONF_DROP_TOPICS, [])
+        return instance_ids != self.instance_ids or drop_topics != self.drop_topics
+
+    @callback
+    def async_node_added(self, node_id):
+        """Subscribe to the values of a node, only its events if it is muted."""
+        if node_id in self._nodes:
+            return
+        muted = node_id in self._muted_nodes
+        unsubscribes = []
+        self._nodes[node_id] = (muted, unsubscribes)
+        self._hass.async_create_task(
+            self._async_subscribe_node(
+                node_id, unsubscribes, get_node_topics(node_id, muted)
+            )
+        )
+
+    @callback
+    def async_node_removed(self, node_id):
+        """Unsubscribe from the values of a node."""
+        _, unsubscribes = self._nodes.pop(node_id, (None, ()))
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+
+    def is_subscribed(self, topic):
+        """Return if a topic of a node is received, it's not left out on purpose."""
+        # OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/
+        parts = topic.split("/")
+        if len(parts) < 6 or parts[2] != "node":
+            return True
+        if parts[4] == const.TOPIC_FAMILY_ASSOCIATION:
+            return const.TOPIC_FAMILY_ASSOCIATION not in self.drop_topics
+        if parts[4] != "instance" or f"{parts[1]}-{parts[3]}" not in self._muted_nodes:
+            return True
+        return len(parts) < 9 or parts[7] in EVENT_COMMAND_CLASSES
+
+    @callback
+    def async_stop(self):
+        """Unsubscribe from all topics."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        for node_id in list(self._nodes):
+            self.async_node_removed(node_id)
+
+    async def _async_subscribe_node(self, node_id, unsubscribes, topics):
+        """Subscribe to the topics of the values of a node."""
+        for topic in topics:
+            unsubscribe = await mqtt.async_subscribe(
+                self._hass, topic, self._receive_message
+            )
+            if self._nodes.get(node_id, (None, None))[1] is not unsubscribes:
+                # removed or subscribed again while subscribing
+                unsubscribe()
+                return
+            unsubscribes.append(unsubscribe)
+
+    async def _async_registry_updated(self, event):
+        """Mute nodes of which the last entity is disabled, and the other way around."""
+        if event.data["action"] != "update" or "disabled_by" not in event.data.get(
+            "changes", ()
+        ):
+            return
+        await self._async_update_muted_nodes()
+        for node_id, (muted, _) in list(self._nodes.items()):
+            if muted == (node_id in self._muted_nodes):
+                continue
+            _LOGGER.debug(
+                "Entities of node %s are %s",
+                node_id,
+                "all disabled" if not muted else "enabled",
+            )
+            self.async_node_removed(node_id)
+            self.async_node_added(node_id)
+
+    async def _async_update_muted_nodes(self):
+        """Find the nodes of which all entities in the entity registry are disabled."""
+        registry = await async_get_registry(self._hass)
+        enabled = {}
+        for entry in registry.entities.values():
+            if entry.config_entry_id != self._entry_id:
+                continue
+            # The unique id of an entity starts with the node id
+            node_id = entry.unique_id.rsplit("-", 1)[0]
+            enabled[node_id] = enabled.get(node_id, False) or not entry.disabled_by
+        self._muted_nodes = {
+            node_id for node_id, is_enabled in enabled.items() if not is_enabled
+        }
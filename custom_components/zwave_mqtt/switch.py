@@ -8,20 +8,21 @@ from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DATA_UNSUBSCRIBE, DOMAIN
-from .entity import ZWaveDeviceEntity
+from .entity import ZWaveDeviceEntity, async_batch_add_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Z-Wave switch from config entry."""
+    batch_add_entities = async_batch_add_entities(hass, async_add_entities)
 
     @callback
     def async_add_switch(value):
         """Add Z-Wave Switch."""
         switch = ZWaveSwitch(value)
 
-        async_add_entities([switch])
+        batch_add_entities([switch])
 
     hass.data[DOMAIN][config_entry.entry_id][DATA_UNSUBSCRIBE].append(
         async_dispatcher_connect(hass, "zwave_new_switch", async_add_switch)
@@ -42,8 +43,8 @@ class ZWaveSwitch(ZWaveDeviceEntity, SwitchDevice):
 
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        self.values.primary.send_value(True)
+        await self.async_send_value(self.values.primary, True)
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        self.values.primary.send_value(False)
+        await self.async_send_value(self.values.primary, False)
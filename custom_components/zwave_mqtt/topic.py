@@ -0,0 +1,27 @@
+"""Parsing of the topics of the OZW daemon, once per received message."""
+from typing import List, NamedTuple, Optional
+
+
+class ParsedTopic(NamedTuple):
+    """A topic split in its parts, with the command class and ValueIDKey of values.
+
+    The stages of a received message look at its parts, instead of splitting the
+    topic each.
+    """
+
+    topic: str
+    parts: List[str]
+    command_class: Optional[int]
+    value_id_key: Optional[int]
+
+
+def parse_topic(topic):
+    """Parse a topic of the OZW daemon."""
+    # OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/
+    parts = topic.split("/")
+    command_class = value_id_key = None
+    if len(parts) > 7 and parts[6] == "commandclass" and parts[7].isdigit():
+        command_class = int(parts[7])
+        if len(parts) > 9 and parts[8] == "value" and parts[9].isdigit():
+            value_id_key = int(parts[9])
+    return ParsedTopic(topic, parts, command_class, value_id_key)
@@ -0,0 +1,70 @@
+"""In-memory trace of the values added, changed and removed by the OZW daemon."""
+import json
+import logging
+import time
+
+from homeassistant.core import callback
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Kind of a trace record
+TRACE_VALUE_ADDED = "value_added"
+TRACE_VALUE_CHANGED = "value_changed"
+TRACE_VALUE_REMOVED = "value_removed"
+
+
+class TraceBuffer:
+    """Ring buffer of compact trace records, the oldest records are overwritten.
+
+    A record is a tuple (timestamp, kind, node id, ValueIDKey, duration). It is
+    stamped with time.perf_counter(), which is converted to the wall clock when the
+    records are dumped.
+    """
+
+    def __init__(self, hass, size=const.TRACE_SIZE):
+        """Initialize an empty buffer of a fixed size."""
+        self._hass = hass
+        self._records = [None] * size
+        self._index = 0
+        self._num_records = 0
+        self._clock_offset = time.time() - time.perf_counter()
+
+    @callback
+    def async_record(self, kind, node_id, value_id_key, started):
+        """Record an event that started at a time.perf_counter()."""
+        now = time.perf_counter()
+        index = self._index
+        self._records[index] = (now, kind, node_id, value_id_key, now - started)
+        index += 1
+        self._index = 0 if index == len(self._records) else index
+        self._num_records += 1
+
+    def get_records(self):
+        """Return the records in the buffer, oldest first."""
+        if self._num_records < len(self._records):
+            return self._records[: self._index]
+        return self._records[self._index :] + self._records[: self._index]
+
+    async def async_dump(self, path):
+        """Write the records in the buffer to a file of JSON lines."""
+        records = self.get_records()
+        await self._hass.async_add_executor_job(self._write, path, records)
+        _LOGGER.info(
+            "Dumped %s of %s trace records to %s", len(records), self._num_records, path
+        )
+
+    def _write(self, path, records):
+        """Write records to a file, with wall clock timestamps."""
+        with open(path, "wt", encoding="utf-8") as fp:
+            for timestamp, kind, node_id, value_id_key, duration in records:
+                record = (
+                    round(timestamp + self._clock_offset, 6),
+                    kind,
+                    node_id,
+                    value_id_key,
+                    round(duration, 6),
+                )
+                fp.write(json.dumps(record, separators=(",", ":")))
+                fp.write("\n")
@@ -0,0 +1 @@
+"""Benchmarks for the zwave_mqtt integration."""
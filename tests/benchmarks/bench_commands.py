@@ -0,0 +1,134 @@
+"""Load test the commands of the integration against the simulated OZW daemon.
+
+A generated network is published by tests.benchmarks.daemon, then all lights are
+turned on and off at once for a number of rounds. The daemon reports the values
+back after the latency of the network, with jitter, or loses a share of the
+commands. It reports the duration of the rounds, the round trips and retries of
+the command tracker and the waits and timeouts of the command scheduler.
+
+Run with: python -m tests.benchmarks.bench_commands [--nodes 200] [--rounds 5]
+    [--latency 0.05] [--jitter 0.02] [--loss 0.01] [--timeout 1] [--in-flight N]
+    [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from custom_components.zwave_mqtt import const
+
+from tests.benchmarks.daemon import DaemonSimulator
+from tests.benchmarks.harness import (
+    async_create_hass,
+    async_stop_hass,
+    mock_environment,
+)
+from tests.benchmarks.network import generate_network
+from tests.common import ENTRY_ID
+
+
+async def async_run(messages, rounds, timeout, max_in_flight, **simulator_options):
+    """Switch all lights of a network on and off, return the statistics."""
+    with mock_environment():
+        hass = await async_create_hass()
+        daemon = DaemonSimulator(hass, **simulator_options)
+        with daemon.mock_publish():
+            await daemon.async_setup(messages)
+            commands = hass.data[const.DOMAIN][ENTRY_ID]["commands"]
+            scheduler = hass.data[const.DOMAIN][ENTRY_ID]["scheduler"]
+            commands.timeout = scheduler.timeout = timeout
+            scheduler.max_in_flight = max_in_flight
+            lights = hass.states.async_entity_ids("light")
+
+            round_seconds = []
+            for index in range(rounds):
+                service = "turn_on" if index % 2 == 0 else "turn_off"
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(
+                        hass.services.async_call(
+                            "light", service, {"entity_id": light}, blocking=True
+                        )
+                        for light in lights
+                    )
+                )
+                round_seconds.append(time.perf_counter() - start)
+
+            command_stats = commands.get_statistics()
+            scheduler_stats = scheduler.get_statistics()
+            daemon.async_stop()
+        await async_stop_hass(hass)
+
+    round_trips = command_stats["round_trip"].values()
+    num_round_trips = sum(stats["count"] for stats in round_trips)
+    return {
+        "lights": len(lights),
+        "rounds": rounds,
+        "round_seconds_avg": round(sum(round_seconds) / rounds, 3),
+        "round_seconds_max": round(max(round_seconds), 3),
+        "confirmed": num_round_trips,
+        "retries": command_stats["retries"],
+        "failures": command_stats["failures"],
+        "round_trip_avg": round(
+            sum(stats["avg"] * stats["count"] for stats in round_trips)
+            / max(num_round_trips, 1),
+            3,
+        ),
+        "round_trip_max": round(
+            max((stats["max"] for stats in round_trips), default=0), 3
+        ),
+        "scheduler_timeouts": scheduler_stats["timeouts"],
+        "scheduler_wait_max": round(
+            max(scheduler_stats[priority]["wait_max"] for priority in const.PRIORITIES),
+            3,
+        ),
+        **{f"daemon_{name}": count for name, count in daemon.stats.items()},
+    }
+
+
+def main():
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=200, help="network size")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds of commands")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument(
+        "--loss", type=float, default=0.0, help="share of lost commands"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=const.COMMAND_TIMEOUT, help="seconds"
+    )
+    parser.add_argument(
+        "--in-flight", type=int, default=const.MAX_COMMANDS_IN_FLIGHT, help="commands"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the results to (JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    results = loop.run_until_complete(
+        async_run(
+            generate_network(args.nodes, args.seed),
+            args.rounds,
+            args.timeout,
+            args.in_flight,
+            latency=args.latency,
+            jitter=args.jitter,
+            loss=args.loss,
+            seed=args.seed,
+        )
+    )
+    print(json.dumps(results))
+
+    if args.output:
+        with open(args.output, "wt") as fp:
+            json.dump(results, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark discovery schema matching against a replayed network dump.
+
+Run with: python -m tests.benchmarks.bench_discovery [fixture] [rounds]
+"""
+import sys
+import timeit
+
+from custom_components.zwave_mqtt import const
+from custom_components.zwave_mqtt.discovery import (
+    COMPILED_SCHEMAS,
+    DISCOVERY_SCHEMAS,
+    get_matching_schemas,
+)
+
+from tests.common import load_values
+
+# Position of a discovery schema, which is the position of its compiled schema
+SCHEMA_INDEX = {id(schema): index for index, schema in enumerate(DISCOVERY_SCHEMAS)}
+
+
+# The matching of discovery before the schemas were indexed and compiled, frozen
+# as the baseline of the benchmark.
+
+
+def check_node_schema(node, schema):
+    """Check if node matches the passed node schema."""
+    if const.DISC_NODE_ID in schema and node.node_id not in schema[const.DISC_NODE_ID]:
+        return False
+    if (
+        const.DISC_GENERIC_DEVICE_CLASS in schema
+        and node.node_generic
+        not in ensure_list(schema[const.DISC_GENERIC_DEVICE_CLASS])
+    ):
+        return False
+    if (
+        const.DISC_SPECIFIC_DEVICE_CLASS in schema
+        and node.node_specific
+        not in ensure_list(schema[const.DISC_SPECIFIC_DEVICE_CLASS])
+    ):
+        return False
+    return True
+
+
+def check_value_schema(value, schema):
+    """Check if the value matches the passed value schema."""
+    if (
+        const.DISC_COMMAND_CLASS in schema
+        and value.parent.command_class_id not in schema[const.DISC_COMMAND_CLASS]
+    ):
+        return False
+    if const.DISC_TYPE in schema and value.type not in ensure_list(
+        schema[const.DISC_TYPE]
+    ):
+        return False
+    if const.DISC_GENRE in schema and value.genre not in ensure_list(
+        schema[const.DISC_GENRE]
+    ):
+        return False
+    if const.DISC_INDEX in schema and value.index not in ensure_list(
+        schema[const.DISC_INDEX]
+    ):
+        return False
+    if const.DISC_INSTANCE in schema and value.instance not in ensure_list(
+        schema[const.DISC_INSTANCE]
+    ):
+        return False
+    if const.DISC_SCHEMAS in schema:
+        found = False
+        for schema_item in schema[const.DISC_SCHEMAS]:
+            found = found or check_value_schema(value, schema_item)
+        if not found:
+            return False
+
+    return True
+
+
+def ensure_list(value):
+    """Convert a value to a list if needed."""
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def match_linear(node, value):
+    """Match a value against every schema, the way discovery did before the index."""
+    return [
+        schema
+        for schema in DISCOVERY_SCHEMAS
+        if check_node_schema(node, schema)
+        and check_value_schema(value, schema[const.DISC_VALUES][const.DISC_PRIMARY])
+    ]
+
+
+def main(fixture="generic_network_dump.csv", rounds=200):
+    """Run the benchmark."""
+    values = [(value.node, value) for value in load_values(fixture)]
+
+    for node, value in values:
+        assert [
+            COMPILED_SCHEMAS[SCHEMA_INDEX[id(schema)]]
+            for schema in match_linear(node, value)
+        ] == get_matching_schemas(node, value)
+
+    def replay(match):
+        for node, value in values:
+            match(node, value)
+
+    print(f"{len(values)} values, {len(COMPILED_SCHEMAS)} schemas, {rounds} rounds")
+    for name, match in (("linear", match_linear), ("indexed", get_matching_schemas)):
+        elapsed = min(timeit.repeat(lambda: replay(match), number=rounds, repeat=3))
+        per_value = elapsed / rounds / len(values) * 1e6
+        print(f"{name:>8}: {elapsed:.3f}s total, {per_value:.2f}us per value")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:3]))
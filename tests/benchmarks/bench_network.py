@@ -0,0 +1,159 @@
+"""End-to-end benchmark of the integration with generated networks.
+
+The integration is set up with tests.common.setup_zwave, with MQTT and storage
+mocked like the tests do. For every network size it measures:
+
+- replay: time to process the dump of the network on a cold start
+- entities per second created during the replay
+- value changes per second, received in bursts
+- state writes per value change
+- peak memory during the replay, in a separate run
+
+Run with: python -m tests.benchmarks.bench_network [--nodes 50,200,1000]
+    [--output results.json] [--baseline results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import time
+import tracemalloc
+from unittest.mock import Mock
+
+from homeassistant.const import __version__ as HA_VERSION
+
+from tests.benchmarks.harness import (
+    StateWriteCounter,
+    async_create_hass,
+    async_stop_hass,
+    mock_environment,
+)
+from tests.benchmarks.network import generate_network, generate_value_changes
+from tests.common import setup_zwave
+
+NETWORK_SIZES = (50, 200, 1000)
+# Value changes per node, received in bursts of a number of messages
+VALUE_CHANGES_PER_NODE = 20
+BURST_SIZE = 10
+# Results compared with a baseline, and if a higher value is better
+METRICS = {
+    "replay_seconds": False,
+    "entities_per_second": True,
+    "value_changes_per_second": True,
+    "state_writes_per_message": False,
+    "peak_memory_mb": False,
+}
+
+
+async def async_replay(messages, changes=()):
+    """Set up the integration, replay a network and value changes.
+
+    Return the measurements and the number of state writes of the value changes.
+    """
+    results = {}
+    with mock_environment(), StateWriteCounter() as state_writes:
+        hass = await async_create_hass()
+        receive_message = await setup_zwave(hass)
+
+        start = time.perf_counter()
+        for topic, payload in messages:
+            receive_message(Mock(topic=topic, payload=payload))
+        await hass.async_block_till_done()
+        results["replay"] = time.perf_counter() - start
+        results["entities"] = len(hass.states.async_all())
+
+        writes_before = state_writes.count
+        start = time.perf_counter()
+        for index in range(0, len(changes), BURST_SIZE):
+            for topic, payload in changes[index : index + BURST_SIZE]:
+                receive_message(Mock(topic=topic, payload=payload))
+            await hass.async_block_till_done()
+        results["value_changes"] = time.perf_counter() - start
+        results["state_writes"] = state_writes.count - writes_before
+
+        await async_stop_hass(hass)
+    return results
+
+
+def run(loop, num_nodes):
+    """Return the measurements of a network of num_nodes nodes."""
+    messages = generate_network(num_nodes)
+    changes = generate_value_changes(messages, num_nodes * VALUE_CHANGES_PER_NODE)
+
+    measured = loop.run_until_complete(async_replay(messages, changes))
+
+    tracemalloc.start()
+    loop.run_until_complete(async_replay(messages))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "messages": len(messages),
+        "entities": measured["entities"],
+        "replay_seconds": round(measured["replay"], 3),
+        "entities_per_second": round(measured["entities"] / measured["replay"], 1),
+        "value_changes_per_second": round(len(changes) / measured["value_changes"], 1),
+        "state_writes_per_message": round(measured["state_writes"] / len(changes), 3),
+        "peak_memory_mb": round(peak_memory / 2 ** 20, 1),
+    }
+
+
+def compare(results, baseline):
+    """Print the change of the results relative to a baseline."""
+    for num_nodes, measured in results["results"].items():
+        base = baseline["results"].get(num_nodes)
+        if base is None:
+            continue
+        print(f"{num_nodes} nodes, compared to {baseline['label']}:")
+        for name, higher_is_better in METRICS.items():
+            if not base.get(name):
+                continue
+            change = (measured[name] - base[name]) / base[name] * 100
+            if change == 0:
+                verdict = "same"
+            elif (change > 0) == higher_is_better:
+                verdict = "better"
+            else:
+                verdict = "worse"
+            print(f"  {name:>24}: {change:+.1f}% ({verdict})")
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--nodes",
+        default=",".join(str(num_nodes) for num_nodes in NETWORK_SIZES),
+        help="comma separated network sizes",
+    )
+    parser.add_argument("--output", help="file to write the results to (JSON)")
+    parser.add_argument("--baseline", help="results of an earlier run to compare to")
+    parser.add_argument("--label", default="", help="label of the results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    results = {
+        "label": args.label or time.strftime("%Y-%m-%d %H:%M"),
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "results": {},
+    }
+    for num_nodes in (int(arg) for arg in args.nodes.split(",")):
+        measured = run(loop, num_nodes)
+        results["results"][str(num_nodes)] = measured
+        print(f"{num_nodes} nodes: {json.dumps(measured)}")
+
+    if args.output:
+        with open(args.output, "wt") as fp:
+            json.dump(results, fp, indent=2)
+    if args.baseline:
+        with open(args.baseline, "rt") as fp:
+            compare(results, json.load(fp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Simulate the qt-openzwave daemon, for round trips of the commands.
+
+The simulator publishes a network dump to the integration, set up with
+tests.common.setup_zwave, and answers the commands the integration publishes:
+a setvalue is reported back as valueChanged after the latency of the node, unless
+the command is lost. It also emulates the status transitions of the daemon and the
+inclusion and exclusion of nodes.
+"""
+from contextlib import contextmanager
+import itertools
+import json
+import random
+from unittest.mock import Mock
+
+from asynctest import patch
+from custom_components.zwave_mqtt.scheduler import get_node_id_from_value_id_key
+
+from homeassistant.core import callback
+
+from tests.common import setup_zwave
+
+# Seconds between a command and the report of the node
+LATENCY = 0.01
+# Multilevel switches restore their last level when set to 255
+RESTORE_LEVEL = 255
+RESTORED_LEVEL = 99
+
+
+def get_reported_value(payload, new_value):
+    """Return the value a node reports after it is set to a new value."""
+    if payload["Type"] == "List":
+        for item in payload["Value"]["List"]:
+            if new_value in (item["Value"], item["Label"]):
+                return dict(
+                    payload["Value"], Selected=item["Label"], Selected_id=item["Value"]
+                )
+        # the node ignores an unknown item
+        return payload["Value"]
+    if payload["Type"] == "Bool":
+        return bool(new_value)
+    if (
+        payload["CommandClass"] == "COMMAND_CLASS_SWITCH_MULTILEVEL"
+        and new_value == RESTORE_LEVEL
+    ):
+        return RESTORED_LEVEL
+    return new_value
+
+
+class DaemonSimulator:
+    """Answer the commands of the integration like the OZW daemon and the nodes do.
+
+    The latency and loss rate of a node default to those of the network. Random
+    jitter and losses are seeded, so runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        hass,
+        latency=LATENCY,
+        jitter=0.0,
+        loss=0.0,
+        node_latency=None,
+        node_loss=None,
+        seed=0,
+    ):
+        """Initialize the simulator, without a network."""
+        self._hass = hass
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.node_latency = node_latency or {}
+        self.node_loss = node_loss or {}
+        self._rand = random.Random(seed)
+        self._receive_message = None
+        # The published payload per topic
+        self.topics = {}
+        # The topic of a value per instance and ValueIDKey
+        self._value_topics = {}
+        # Reports scheduled for commands, by an id
+        self._reports = {}
+        self._report_ids = itertools.count()
+        self.commands = []
+        self.stats = {"commands": 0, "lost": 0, "reported": 0, "unknown": 0}
+
+    @contextmanager
+    def mock_publish(self):
+        """Receive the commands the integration publishes, while in the context."""
+        with patch(
+            "homeassistant.components.mqtt.async_publish",
+            side_effect=self.async_receive_command,
+        ):
+            yield self
+
+    async def async_setup(self, messages=()):
+        """Set up the integration and publish the messages of a network dump."""
+        self._receive_message = await setup_zwave(self._hass)
+        for topic, payload in messages:
+            self.async_publish(topic, json.loads(payload))
+        await self._hass.async_block_till_done()
+
+    @callback
+    def async_stop(self):
+        """Drop the scheduled reports."""
+        for handle in self._reports.values():
+            handle.cancel()
+        self._reports.clear()
+
+    @callback
+    def async_publish(self, topic, payload):
+        """Publish a message to the integration, an empty payload clears a topic."""
+        if payload:
+            self.topics[topic] = payload
+            if "ValueIDKey" in payload:
+                instance_id = int(topic.split("/")[1])
+                self._value_topics[(instance_id, payload["ValueIDKey"])] = topic
+            raw_payload = json.dumps(payload)
+        else:
+            self.topics.pop(topic, None)
+            raw_payload = ""
+        self._receive_message(Mock(topic=topic, payload=raw_payload))
+
+    @callback
+    def async_receive_command(self, hass, topic, payload):
+        """Handle a command, the side effect of mqtt.async_publish."""
+        parts = topic.split("/")
+        instance_id, command = int(parts[1]), parts[3]
+        payload = json.loads(payload) if payload else {}
+        self.commands.append((topic, payload))
+        self.stats["commands"] += 1
+        if command == "setvalue":
+            self._async_set_value(instance_id, payload)
+
+    @callback
+    def async_set_status(self, instance_id, status):
+        """Publish a new status of the daemon."""
+        topic = f"OpenZWave/{instance_id}/status/"
+        self.async_publish(topic, dict(self.topics[topic], Status=status))
+
+    @callback
+    def async_restart(self, instance_id):
+        """Publish the whole network again, like the daemon does when it restarts."""
+        status_topic = f"OpenZWave/{instance_id}/status/"
+        ready_status = self.topics[status_topic]["Status"]
+        self.async_set_status(instance_id, "driverReady")
+        prefix = f"OpenZWave/{instance_id}/node/"
+        for topic, payload in list(self.topics.items()):
+            if topic.startswith(prefix):
+                self.async_publish(topic, payload)
+        self.async_set_status(instance_id, ready_status)
+
+    @callback
+    def async_add_node(self, messages):
+        """Publish the messages of a node that is included in the network."""
+        for topic, payload in messages:
+            self.async_publish(topic, json.loads(payload))
+
+    @callback
+    def async_remove_node(self, instance_id, node_id):
+        """Report a node as excluded and clear its topics, values first."""
+        self.async_publish(
+            f"OpenZWave/{instance_id}/event/removenode/", {"Node": node_id}
+        )
+        prefix = f"OpenZWave/{instance_id}/node/{node_id}/"
+        for topic in sorted(self.topics, key=len, reverse=True):
+            if topic.startswith(prefix):
+                self.async_publish(topic, "")
+
+    @callback
+    def _async_set_value(self, instance_id, payload):
+        """Schedule the report of a value that is set, unless the command is lost."""
+        topic = self._value_topics.get((instance_id, payload["ValueIDKey"]))
+        if topic is None:
+            self.stats["unknown"] += 1
+            return
+
+        node_id = get_node_id_from_value_id_key(payload["ValueIDKey"])
+        if self._rand.random() < self.node_loss.get(node_id, self.loss):
+            self.stats["lost"] += 1
+            return
+
+        delay = self.node_latency.get(node_id, self.latency)
+        if self.jitter:
+            delay += self._rand.uniform(-self.jitter, self.jitter)
+        report_id = next(self._report_ids)
+        self._reports[report_id] = self._hass.loop.call_later(
+            max(delay, 0), self._async_report_value, report_id, topic, payload["Value"]
+        )
+
+    @callback
+    def _async_report_value(self, report_id, topic, new_value):
+        """Report a value that was set, as the node does."""
+        del self._reports[report_id]
+        payload = self.topics.get(topic)
+        if payload is None:
+            # the node was removed in the meantime
+            return
+        self.stats["reported"] += 1
+        self.async_publish(
+            topic,
+            dict(
+                payload,
+                Value=get_reported_value(payload, new_value),
+                Event="valueChanged",
+            ),
+        )
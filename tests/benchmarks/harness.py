@@ -0,0 +1,105 @@
+"""Run the integration outside of pytest, with MQTT and storage mocked."""
+import asyncio
+from contextlib import contextmanager
+from pathlib import Path
+
+from asynctest import patch
+
+from homeassistant import config_entries, core
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.entity import Entity
+
+from tests.common import ENTRY_ID, mock_storage
+
+
+@contextmanager
+def mock_environment():
+    """Mock storage and MQTT like the tests do, yield the topics published to."""
+    sent = []
+    with mock_storage(), patch("homeassistant.components.mqtt.async_subscribe"), patch(
+        "homeassistant.components.mqtt.async_publish",
+        side_effect=lambda hass, topic, payload: sent.append(topic),
+    ):
+        yield sent
+
+
+async def async_create_hass():
+    """Create a Home Assistant instance, like the hass fixture does."""
+    hass = core.HomeAssistant()
+    hass.config.config_dir = str(Path(__file__).parent.parent.parent)
+    hass.config.skip_pip = True
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    return hass
+
+
+async def async_stop_hass(hass):
+    """Unload the integration and stop Home Assistant, leaving the loop running."""
+    await hass.config_entries.async_unload(ENTRY_ID)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    hass.executor.shutdown()
+
+
+class StateWriteCounter:
+    """Count the state writes of all entities, while in the context."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.count = 0
+        self._patch = None
+
+    def __enter__(self):
+        """Start counting."""
+        write_ha_state = Entity.async_write_ha_state
+
+        def count_write(entity):
+            # the state machine skips writes that don't change the state
+            written = entity.hass.states.get(entity.entity_id)
+            write_ha_state(entity)
+            if entity.hass.states.get(entity.entity_id) is not written:
+                self.count += 1
+
+        self._patch = patch.object(Entity, "async_write_ha_state", count_write)
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop counting."""
+        self._patch.stop()
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a task that sleeps an interval."""
+
+    def __init__(self, interval=0.05):
+        """Initialize the monitor."""
+        self.interval = interval
+        self._samples = []
+        self._task = None
+
+    def start(self):
+        """Start measuring, outside of the tasks Home Assistant waits for."""
+        self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def stop(self):
+        """Stop measuring."""
+        self._task.cancel()
+
+    def collect(self):
+        """Return the maximum and mean lag in milliseconds since the last collect."""
+        samples, self._samples = self._samples, []
+        if not samples:
+            return {"loop_lag_max_ms": 0, "loop_lag_mean_ms": 0}
+        return {
+            "loop_lag_max_ms": round(max(samples) * 1000, 1),
+            "loop_lag_mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+        }
+
+    async def _run(self):
+        """Sleep an interval at a time, and record the lag of the wake up."""
+        loop = asyncio.get_event_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self._samples.append(max(loop.time() - start - self.interval, 0))
@@ -0,0 +1,289 @@
+"""Generate dumps of large synthetic Z-Wave networks.
+
+The devices are copies of the nodes of the generic network dump, renumbered, and
+a thermostat. The dumps use the topic,payload format of the fixtures.
+
+Run with: python -m tests.benchmarks.network nodes [output] [seed]
+"""
+import json
+from pathlib import Path
+import random
+import sys
+
+from openzwavemqtt.const import (
+    GENERIC_TYPE_THERMOSTAT,
+    SPECIFIC_TYPE_THERMOSTAT_GENERAL_V2,
+    CommandClass,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+TEMPLATE_FIXTURE = "generic_network_dump.csv"
+
+# Node of the template fixture per device type
+CONTROLLER_NODE = 1
+TEMPLATE_NODES = {"dimmer": 39, "meter": 32, "notification": 36, "multisensor": 37}
+# Share of each device type in a generated network
+DEVICE_MIX = {
+    "dimmer": 0.3,
+    "multisensor": 0.2,
+    "notification": 0.2,
+    "meter": 0.2,
+    "thermostat": 0.1,
+}
+# Z-Wave node ids are a byte, a network of more nodes is split over OZW instances
+NODES_PER_INSTANCE = 200
+
+# Bit offsets of the parts of a ValueIDKey
+KEY_NODE_SHIFT = 24
+KEY_GENRE_SHIFT = 22
+KEY_COMMAND_CLASS_SHIFT = 14
+KEY_INSTANCE_SHIFT = 4
+KEY_INDEX_SHIFT = 48
+KEY_GENRES = {"Basic": 0, "User": 1, "Config": 2, "System": 3}
+KEY_TYPES = {"Bool": 0, "Byte": 1, "Decimal": 2, "Int": 3, "List": 4}
+
+TIMESTAMP = 1579566891
+
+
+def load_templates():
+    """Return the messages of the template fixture, per node id."""
+    templates = {}
+    with (FIXTURES / TEMPLATE_FIXTURE).open("rt") as fp:
+        for line in fp:
+            topic, payload = line.strip().split(",", 1)
+            parts = topic.split("/")
+            if parts[2] == "node":
+                templates.setdefault(int(parts[3]), []).append(
+                    (parts[4:], json.loads(payload))
+                )
+            elif parts[2] == "status":
+                templates["status"] = json.loads(payload)
+    return templates
+
+
+def create_value_key(node_id, genre, command_class, instance, index, value_type):
+    """Return the ValueIDKey of a value, like the OZW daemon creates it."""
+    return (
+        index << KEY_INDEX_SHIFT
+        | node_id << KEY_NODE_SHIFT
+        | KEY_GENRES[genre] << KEY_GENRE_SHIFT
+        | command_class << KEY_COMMAND_CLASS_SHIFT
+        | instance << KEY_INSTANCE_SHIFT
+        | KEY_TYPES[value_type]
+    )
+
+
+def renumber(template, template_node_id, instance_id, node_id):
+    """Return the messages of a template node as the messages of another node."""
+    messages = []
+    node_offset = (node_id - template_node_id) << KEY_NODE_SHIFT
+    for parts, payload in template:
+        payload = dict(payload)
+        parts = list(parts)
+        if "NodeID" in payload:
+            payload["NodeID"] = node_id
+            payload["MetaData"] = dict(payload["MetaData"])
+            name = payload["MetaData"]["Name"] or payload["NodeProductName"]
+            payload["MetaData"]["Name"] = f"{name} {instance_id}.{node_id}"
+        if "ValueIDKey" in payload:
+            payload["Node"] = node_id
+            payload["ValueIDKey"] += node_offset
+            parts[parts.index("value") + 1] = str(payload["ValueIDKey"])
+        if payload.get("Type") == "List" and "Selected_id" not in payload["Value"]:
+            # older dumps, like the water sensor, have only the selected label
+            value = payload["Value"]
+            payload["Value"] = dict(
+                value,
+                Selected_id=next(
+                    item["Value"]
+                    for item in value["List"]
+                    if item["Label"] == value["Selected"]
+                ),
+            )
+        topic = "/".join(["OpenZWave", str(instance_id), "node", str(node_id), *parts])
+        messages.append((topic, payload))
+    return messages
+
+
+def create_thermostat(node_template, instance_id, node_id):
+    """Return the messages of a thermostat with a mode, two setpoints and a sensor."""
+    prefix = f"OpenZWave/{instance_id}/node/{node_id}"
+    node = dict(node_template)
+    node.update(
+        NodeID=node_id,
+        NodeManufacturerName="Synthetic",
+        NodeProductName="Thermostat",
+        NodeGenericString="Thermostat",
+        NodeGeneric=GENERIC_TYPE_THERMOSTAT,
+        NodeSpecificString="Thermostat General V2",
+        NodeSpecific=SPECIFIC_TYPE_THERMOSTAT_GENERAL_V2,
+        NodeManufacturerID="0xffff",
+        NodeProductType="0x0001",
+        NodeProductID="0x0001",
+        MetaData={
+            **node_template["MetaData"],
+            "Name": f"Thermostat {instance_id}.{node_id}",
+            "ProductPicBase64": "",
+        },
+    )
+    messages = [
+        (f"{prefix}/", node),
+        (f"{prefix}/instance/1/", {"Instance": 1, "TimeStamp": TIMESTAMP}),
+    ]
+    modes = [(0, "Off"), (1, "Heat"), (2, "Cool"), (3, "Auto")]
+    values = [
+        (CommandClass.THERMOSTAT_MODE, 0, "Mode", "List", ""),
+        (CommandClass.THERMOSTAT_SETPOINT, 1, "Heating 1", "Decimal", "C"),
+        (CommandClass.THERMOSTAT_SETPOINT, 2, "Cooling 1", "Decimal", "C"),
+        (CommandClass.SENSOR_MULTILEVEL, 1, "Air Temperature", "Decimal", "C"),
+    ]
+    command_classes = set()
+    for command_class, index, label, value_type, units in values:
+        cc_topic = f"{prefix}/instance/1/commandclass/{command_class.value}/"
+        cc_name = f"COMMAND_CLASS_{command_class.name}"
+        if command_class not in command_classes:
+            command_classes.add(command_class)
+            messages.append(
+                (
+                    cc_topic,
+                    {
+                        "Instance": 1,
+                        "CommandClassId": command_class.value,
+                        "CommandClass": cc_name,
+                        "TimeStamp": TIMESTAMP,
+                    },
+                )
+            )
+        key = create_value_key(
+            node_id, "User", command_class.value, 1, index, value_type
+        )
+        if value_type == "List":
+            value = {
+                "List": [{"Value": mode, "Label": name} for mode, name in modes],
+                "Selected": "Heat",
+                "Selected_id": 1,
+            }
+        else:
+            value = 20.5
+        messages.append(
+            (
+                f"{cc_topic}value/{key}/",
+                {
+                    "Label": label,
+                    "Value": value,
+                    "Units": units,
+                    "Min": 0,
+                    "Max": 0,
+                    "Type": value_type,
+                    "Instance": 1,
+                    "CommandClass": cc_name,
+                    "Index": index,
+                    "Node": node_id,
+                    "Genre": "User",
+                    "Help": "",
+                    "ValueIDKey": key,
+                    "ReadOnly": False,
+                    "WriteOnly": False,
+                    "ValueSet": False,
+                    "ValuePolled": False,
+                    "ChangeVerified": False,
+                    "Event": "valueAdded",
+                    "TimeStamp": TIMESTAMP,
+                },
+            )
+        )
+    return messages
+
+
+def generate_network(num_nodes, seed=0):
+    """Return the messages (topic and raw payload) of a network of num_nodes nodes.
+
+    The devices are picked at random, by the shares of DEVICE_MIX.
+    """
+    rand = random.Random(seed)
+    templates = load_templates()
+    device_types = list(DEVICE_MIX)
+    weights = [DEVICE_MIX[device_type] for device_type in device_types]
+
+    messages = []
+    for index in range(num_nodes):
+        instance_id = index // NODES_PER_INSTANCE + 1
+        # node id 1 is the controller
+        node_id = index % NODES_PER_INSTANCE + 2
+        if node_id == 2:
+            # like the daemon on start, the status is published before the nodes
+            # and changed when all nodes are queried
+            status = dict(templates["status"], Status="driverReady")
+            messages.append((f"OpenZWave/{instance_id}/status/", status))
+            messages.extend(
+                renumber(
+                    templates[CONTROLLER_NODE],
+                    CONTROLLER_NODE,
+                    instance_id,
+                    CONTROLLER_NODE,
+                )
+            )
+        if node_id == NODES_PER_INSTANCE + 1 or index == num_nodes - 1:
+            status_message = (f"OpenZWave/{instance_id}/status/", templates["status"])
+        else:
+            status_message = None
+
+        device_type = rand.choices(device_types, weights)[0]
+        if device_type == "thermostat":
+            node_template = templates[TEMPLATE_NODES["dimmer"]][0][1]
+            messages.extend(create_thermostat(node_template, instance_id, node_id))
+        else:
+            template_node_id = TEMPLATE_NODES[device_type]
+            messages.extend(
+                renumber(
+                    templates[template_node_id], template_node_id, instance_id, node_id
+                )
+            )
+        if status_message is not None:
+            messages.append(status_message)
+
+    return [(topic, json.dumps(payload)) for topic, payload in messages]
+
+
+def generate_value_changes(messages, count, seed=0):
+    """Return valueChanged messages for random user values of a generated network."""
+    rand = random.Random(seed)
+    values = []
+    for topic, payload in messages:
+        if "/value/" not in topic:
+            continue
+        payload = json.loads(payload)
+        if payload["Genre"] == "User" and payload["Type"] in (
+            "Bool",
+            "Byte",
+            "Decimal",
+        ):
+            values.append((topic, payload))
+
+    changes = []
+    for _ in range(count):
+        topic, payload = rand.choice(values)
+        payload = dict(payload, Event="valueChanged")
+        if payload["Type"] == "Bool":
+            payload["Value"] = not payload["Value"]
+        elif payload["Type"] == "Byte":
+            payload["Value"] = rand.randint(0, 99)
+        else:
+            payload["Value"] = round(rand.uniform(0, 100), 1)
+        changes.append((topic, json.dumps(payload)))
+    return changes
+
+
+def main(num_nodes, output=None, seed=0):
+    """Write a generated network dump."""
+    fp = open(output, "wt") if output else sys.stdout
+    try:
+        for topic, payload in generate_network(int(num_nodes), int(seed)):
+            fp.write(f"{topic},{payload}\n")
+    finally:
+        if output:
+            fp.close()
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
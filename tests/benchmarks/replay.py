@@ -0,0 +1,150 @@
+"""Replay a recording of the MQTT traffic, to load test the integration.
+
+Recordings are made with the zwave_mqtt.start_recording service. The received
+messages are fed to the integration, set up with tests.common.setup_zwave, at the
+pace they were recorded, a multiple of it or as fast as possible. For every phase
+of the recording it reports the throughput, the lag of the event loop and the
+number of state writes.
+
+Run with: python -m tests.benchmarks.replay recording [--speed 10|max]
+    [--phase seconds] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from unittest.mock import Mock
+
+from custom_components.zwave_mqtt.recorder import RECEIVED, SENT, read_recording
+
+from tests.benchmarks.harness import (
+    LoopLagMonitor,
+    StateWriteCounter,
+    async_create_hass,
+    async_stop_hass,
+    mock_environment,
+)
+from tests.common import setup_zwave
+
+# Length (in seconds of the recording) of a phase of the report
+PHASE_LENGTH = 3600
+# Number of messages fed between yields to the event loop, at maximum speed
+MAX_SPEED_BATCH = 100
+
+
+class Phase:
+    """Statistics of a phase of the replay."""
+
+    def __init__(self, index, sent, state_writes):
+        """Start a phase."""
+        self.index = index
+        self.received = 0
+        self.recorded_sent = 0
+        self._start = time.perf_counter()
+        self._sent = sent
+        self._sent_start = len(sent)
+        self._state_writes = state_writes
+        self._state_writes_start = state_writes.count
+
+    def report(self, lag):
+        """Return the statistics of the phase."""
+        seconds = time.perf_counter() - self._start
+        state_writes = self._state_writes.count - self._state_writes_start
+        return {
+            "phase": self.index,
+            "received": self.received,
+            "seconds": round(seconds, 3),
+            "messages_per_second": round(self.received / seconds, 1),
+            "state_writes": state_writes,
+            "state_writes_per_message": round(state_writes / max(self.received, 1), 3),
+            "sent": len(self._sent) - self._sent_start,
+            "recorded_sent": self.recorded_sent,
+            **lag,
+        }
+
+
+async def async_replay(records, speed=None, phase_length=PHASE_LENGTH):
+    """Replay records at a multiple of the recorded pace, None for maximum speed.
+
+    Return the statistics per phase.
+    """
+    reports = []
+    with mock_environment() as sent, StateWriteCounter() as state_writes:
+        hass = await async_create_hass()
+        receive_message = await setup_zwave(hass)
+        monitor = LoopLagMonitor()
+        monitor.start()
+        loop = asyncio.get_event_loop()
+
+        phase = None
+        first_timestamp = None
+        start = loop.time()
+        for timestamp, direction, topic, payload in records:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            offset = timestamp - first_timestamp
+            index = int(offset // phase_length)
+            if phase is None or index != phase.index:
+                if phase is not None:
+                    await hass.async_block_till_done()
+                    reports.append(phase.report(monitor.collect()))
+                monitor.collect()
+                phase = Phase(index, sent, state_writes)
+
+            if direction == SENT:
+                phase.recorded_sent += 1
+                continue
+            assert direction == RECEIVED
+
+            if speed is not None:
+                delay = start + offset / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif phase.received % MAX_SPEED_BATCH == 0:
+                await asyncio.sleep(0)
+            receive_message(Mock(topic=topic, payload=payload))
+            phase.received += 1
+
+        if phase is not None:
+            await hass.async_block_till_done()
+            reports.append(phase.report(monitor.collect()))
+        monitor.stop()
+        await async_stop_hass(hass)
+    return reports
+
+
+def main():
+    """Replay a recording."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="recording of the MQTT traffic")
+    parser.add_argument(
+        "--speed", default="1", help="multiple of the recorded pace, or max"
+    )
+    parser.add_argument(
+        "--phase",
+        type=float,
+        default=PHASE_LENGTH,
+        help="length of a phase of the report, in seconds of the recording",
+    )
+    parser.add_argument("--output", help="file to write the report to (JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    speed = None if args.speed == "max" else float(args.speed)
+    reports = loop.run_until_complete(
+        async_replay(read_recording(args.recording), speed, args.phase)
+    )
+    for report in reports:
+        print(json.dumps(report))
+
+    if args.output:
+        with open(args.output, "wt") as fp:
+            json.dump(reports, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 """Helpers for tests."""
+import asyncio
 from contextlib import contextmanager
 import json
 import logging
@@ -7,12 +8,17 @@ from unittest.mock import Mock
 
 from asynctest import patch
 from custom_components.zwave_mqtt.const import DOMAIN
+from openzwavemqtt import OZWManager, OZWOptions
+from openzwavemqtt.const import EVENT_VALUE_ADDED
 
 from homeassistant import config_entries, core as ha
+from homeassistant.components import mqtt
 from homeassistant.helpers import storage
 
 _LOGGER = logging.getLogger(__name__)
 
+ENTRY_ID = "zwave_mqtt_test"
+
 
 @contextmanager
 def mock_storage(data=None):
@@ -69,37 +75,79 @@ async def setup_zwave(hass, fixture=None):
     """Set up Z-Wave and load a dump."""
     hass.config.components.add("mqtt")
 
-    with patch("homeassistant.components.mqtt.async_subscribe") as mock_subscribe:
-        await hass.config_entries.async_add(
-            config_entries.ConfigEntry(
-                1,
-                DOMAIN,
-                "Z-Wave",
-                {},
-                config_entries.SOURCE_USER,
-                config_entries.CONN_CLASS_LOCAL_PUSH,
-                {},
-            )
+    await hass.config_entries.async_add(
+        config_entries.ConfigEntry(
+            1,
+            DOMAIN,
+            "Z-Wave",
+            {},
+            config_entries.SOURCE_USER,
+            config_entries.CONN_CLASS_LOCAL_PUSH,
+            {},
+            entry_id=ENTRY_ID,
         )
-        await hass.async_block_till_done()
+    )
+    await hass.async_block_till_done()
 
     assert "zwave_mqtt" in hass.config.components
-    assert len(mock_subscribe.mock_calls) == 1
-    receive_message = mock_subscribe.mock_calls[0][1][2]
+    # all subscriptions share the same callback, see the mqtt_subscriptions fixture
+    assert mqtt.async_subscribe.mock_calls
+    receive_message = mqtt.async_subscribe.mock_calls[0][1][2]
 
     if fixture is not None:
-        data = Path(__file__).parent / "fixtures" / fixture
-
-        with data.open("rt") as fp:
-            for line in fp:
-                topic, payload = line.strip().split(",", 1)
-                receive_message(Mock(topic=topic, payload=payload))
+        for topic, payload in get_fixture_messages(fixture):
+            receive_message(Mock(topic=topic, payload=payload))
 
         await hass.async_block_till_done()
 
     return receive_message
 
 
+def get_fixture_messages(fixture):
+    """Return the topics and (raw) payloads of a dump."""
+    data = Path(__file__).parent / "fixtures" / fixture
+
+    with data.open("rt") as fp:
+        return [tuple(line.strip().split(",", 1)) for line in fp]
+
+
+def load_values(fixture):
+    """Replay a dump into an OZWManager and return all added values."""
+    values = []
+    options = OZWOptions(send_message=lambda topic, payload: None)
+    options.listen(EVENT_VALUE_ADDED, values.append)
+    manager = OZWManager(options)
+    for topic, payload in get_fixture_messages(fixture):
+        manager.receive_message(topic, payload)
+    return values
+
+
+def get_fixture_payload(fixture, topic):
+    """Return the (decoded) payload of a topic in a dump."""
+    for line_topic, payload in get_fixture_messages(fixture):
+        if line_topic == topic:
+            return json.loads(payload)
+
+    raise ValueError(f"Topic {topic} not found in {fixture}")
+
+
+def value_changed_message(fixture, topic, value):
+    """Return a valueChanged message for a value of a dump, as a node reports it."""
+    payload = get_fixture_payload(fixture, topic)
+    payload["Event"] = "valueChanged"
+    payload["Value"] = value
+    return Mock(topic=topic, payload=json.dumps(payload))
+
+
+async def async_wait_for_messages(sent_messages, count):
+    """Wait until a number of messages is sent, while a service call is running."""
+    for _ in range(100):
+        if len(sent_messages) >= count:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError(f"Expected {count} sent messages, got {len(sent_messages)}")
+
+
 def async_capture_events(hass, event_name):
     """Create a helper that captures events."""
     events = []
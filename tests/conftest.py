@@ -14,7 +14,7 @@ logging.basicConfig(level=logging.DEBUG)
 
 
 @pytest.fixture
-async def hass(loop, hass_storage, sent_messages):
+async def hass(loop, hass_storage, sent_messages, mqtt_subscriptions):
     """Home Assistant instance."""
     hass = core.HomeAssistant()
 
@@ -33,6 +33,13 @@ def hass_storage():
         yield stored_data
 
 
+@pytest.fixture
+def mqtt_subscriptions():
+    """Fixture to capture MQTT subscriptions, for the duration of a test."""
+    with patch("homeassistant.components.mqtt.async_subscribe") as mock_subscribe:
+        yield mock_subscribe
+
+
 @pytest.fixture
 def sent_messages():
     """Fixture to capture sent messages."""
@@ -0,0 +1,109 @@
+"""Test the tracking of Z-Wave commands."""
+import asyncio
+from unittest.mock import Mock
+
+from custom_components.zwave_mqtt.commands import CommandTracker
+
+SETVALUE_TOPIC = "OpenZWave/{}/command/setvalue/"
+
+
+def setvalue(value, new_value):
+    """Return the payload of the setvalue command of a value."""
+    return {"ValueIDKey": value.value_id_key, "Value": new_value}
+
+
+def mock_value(tracker, value_id_key=541671440, node_id=32, instance_id=1):
+    """Return a mocked OZW value, its commands are sent right away."""
+    value = Mock(value_id_key=value_id_key, label="Switch")
+    value.node.id = node_id
+    value.ozw_instance.id = instance_id
+    value.send_value.side_effect = lambda new_value: tracker.async_command_sent(
+        SETVALUE_TOPIC.format(instance_id), setvalue(value, new_value)
+    )
+    return value
+
+
+async def test_confirm(hass):
+    """Test a command is confirmed by the node reporting the value."""
+    tracker = CommandTracker(hass)
+    value = mock_value(tracker)
+    call = hass.async_create_task(tracker.async_send_value(value, True))
+    await asyncio.sleep(0)
+    value.send_value.assert_called_once_with(True)
+
+    # another report doesn't confirm the command
+    value.value = False
+    tracker.async_value_changed(value)
+    assert not call.done()
+
+    value.value = True
+    tracker.async_value_changed(value)
+    assert await call is True
+
+    stats = tracker.get_statistics()
+    assert stats["pending"] == 0
+    assert stats["round_trip"][(1, 32)]["count"] == 1
+
+
+async def test_retry(hass):
+    """Test a command is sent again and given up on without confirmation."""
+    tracker = CommandTracker(hass, timeout=0.01, retries=2)
+    value = mock_value(tracker)
+
+    assert await tracker.async_send_value(value, True) is False
+    assert value.send_value.call_count == 3
+
+    stats = tracker.get_statistics()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 1
+    assert stats["pending"] == 0
+
+
+async def test_timeout_after_sent(hass):
+    """Test the timeout of a command starts when the scheduler publishes it."""
+    tracker = CommandTracker(hass, timeout=0.01, retries=0)
+    value = mock_value(tracker)
+    # the command waits in the queue of the scheduler
+    value.send_value.side_effect = None
+    call = hass.async_create_task(tracker.async_send_value(value, True))
+    await asyncio.sleep(0.05)
+    assert not call.done()
+
+    tracker.async_command_sent(SETVALUE_TOPIC.format(1), setvalue(value, True))
+    assert await call is False
+    assert value.send_value.call_count == 1
+
+
+async def test_superseded(hass):
+    """Test a newer value for the same ValueIDKey replaces the pending command."""
+    tracker = CommandTracker(hass)
+    value = mock_value(tracker)
+    first = hass.async_create_task(tracker.async_send_value(value, True))
+    await asyncio.sleep(0)
+    second = hass.async_create_task(tracker.async_send_value(value, False))
+    await asyncio.sleep(0)
+    assert await first is False
+
+    value.value = False
+    tracker.async_value_changed(value)
+    assert await second is True
+
+
+async def test_instances(hass):
+    """Test a report of a value of another OZW instance doesn't confirm a command."""
+    tracker = CommandTracker(hass)
+    value = mock_value(tracker)
+    other_value = mock_value(tracker, instance_id=2)
+    call = hass.async_create_task(tracker.async_send_value(value, True))
+    other_call = hass.async_create_task(tracker.async_send_value(other_value, True))
+    await asyncio.sleep(0)
+
+    other_value.value = True
+    tracker.async_value_changed(other_value)
+    assert await other_call is True
+    assert not call.done()
+
+    value.value = True
+    tracker.async_value_changed(value)
+    assert await call is True
+    assert set(tracker.get_statistics()["round_trip"]) == {(1, 32), (2, 32)}
@@ -0,0 +1,71 @@
+"""Test the zwave_mqtt config flow."""
+from asynctest import patch
+from custom_components.zwave_mqtt import DOMAIN, const
+
+from homeassistant import data_entry_flow
+
+from tests.common import setup_zwave
+
+
+async def test_options_flow(hass):
+    """Test the throttling of sensors is configured through the options flow."""
+    await setup_zwave(hass)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["step_id"] == "init"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {const.CONF_THROTTLE_TARGET: "power"}
+    )
+    assert result["step_id"] == "throttle"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {const.CONF_MIN_INTERVAL: 30, const.CONF_MAX_AGE: 300}
+    )
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == {
+        const.CONF_INSTANCE_IDS: [],
+        const.CONF_DROP_TOPICS: [],
+        const.CONF_THROTTLE: {
+            "power": {
+                const.CONF_MIN_INTERVAL: 30,
+                const.CONF_DELTA: 0,
+                const.CONF_RELATIVE_DELTA: 0,
+                const.CONF_MAX_AGE: 300,
+            }
+        },
+    }
+
+    # without any limit the settings are removed
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {const.CONF_THROTTLE_TARGET: "power"}
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {const.CONF_MIN_INTERVAL: 0, const.CONF_MAX_AGE: 0}
+    )
+    assert entry.options[const.CONF_THROTTLE] == {}
+
+
+async def test_options_flow_subscriptions(hass):
+    """Test the subscriptions are configured through the options flow."""
+    await setup_zwave(hass)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {const.CONF_INSTANCE_IDS: "one"}
+    )
+    assert result["errors"] == {const.CONF_INSTANCE_IDS: "invalid_instance_ids"}
+
+    with patch.object(hass.config_entries, "async_reload") as reload_entry:
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {const.CONF_INSTANCE_IDS: "1, 2", "drop_statistics": True},
+        )
+        await hass.async_block_till_done()
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == {
+        const.CONF_INSTANCE_IDS: [1, 2],
+        const.CONF_DROP_TOPICS: [const.TOPIC_FAMILY_STATISTICS],
+    }
+    assert len(reload_entry.mock_calls) == 1
@@ -0,0 +1,89 @@
+"""Test round trips of commands through the simulated OZW daemon."""
+from custom_components.zwave_mqtt.const import DOMAIN
+
+from tests.benchmarks.daemon import DaemonSimulator
+from tests.common import ENTRY_ID, get_fixture_messages
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT = "light.led_bulb_6_multi_colour_level"
+LIGHT_NODE = 39
+
+
+async def async_turn_on_light(hass, brightness):
+    """Turn on the light of the dump and wait for the confirmation."""
+    await hass.services.async_call(
+        "light",
+        "turn_on",
+        {"entity_id": LIGHT, "brightness": brightness},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+
+async def test_round_trip(hass):
+    """Test a command is confirmed by the report of the simulated node."""
+    daemon = DaemonSimulator(hass, node_latency={LIGHT_NODE: 0.05})
+    with daemon.mock_publish():
+        await daemon.async_setup(get_fixture_messages(FIXTURE))
+        assert hass.states.get(LIGHT).state == "off"
+
+        await async_turn_on_light(hass, 255)
+
+    assert hass.states.get(LIGHT).state == "on"
+    assert hass.states.get(LIGHT).attributes["brightness"] == 255
+    assert daemon.stats == {"commands": 1, "lost": 0, "reported": 1, "unknown": 0}
+
+    commands = hass.data[DOMAIN][ENTRY_ID]["commands"].get_statistics()
+    assert commands["failures"] == 0
+    assert commands["round_trip"][(1, LIGHT_NODE)]["count"] == 1
+    assert commands["round_trip"][(1, LIGHT_NODE)]["max"] >= 0.05
+    assert hass.data[DOMAIN][ENTRY_ID]["scheduler"].get_statistics()["in_flight"] == 0
+
+
+async def test_lost_commands(hass):
+    """Test commands lost on the way to a node are sent again, and given up on."""
+    daemon = DaemonSimulator(hass, node_loss={LIGHT_NODE: 1.0})
+    with daemon.mock_publish():
+        await daemon.async_setup(get_fixture_messages(FIXTURE))
+        commands = hass.data[DOMAIN][ENTRY_ID]["commands"]
+        scheduler = hass.data[DOMAIN][ENTRY_ID]["scheduler"]
+        commands.timeout = scheduler.timeout = 0.05
+        commands.retries = 1
+
+        await async_turn_on_light(hass, 255)
+        assert hass.states.get(LIGHT).state == "off"
+        assert daemon.stats["lost"] == 2
+        assert commands.get_statistics()["retries"] == 1
+        assert commands.get_statistics()["failures"] == 1
+        assert scheduler.get_statistics()["timeouts"] == 2
+
+        # the node is reachable again
+        daemon.node_loss.clear()
+        await async_turn_on_light(hass, 255)
+        assert hass.states.get(LIGHT).state == "on"
+        assert commands.get_statistics()["failures"] == 1
+
+
+async def test_restart_and_exclusion(hass):
+    """Test the daemon restarting, and a node leaving and joining the network."""
+    messages = get_fixture_messages(FIXTURE)
+    daemon = DaemonSimulator(hass)
+    with daemon.mock_publish():
+        await daemon.async_setup(messages)
+
+        daemon.async_restart(1)
+        await hass.async_block_till_done()
+        assert hass.states.get(LIGHT).state == "off"
+
+        daemon.async_remove_node(1, LIGHT_NODE)
+        await hass.async_block_till_done()
+        assert hass.states.get(LIGHT) is None
+
+        daemon.async_add_node(
+            (topic, payload)
+            for topic, payload in messages
+            if topic.startswith(f"OpenZWave/1/node/{LIGHT_NODE}/")
+        )
+        await hass.async_block_till_done()
+        await async_turn_on_light(hass, 255)
+        assert hass.states.get(LIGHT).state == "on"
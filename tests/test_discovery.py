@@ -0,0 +1,99 @@
+"""Test the compiled Z-Wave discovery schemas."""
+from unittest.mock import Mock
+
+from custom_components.zwave_mqtt import const
+from custom_components.zwave_mqtt.discovery import (
+    COMPILED_SCHEMAS,
+    compile_schema,
+    get_matching_schemas,
+    get_value_schema_keys,
+    match_node_schema,
+    match_value_schema,
+)
+from openzwavemqtt.const import CommandClass, ValueGenre, ValueType
+import pytest
+
+SCHEMA = {
+    const.DISC_COMPONENT: "sensor",
+    const.DISC_GENERIC_DEVICE_CLASS: [0x21, 0x10],
+    const.DISC_VALUES: {
+        const.DISC_PRIMARY: {
+            const.DISC_COMMAND_CLASS: [CommandClass.SENSOR_MULTILEVEL],
+            const.DISC_TYPE: ValueType.DECIMAL,
+            const.DISC_GENRE: ValueGenre.USER,
+        },
+        "battery": {
+            const.DISC_COMMAND_CLASS: [CommandClass.BATTERY],
+            const.DISC_INDEX: [0],
+            const.DISC_INSTANCE: [1, 2],
+            const.DISC_OPTIONAL: True,
+        },
+    },
+}
+
+
+def mock_node(node_id=5, generic=0x21):
+    """Return a mocked OZW node."""
+    return Mock(node_id=node_id, node_generic=generic, node_specific=1)
+
+
+def mock_value(command_class, index=0, instance=1, value_type=ValueType.DECIMAL):
+    """Return a mocked OZW value."""
+    value = Mock(index=index, instance=instance, type=value_type, genre=ValueGenre.USER)
+    value.parent.command_class_id = command_class
+    return value
+
+
+def test_compile_schema():
+    """Test a schema is compiled to immutable sets of the accepted values."""
+    schema = compile_schema(SCHEMA)
+    assert schema.component == "sensor"
+    assert schema.optional == {"battery"}
+    assert schema.node_schema == {const.DISC_GENERIC_DEVICE_CLASS: {0x21, 0x10}}
+    primary = schema.values[const.DISC_PRIMARY]
+    assert primary[const.DISC_TYPE] == frozenset([ValueType.DECIMAL])
+    assert isinstance(primary[const.DISC_COMMAND_CLASS], frozenset)
+
+    for mapping in (schema.node_schema, schema.values, primary):
+        with pytest.raises(TypeError):
+            mapping["extra"] = None
+    # the raw schema is left as it is
+    assert SCHEMA[const.DISC_VALUES]["battery"][const.DISC_INSTANCE] == [1, 2]
+
+
+def test_match_node_and_instance():
+    """Test the node id and instance of a values collection limit the matches."""
+    schema = compile_schema(SCHEMA)
+    assert match_node_schema(mock_node(), schema.node_schema)
+    assert match_node_schema(mock_node(), schema.node_schema, node_id=5)
+    assert not match_node_schema(mock_node(), schema.node_schema, node_id=6)
+    assert not match_node_schema(mock_node(generic=0x11), schema.node_schema)
+
+    battery = schema.values["battery"]
+    assert match_value_schema(mock_value(CommandClass.BATTERY, instance=2), battery)
+    assert not match_value_schema(mock_value(CommandClass.BATTERY, instance=3), battery)
+    assert get_value_schema_keys(battery) == {
+        (CommandClass.BATTERY, 0, 1),
+        (CommandClass.BATTERY, 0, 2),
+    }
+    # the instance of the primary value overrides the instances of the schema
+    assert get_value_schema_keys(battery, 2) == {(CommandClass.BATTERY, 0, 2)}
+    assert get_value_schema_keys(schema.values[const.DISC_PRIMARY]) == {
+        (CommandClass.SENSOR_MULTILEVEL, None, None)
+    }
+
+
+def test_schemas_shared():
+    """Test values of different nodes and instances match the same schema objects."""
+    first = get_matching_schemas(
+        mock_node(node_id=5), mock_value(CommandClass.SENSOR_MULTILEVEL, index=1)
+    )
+    second = get_matching_schemas(
+        mock_node(node_id=6),
+        mock_value(CommandClass.SENSOR_MULTILEVEL, index=1, instance=2),
+    )
+    assert first
+    assert len(first) == len(second)
+    for schema, other in zip(first, second):
+        assert schema is other
+        assert any(schema is compiled for compiled in COMPILED_SCHEMAS)
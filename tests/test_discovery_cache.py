@@ -0,0 +1,77 @@
+"""Test the discovery cache."""
+from asynctest import patch
+from custom_components.zwave_mqtt import DOMAIN
+from custom_components.zwave_mqtt.discovery import get_matching_schemas
+from custom_components.zwave_mqtt.discovery_cache import (
+    SCHEMAS_HASH,
+    DiscoveryCache,
+    get_node_fingerprint,
+    get_value_layout_key,
+)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from tests.common import ENTRY_ID, load_values
+
+FIXTURE = "generic_network_dump.csv"
+CACHE_KEY = f"{DOMAIN}.{ENTRY_ID}.discovery"
+
+
+async def test_plans_saved_and_restored(hass, hass_storage):
+    """Test plans give the same results as discovery and survive a restart."""
+    values = load_values(FIXTURE)
+    expected = [get_matching_schemas(value.node, value) for value in values]
+
+    cache = DiscoveryCache(hass, ENTRY_ID)
+    await cache.async_load()
+    assert [cache.get_matching_schemas(value.node, value) for value in values] == (
+        expected
+    )
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    data = hass_storage[CACHE_KEY]["data"]
+    assert data["schemas"] == SCHEMAS_HASH
+    assert get_node_fingerprint(values[0].node) in data["plans"]
+
+    # restored plans are used without matching the schemas again
+    cache = DiscoveryCache(hass, ENTRY_ID)
+    await cache.async_load()
+    with patch(
+        "custom_components.zwave_mqtt.discovery_cache.get_matching_schemas",
+        side_effect=AssertionError,
+    ):
+        assert [
+            cache.get_matching_schemas(value.node, value) for value in values
+        ] == expected
+
+
+async def test_schemas_changed(hass, hass_storage):
+    """Test plans of other discovery schemas are dropped."""
+    values = load_values(FIXTURE)
+    value = values[0]
+    expected = get_matching_schemas(value.node, value)
+    assert expected
+    fingerprint = get_node_fingerprint(value.node)
+    hass_storage[CACHE_KEY] = {
+        "version": 1,
+        "key": CACHE_KEY,
+        "data": {
+            "schemas": "outdated",
+            "plans": {
+                fingerprint: {
+                    "primary": {get_value_layout_key(value): []},
+                    "values": {},
+                }
+            },
+        },
+    }
+    cache = DiscoveryCache(hass, ENTRY_ID)
+    await cache.async_load()
+    assert cache.get_matching_schemas(value.node, value) == expected
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    data = hass_storage[CACHE_KEY]["data"]
+    assert data["schemas"] == SCHEMAS_HASH
+    assert data["plans"][fingerprint]["primary"][get_value_layout_key(value)]
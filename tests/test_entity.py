@@ -0,0 +1,170 @@
+"""Test the generic Z-Wave entity classes."""
+from unittest.mock import Mock
+
+from asynctest import patch
+from custom_components.zwave_mqtt.discovery import get_value_keys
+from custom_components.zwave_mqtt.entity import (
+    ZWaveNodeValues,
+    async_batch_add_entities,
+)
+
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from tests.common import get_fixture_messages, setup_zwave
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT = "light.led_bulb_6_multi_colour_level"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+COLOR_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/51/value/659341335/"
+COLOR_COMMAND_CLASS_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/51/"
+
+
+class MockValues:
+    """A values collection missing the values with the given keys."""
+
+    def __init__(self, values_id, missing_keys):
+        """Initialize the collection."""
+        self.values_id = values_id
+        self.missing_keys = set(missing_keys)
+        self.checked = []
+
+    def get_missing_value_keys(self):
+        """Return the keys of the missing values."""
+        return set(self.missing_keys)
+
+    def check_value(self, value):
+        """Take a value offered to the collection."""
+        self.checked.append(value)
+        self.missing_keys -= set(get_value_keys(value))
+
+
+def mock_value(command_class, index, instance=1):
+    """Return a mocked OZW value."""
+    value = Mock(index=index, instance=instance)
+    value.parent.command_class_id = command_class
+    return value
+
+
+def test_missing_values_wildcards():
+    """Test values are offered to the collections missing a value like them."""
+    node_values = ZWaveNodeValues()
+    any_instance = MockValues("1-2-1", {(51, 0, None)})
+    any_index = MockValues("1-2-2", {(38, None, 1)})
+    node_values.add(any_instance)
+    node_values.add(any_index)
+
+    other_command_class = mock_value(37, 0)
+    node_values.check_value(other_command_class)
+    assert any_instance.checked == any_index.checked == []
+
+    color = mock_value(51, 0, instance=2)
+    node_values.check_value(color)
+    assert any_instance.checked == [color]
+    assert any_index.checked == []
+
+    level = mock_value(38, 5)
+    node_values.check_value(level)
+    assert any_index.checked == [level]
+
+    # collections that got their values are no longer offered values
+    node_values.check_value(mock_value(51, 0))
+    node_values.check_value(mock_value(38, 0))
+    assert any_instance.checked == [color]
+    assert any_index.checked == [level]
+
+
+def test_missing_values_removed():
+    """Test a removed collection is no longer offered values, until it's added."""
+    node_values = ZWaveNodeValues()
+    values = MockValues("1-2-1", {(51, 0, 1), (51, 1, 1)})
+    node_values.add(values)
+    assert "1-2-1" in node_values
+
+    assert node_values.remove("1-2-1") is values
+    assert "1-2-1" not in node_values
+    node_values.check_value(mock_value(51, 0))
+    assert values.checked == []
+
+    # the primary value arrives again
+    values = MockValues("1-2-1", {(51, 0, 1), (51, 1, 1)})
+    node_values.add(values)
+    color = mock_value(51, 0)
+    node_values.check_value(color)
+    assert values.checked == [color]
+    # the collection is indexed by the value it's still missing
+    color_channels = mock_value(51, 1)
+    node_values.check_value(color_channels)
+    node_values.check_value(mock_value(51, 1))
+    assert values.checked == [color, color_channels]
+
+
+async def test_late_secondary_value(hass):
+    """Test a secondary value that arrives after the entity is created is added."""
+    receive_message = await setup_zwave(hass)
+    messages = get_fixture_messages(FIXTURE)
+    for topic, payload in messages:
+        if not topic.startswith(COLOR_COMMAND_CLASS_TOPIC):
+            receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+    entity = hass.data["light"].get_entity(LIGHT)
+    assert entity.values.color is None
+
+    for topic, payload in messages:
+        if topic.startswith(COLOR_COMMAND_CLASS_TOPIC):
+            receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+    assert entity.values.color.value_id_key == 659341335
+
+
+async def test_value_added_again(hass):
+    """Test the values of a primary value that is removed and added again."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    messages = dict(get_fixture_messages(FIXTURE))
+    receive_message(Mock(topic=COLOR_TOPIC, payload=""))
+    receive_message(Mock(topic=LIGHT_TOPIC, payload=""))
+    await hass.async_block_till_done()
+    assert hass.states.get(LIGHT) is None
+
+    # the light is added before its color value
+    receive_message(Mock(topic=LIGHT_TOPIC, payload=messages[LIGHT_TOPIC]))
+    await hass.async_block_till_done()
+    entity = hass.data["light"].get_entity(LIGHT)
+    assert entity.values.color is None
+
+    receive_message(Mock(topic=COLOR_TOPIC, payload=messages[COLOR_TOPIC]))
+    await hass.async_block_till_done()
+    assert entity.values.color.value_id_key == 659341335
+
+
+async def test_batch_add_entities(hass):
+    """Test the entities created in one event loop iteration are added together."""
+    added = []
+    batch_add_entities = async_batch_add_entities(hass, added.append)
+
+    batch_add_entities(["switch 1"])
+    batch_add_entities([])
+    batch_add_entities(["switch 2", "switch 3"])
+    assert added == []
+    await hass.async_block_till_done()
+    assert added == [["switch 1", "switch 2", "switch 3"]]
+
+    batch_add_entities(["switch 4"])
+    await hass.async_block_till_done()
+    assert added == [["switch 1", "switch 2", "switch 3"], ["switch 4"]]
+
+
+async def test_platform_adds_entities_once(hass):
+    """Test the entities of a network replay are added in one call per platform."""
+    schedule_add_entities = EntityPlatform._async_schedule_add_entities
+    calls = []
+
+    def count_calls(platform, new_entities, update_before_add=False):
+        calls.append((platform.domain, len(new_entities)))
+        schedule_add_entities(platform, new_entities, update_before_add)
+
+    with patch.object(EntityPlatform, "_async_schedule_add_entities", count_calls):
+        await setup_zwave(hass, FIXTURE)
+
+    domains = [domain for domain, _ in calls]
+    assert sorted(domains) == ["binary_sensor", "light", "sensor", "switch"]
+    assert dict(calls)["sensor"] > 1
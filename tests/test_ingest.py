@@ -0,0 +1,163 @@
+"""Test the queue of received messages."""
+import asyncio
+
+from custom_components.zwave_mqtt import const
+from custom_components.zwave_mqtt.ingest import (
+    MessageQueue,
+    get_message_priority,
+    is_mergeable,
+)
+from custom_components.zwave_mqtt.topic import parse_topic
+
+METER_TOPIC = parse_topic(
+    "OpenZWave/1/node/39/instance/1/commandclass/50/value/562950622511154/"
+)
+SCENE_TOPIC = parse_topic(
+    "OpenZWave/1/node/39/instance/1/commandclass/91/value/281475634790417/"
+)
+SWITCH_TOPIC = parse_topic(
+    "OpenZWave/1/node/32/instance/1/commandclass/37/value/541671440/"
+)
+EVENT_TOPIC = parse_topic("OpenZWave/1/event/removenode/")
+
+
+def test_is_mergeable():
+    """Test only state messages can be merged."""
+    assert is_mergeable(METER_TOPIC)
+    assert is_mergeable(parse_topic("OpenZWave/1/node/39/"))
+    assert not is_mergeable(SCENE_TOPIC)
+    assert not is_mergeable(EVENT_TOPIC)
+
+
+def test_get_message_priority():
+    """Test messages are classified by topic and command class."""
+    assert get_message_priority(SCENE_TOPIC) == const.PRIORITY_INTERACTIVE
+    assert get_message_priority(SWITCH_TOPIC) == const.PRIORITY_INTERACTIVE
+    assert get_message_priority(EVENT_TOPIC) == const.PRIORITY_INTERACTIVE
+    assert (
+        get_message_priority(parse_topic("OpenZWave/1/node/39/"))
+        == const.PRIORITY_DEFAULT
+    )
+    assert get_message_priority(METER_TOPIC) == const.PRIORITY_BACKGROUND
+
+
+async def test_latest_wins(hass):
+    """Test a newer message replaces a queued message on the same topic."""
+    processed = []
+    queue = MessageQueue(hass, lambda topic, payload: processed.append(payload))
+
+    queue.async_put(METER_TOPIC, "1")
+    queue.async_put(SCENE_TOPIC, "scene 1")
+    queue.async_put(SCENE_TOPIC, "scene 2")
+    queue.async_put(EVENT_TOPIC, "removenode")
+    queue.async_put(METER_TOPIC, "2")
+    assert processed == []
+
+    await hass.async_block_till_done()
+    assert processed == ["scene 1", "scene 2", "removenode", "2"]
+    stats = queue.get_statistics()
+    assert stats["queued"] == 0
+    assert stats["high_water_mark"] == 4
+    assert stats["merged"] == 1
+    assert stats[const.PRIORITY_INTERACTIVE]["processed"] == 3
+    assert stats[const.PRIORITY_BACKGROUND]["processed"] == 1
+
+
+async def test_removed_item(hass):
+    """Test queued messages of the children of a removed item are dropped."""
+    processed = []
+    queue = MessageQueue(hass, lambda topic, payload: processed.append(topic.topic))
+
+    queue.async_put(METER_TOPIC, "1")
+    queue.async_put(parse_topic("OpenZWave/1/node/3/"), "node 3")
+    queue.async_put(parse_topic("OpenZWave/1/node/39/"), "")
+    await hass.async_block_till_done()
+    assert processed == ["OpenZWave/1/node/3/", "OpenZWave/1/node/39/"]
+    assert queue.get_statistics()["merged"] == 1
+
+
+async def test_removal_barrier(hass):
+    """Test messages received after a removal are processed after it."""
+    processed = []
+    queue = MessageQueue(hass, lambda topic, payload: processed.append(payload))
+
+    queue.async_put(SWITCH_TOPIC, "on")
+    queue.async_put(parse_topic("OpenZWave/1/node/32/"), "")
+    queue.async_put(parse_topic("OpenZWave/1/node/32/"), "node 32")
+    queue.async_put(SWITCH_TOPIC, "off")
+    await hass.async_block_till_done()
+    # the switch of the node added again waits for the removal
+    assert processed == ["", "node 32", "off"]
+    assert queue.get_statistics()["merged"] == 1
+
+
+async def test_priorities(hass):
+    """Test scenes and switches overtake telemetry without starving it."""
+    processed = []
+    queue = MessageQueue(
+        hass, lambda topic, payload: processed.append(payload), starvation_limit=2
+    )
+
+    for node_id in range(4):
+        queue.async_put(
+            parse_topic(
+                f"OpenZWave/1/node/{node_id}/instance/1/commandclass/50/value/1/"
+            ),
+            "meter",
+        )
+    queue.async_put(
+        parse_topic("OpenZWave/1/node/39/instance/1/commandclass/48/value/1/"), "door"
+    )
+    for index in range(4):
+        queue.async_put(SWITCH_TOPIC, str(index))
+        queue.async_put(SCENE_TOPIC, "scene")
+
+    await hass.async_block_till_done()
+    # lower priorities get a turn after being passed over twice
+    assert processed == [
+        "scene",
+        "scene",
+        "door",
+        "meter",
+        "scene",
+        "3",
+        "meter",
+        "scene",
+        "meter",
+        "meter",
+    ]
+
+
+async def test_time_slices(hass):
+    """Test the queue yields to the event loop between time slices."""
+    processed = []
+    queue = MessageQueue(
+        hass, lambda topic, payload: processed.append(payload), time_slice=0
+    )
+
+    for index in range(3):
+        queue.async_put(parse_topic(f"OpenZWave/1/node/{index}/"), str(index))
+    await asyncio.sleep(0)
+    assert processed == ["0"]
+
+    await hass.async_block_till_done()
+    assert processed == ["0", "1", "2"]
+
+
+async def test_full_queue(hass):
+    """Test a time slice of a full queue is processed right away."""
+    processed = []
+    queue = MessageQueue(
+        hass, lambda topic, payload: processed.append(payload), max_size=2, time_slice=0
+    )
+
+    queue.async_put(parse_topic("OpenZWave/1/node/1/"), "1")
+    assert processed == []
+    queue.async_put(parse_topic("OpenZWave/1/node/2/"), "2")
+    assert processed == ["1"]
+    queue.async_put(parse_topic("OpenZWave/1/node/3/"), "3")
+    assert processed == ["1", "2"]
+
+    queue.async_stop()
+    await hass.async_block_till_done()
+    assert processed == ["1", "2"]
@@ -1,19 +1,47 @@
 """Test integration initialization."""
+from datetime import timedelta
+import json
+from unittest.mock import Mock
 
-from custom_components.zwave_mqtt import DOMAIN, PLATFORMS, const
+from asynctest import patch
+from custom_components.zwave_mqtt import DOMAIN, const
+from custom_components.zwave_mqtt.entity import PlatformDispatcher
 
-from tests.common import setup_zwave
+from homeassistant.const import ATTR_NOW, EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+import homeassistant.util.dt as dt_util
+
+from tests.common import (
+    ENTRY_ID,
+    get_fixture_messages,
+    get_fixture_payload,
+    setup_zwave,
+    value_changed_message,
+)
+
+FIXTURE = "generic_network_dump.csv"
+SNAPSHOT_KEY = f"{DOMAIN}.{ENTRY_ID}.snapshot"
+
+STATUS_TOPIC = "OpenZWave/1/status/"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
 
 
 async def test_init_entry(hass):
     """Test setting up config entry."""
     await setup_zwave(hass, "generic_network_dump.csv")
 
-    # Verify integration + platform loaded.
+    # Verify integration + the platforms of the discovered entities loaded.
     assert "zwave_mqtt" in hass.config.components
-    for platform in PLATFORMS:
+    for platform in ("binary_sensor", "light", "sensor", "switch"):
         assert platform in hass.config.components, platform
         assert f"{platform}.{DOMAIN}" in hass.config.components, f"{platform}.{DOMAIN}"
+    for platform in ("climate", "cover", "fan"):
+        assert f"{platform}.{DOMAIN}" not in hass.config.components, platform
+
+    # Only the platforms that are set up are unloaded
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert entry.entry_id not in hass.data[DOMAIN]
 
     # Verify services registered
     assert hass.services.has_service(DOMAIN, const.SERVICE_ADD_NODE)
@@ -22,3 +50,189 @@ async def test_init_entry(hass):
     assert hass.services.has_service(DOMAIN, const.SERVICE_REPLACE_FAILED_NODE)
     assert hass.services.has_service(DOMAIN, const.SERVICE_CANCEL_COMMAND)
     assert hass.services.has_service(DOMAIN, const.SERVICE_SET_CONFIG_PARAMETER)
+
+
+async def test_ingest_after_daemon_restart(hass):
+    """Test entity updates are held back while the daemon publishes the network."""
+    fixture = "generic_network_dump.csv"
+    receive_message = await setup_zwave(hass, fixture)
+    status = get_fixture_payload(fixture, STATUS_TOPIC)
+    light_value = get_fixture_payload(fixture, LIGHT_TOPIC)
+
+    # Daemon restarts
+    status["Status"] = "driverReady"
+    receive_message(Mock(topic=STATUS_TOPIC, payload=json.dumps(status)))
+    await hass.async_block_till_done()
+    state = hass.states.get("light.led_bulb_6_multi_colour_level")
+    assert state.state == "unavailable"
+
+    # Value is (re)published, entity is not updated yet
+    light_value["Value"] = 99
+    light_value["Event"] = "valueChanged"
+    receive_message(Mock(topic=LIGHT_TOPIC, payload=json.dumps(light_value)))
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level") is state
+
+    # All nodes queried, entities are updated
+    status["Status"] = "driverAllNodesQueried"
+    receive_message(Mock(topic=STATUS_TOPIC, payload=json.dumps(status)))
+    await hass.async_block_till_done()
+    state = hass.states.get("light.led_bulb_6_multi_colour_level")
+    assert state.state == "on"
+
+
+async def test_snapshot_saved(hass, hass_storage):
+    """Test the snapshot of the network is saved when Home Assistant stops."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    assert SNAPSHOT_KEY not in hass_storage
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    # the status of the daemon and the time stamps are not stored
+    saved = hass_storage[SNAPSHOT_KEY]["data"]["messages"]
+    assert STATUS_TOPIC not in saved
+    messages = dict(get_fixture_messages(FIXTURE))
+    del messages[STATUS_TOPIC]
+    assert set(saved) == set(messages)
+    for topic, payload in messages.items():
+        payload = json.loads(payload)
+        payload.pop("TimeStamp", None)
+        assert json.loads(saved[topic]) == payload
+        assert "TimeStamp" not in saved[topic]
+
+    # a report that only changes the time stamp doesn't change the snapshot
+    snapshot = dict(saved)
+    payload = messages[LIGHT_TOPIC].replace(
+        '"TimeStamp": 1579566891', '"TimeStamp": 1579566951'
+    )
+    assert payload != messages[LIGHT_TOPIC]
+    receive_message(Mock(topic=LIGHT_TOPIC, payload=payload))
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    assert hass_storage[SNAPSHOT_KEY]["data"]["messages"] == snapshot
+
+
+async def test_snapshot_restored(hass, hass_storage):
+    """Test entities are restored from the snapshot before the daemon publishes."""
+    hass_storage[SNAPSHOT_KEY] = {
+        "version": 1,
+        "data": {"messages": dict(get_fixture_messages(FIXTURE))},
+    }
+    receive_message = await setup_zwave(hass)
+    # the restored entities are unavailable until the daemon is live
+    state = hass.states.get("light.led_bulb_6_multi_colour_level")
+    assert state is not None
+    assert state.state == "unavailable"
+
+    # The daemon no longer publishes the light, it's removed after a while
+    for topic, payload in get_fixture_messages(FIXTURE):
+        if topic != LIGHT_TOPIC:
+            receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level") is not None
+    assert hass.states.get("switch.smart_plug_switch").state == "off"
+
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED,
+        {
+            ATTR_NOW: dt_util.utcnow()
+            + timedelta(seconds=const.SNAPSHOT_RECONCILE_DELAY + 1)
+        },
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level") is None
+    assert hass.states.get("switch.smart_plug_switch") is not None
+
+
+async def test_node_removed(hass):
+    """Test all entities of a node are removed when the node is removed."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    assert hass.states.get("light.led_bulb_6_multi_colour_level") is not None
+
+    receive_message(Mock(topic="OpenZWave/1/node/39/", payload=""))
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level") is None
+    assert hass.states.get("switch.smart_plug_switch") is not None
+
+
+async def test_discovery_before_platform_loaded(hass):
+    """Test entities discovered before their platform is set up are sent later."""
+    entry = Mock()
+    platforms = PlatformDispatcher(hass, entry)
+    discovered = []
+    async_dispatcher_connect(hass, "zwave_new_light", discovered.append)
+
+    with patch.object(hass.config_entries, "async_forward_entry_setup") as setup:
+        platforms.async_send("light", "light 1")
+        platforms.async_send("light", "light 2")
+        platforms.async_discard("light 2")
+    assert discovered == []
+    # the platform is set up once
+    setup.assert_called_once_with(entry, "light")
+
+    platforms.async_platform_loaded("light")
+    assert discovered == ["light 1"]
+    platforms.async_send("light", "light 3")
+    assert discovered == ["light 1", "light 3"]
+
+
+async def test_platforms_set_up_on_discovery(hass):
+    """Test a platform is set up once, when its first entity is discovered."""
+    node_39 = "OpenZWave/1/node/39/"
+    messages = get_fixture_messages(FIXTURE)
+    with patch.object(hass.config_entries, "async_forward_entry_setup") as setup:
+        receive_message = await setup_zwave(hass)
+        for topic, payload in messages:
+            if not topic.startswith(node_39):
+                receive_message(Mock(topic=topic, payload=payload))
+        await hass.async_block_till_done()
+        platforms = [call[1][1] for call in setup.mock_calls]
+        assert "switch" in platforms
+        assert "light" not in platforms
+
+        for topic, payload in messages:
+            if topic.startswith(node_39):
+                receive_message(Mock(topic=topic, payload=payload))
+        await hass.async_block_till_done()
+    # every platform is set up once, climate, cover and fan are not set up
+    platforms = [call[1][1] for call in setup.mock_calls]
+    assert sorted(platforms) == ["binary_sensor", "light", "sensor", "switch"]
+
+
+async def test_messages_received_while_platforms_load(hass):
+    """Test messages are processed while the platforms are being set up."""
+    with patch.object(hass.config_entries, "async_forward_entry_setup") as setup:
+        receive_message = await setup_zwave(hass, FIXTURE)
+        receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 99))
+        await hass.async_block_till_done()
+    # subscribed and ingested before any platform is set up
+    assert setup.called
+    assert hass.states.async_all() == []
+
+    # the light discovered in the meantime is added when its platform is loaded
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    await hass.config_entries.async_forward_entry_setup(entry, "light")
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level").state == "on"
+    assert hass.states.get("switch.smart_plug_switch") is None
+
+
+async def test_ingest_ends_on_status(hass):
+    """Test entity updates resume when the status arrives after all nodes."""
+    receive_message = await setup_zwave(hass)
+    for topic, payload in get_fixture_messages(FIXTURE):
+        if topic != STATUS_TOPIC:
+            receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+    receive_message(
+        Mock(
+            topic=STATUS_TOPIC,
+            payload=dict(get_fixture_messages(FIXTURE))[STATUS_TOPIC],
+        )
+    )
+    await hass.async_block_till_done()
+
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 99))
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level").state == "on"
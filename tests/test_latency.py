@@ -0,0 +1,94 @@
+"""Test the latency histograms of the processing of messages."""
+import time
+from unittest.mock import Mock
+
+from custom_components.zwave_mqtt.latency import (
+    STAGE_END_TO_END,
+    Histogram,
+    LatencyTracker,
+)
+from custom_components.zwave_mqtt.topic import parse_topic
+
+from tests.common import setup_zwave, value_changed_message
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+
+
+def test_histogram():
+    """Test the percentiles are the upper bounds of the buckets."""
+    histogram = Histogram()
+    assert histogram.get_statistics()["p99"] == 0.0
+
+    for _ in range(90):
+        histogram.add(0.0004)
+    for _ in range(9):
+        histogram.add(0.02)
+    histogram.add(30)
+
+    stats = histogram.get_statistics()
+    assert stats["count"] == 100
+    assert stats["max"] == 30
+    assert stats["p50"] == 0.0005
+    assert stats["p95"] == 0.025
+    # the overflow bucket reports the maximum
+    assert stats["p99"] == 0.025
+    histogram.add(30)
+    assert histogram.get_statistics()["p99"] == 30
+
+
+def test_reports_without_state_write():
+    """Test reports that don't reach the entity of their value are not kept."""
+    tracker = LatencyTracker()
+    topic = parse_topic(LIGHT_TOPIC)
+    value = Mock(value_id_key=659128337, command_class=38)
+    value.ozw_instance.id = 1
+
+    # a report of a value that isn't the primary value of an entity
+    tracker.async_message_received(topic, time.perf_counter())
+    tracker.async_message_processed(topic, time.perf_counter())
+    tracker.async_state_written(value, time.perf_counter())
+    assert STAGE_END_TO_END not in tracker.get_statistics()
+
+    tracker.async_message_received(topic, time.perf_counter())
+    tracker.async_value_dispatched(value)
+    tracker.async_message_processed(topic, time.perf_counter())
+    tracker.async_state_written(value, time.perf_counter())
+    assert tracker.get_statistics()[STAGE_END_TO_END]["total"]["count"] == 1
+
+
+async def test_stages(hass, caplog):
+    """Test the stages from receiving a value report to the state write."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    assert hass.states.get("light.led_bulb_6_multi_colour_level").state == "off"
+
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 50))
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level").state == "on"
+
+    await hass.services.async_call("zwave_mqtt", "print_statistics", blocking=True)
+    record = next(
+        record
+        for record in caplog.records
+        if record.getMessage().startswith("Latency statistics")
+    )
+    # a single dict argument becomes the args of the record
+    stats = record.args
+    assert set(stats) == {
+        "receive",
+        "process",
+        "fan_out",
+        "discovery",
+        "state_write",
+        "end_to_end",
+    }
+    # every message of the dump and the report
+    num_messages = stats["receive"]["total"]["count"]
+    assert num_messages > 100
+    assert stats["process"]["total"]["count"] == num_messages
+    assert stats["fan_out"]["command_classes"]["SWITCH_MULTILEVEL"]["count"] == 1
+
+    end_to_end = stats["end_to_end"]["command_classes"]["SWITCH_MULTILEVEL"]
+    assert end_to_end["count"] == 1
+    assert 0 < end_to_end["p50"] <= end_to_end["p99"]
+    assert end_to_end["max"] >= stats["state_write"]["total"]["max"] > 0
@@ -1,12 +1,25 @@
 """Test Z-Wave Lights."""
+import asyncio
+import json
+from unittest.mock import Mock
+
 from custom_components.zwave_mqtt.light import byte_to_zwave_brightness
 
-from tests.common import setup_zwave
+from tests.common import (
+    async_capture_events,
+    async_wait_for_messages,
+    get_fixture_payload,
+    setup_zwave,
+    value_changed_message,
+)
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
 
 
 async def test_light(hass, sent_messages):
     """Test setting up config entry."""
-    await setup_zwave(hass, "generic_network_dump.csv")
+    receive_message = await setup_zwave(hass, FIXTURE)
 
     # Test loaded
     state = hass.states.get("light.led_bulb_6_multi_colour_level")
@@ -15,15 +28,18 @@ async def test_light(hass, sent_messages):
 
     # Test turning on
     new_brightness = 45
-    await hass.services.async_call(
-        "light",
-        "turn_on",
-        {
-            "entity_id": "light.led_bulb_6_multi_colour_level",
-            "brightness": new_brightness,
-        },
-        blocking=True,
+    call = hass.async_create_task(
+        hass.services.async_call(
+            "light",
+            "turn_on",
+            {
+                "entity_id": "light.led_bulb_6_multi_colour_level",
+                "brightness": new_brightness,
+            },
+            blocking=True,
+        )
     )
+    await async_wait_for_messages(sent_messages, 1)
     assert len(sent_messages) == 1
     msg = sent_messages[0]
     assert msg["topic"] == "OpenZWave/1/command/setvalue/"
@@ -32,14 +48,89 @@ async def test_light(hass, sent_messages):
         "ValueIDKey": 659128337,
     }
 
+    # Dimmers may report intermediate levels before reaching the new level
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 5))
+    await asyncio.sleep(0)
+    assert not call.done()
+    receive_message(
+        value_changed_message(
+            FIXTURE, LIGHT_TOPIC, byte_to_zwave_brightness(new_brightness)
+        )
+    )
+    await call
+
     # Test turning off
-    await hass.services.async_call(
-        "light",
-        "turn_off",
-        {"entity_id": "light.led_bulb_6_multi_colour_level"},
-        blocking=True,
+    call = hass.async_create_task(
+        hass.services.async_call(
+            "light",
+            "turn_off",
+            {"entity_id": "light.led_bulb_6_multi_colour_level"},
+            blocking=True,
+        )
     )
+    await async_wait_for_messages(sent_messages, 2)
     assert len(sent_messages) == 2
     msg = sent_messages[1]
     assert msg["topic"] == "OpenZWave/1/command/setvalue/"
     assert msg["payload"] == {"Value": 0, "ValueIDKey": 659128337}
+
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 0))
+    await call
+    await hass.async_block_till_done()
+    assert hass.states.get("light.led_bulb_6_multi_colour_level").state == "off"
+
+    # Test value changed
+    receive_message(
+        Mock(
+            topic="OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/",
+            payload=json.dumps(
+                {
+                    "Label": "Level",
+                    "Value": 99,
+                    "Units": "",
+                    "Min": 0,
+                    "Max": 255,
+                    "Type": "Byte",
+                    "Instance": 1,
+                    "CommandClass": "COMMAND_CLASS_SWITCH_MULTILEVEL",
+                    "Index": 0,
+                    "Node": 39,
+                    "Genre": "User",
+                    "Help": "The Current Level of the Device",
+                    "ValueIDKey": 659128337,
+                    "ReadOnly": False,
+                    "WriteOnly": False,
+                    "ValueSet": False,
+                    "ValuePolled": False,
+                    "ChangeVerified": False,
+                    "Event": "valueChanged",
+                    "TimeStamp": 1579566891,
+                }
+            ),
+        )
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("light.led_bulb_6_multi_colour_level")
+    assert state is not None
+    assert state.state == "on"
+    assert state.attributes["brightness"] == 255
+
+
+async def test_light_coalesce_updates(hass):
+    """Test a burst of value changes results in a single state update."""
+    fixture = "generic_network_dump.csv"
+    receive_message = await setup_zwave(hass, fixture)
+    events = async_capture_events(hass, "state_changed")
+    light_value = get_fixture_payload(fixture, LIGHT_TOPIC)
+    light_value["Event"] = "valueChanged"
+
+    for level in (10, 50, 99):
+        light_value["Value"] = level
+        receive_message(Mock(topic=LIGHT_TOPIC, payload=json.dumps(light_value)))
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    state = hass.states.get("light.led_bulb_6_multi_colour_level")
+    assert state.state == "on"
+    assert state.attributes["brightness"] == 255
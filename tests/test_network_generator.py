@@ -0,0 +1,26 @@
+"""Test the generator of synthetic networks used by the benchmarks."""
+import logging
+from unittest.mock import Mock
+
+from tests.benchmarks.network import generate_network
+from tests.common import setup_zwave
+
+
+async def test_generated_network(hass, caplog):
+    """Test the entities of every node of a generated network are created."""
+    receive_message = await setup_zwave(hass)
+    for topic, payload in generate_network(30):
+        receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+
+    states = hass.states.async_all()
+    domains = {state.domain for state in states}
+    assert domains == {"binary_sensor", "climate", "light", "sensor", "switch"}
+    state = hass.states.get("climate.thermostat_1_12_mode")
+    assert state.state == "heat"
+    assert state.attributes["temperature"] == 20.5
+    # node id 1 is the controller
+    node_ids = {state.attributes.get("node_id") for state in states}
+    assert node_ids >= set(range(2, 32))
+    # no entity failed to be created from a generated value
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
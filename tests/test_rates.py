@@ -0,0 +1,78 @@
+"""Test the message rates per node and per value."""
+from custom_components.zwave_mqtt import DOMAIN, const
+from custom_components.zwave_mqtt.rates import HeavyHitters
+
+from homeassistant.const import ATTR_NOW, EVENT_TIME_CHANGED
+import homeassistant.util.dt as dt_util
+
+from tests.common import setup_zwave, value_changed_message
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+
+
+def test_heavy_hitters():
+    """Test a new key replaces the key with the lowest count, when full."""
+    counters = HeavyHitters(2)
+    for _ in range(5):
+        counters.add("meter", 100)
+    for _ in range(3):
+        counters.add("motion", 10)
+    assert counters.top(2) == [("meter", 5, 500, 0), ("motion", 3, 30, 0)]
+
+    counters.add("door", 20)
+    assert counters.top(2) == [("meter", 5, 500, 0), ("door", 4, 50, 3)]
+    assert counters.top(1) == [("meter", 5, 500, 0)]
+
+
+async def test_message_rates(hass, caplog):
+    """Test the chattiest node and value are reported, per window."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    for level in range(30):
+        receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, level))
+    await hass.async_block_till_done()
+
+    async def async_get_rates():
+        caplog.clear()
+        await hass.services.async_call(
+            DOMAIN,
+            const.SERVICE_PRINT_MESSAGE_RATES,
+            {const.ATTR_COUNT: 1},
+            blocking=True,
+        )
+        # a single dict argument becomes the args of the record
+        return next(
+            record.args
+            for record in caplog.records
+            if record.getMessage().startswith("Message rates")
+        )
+
+    rates = await async_get_rates()
+    assert rates["last_window"] is None
+    window = rates["current_window"]
+    assert len(window["nodes"]) == 1
+    assert window["nodes"][0]["node_id"] == 39
+    assert window["nodes"][0]["messages"] > 30
+    assert window["values"] == [
+        {
+            "instance_id": 1,
+            "node_id": 39,
+            "value_id_key": 659128337,
+            "command_class": "SWITCH_MULTILEVEL",
+            "messages": 31,
+            "bytes": window["values"][0]["bytes"],
+            "error": 0,
+            "messages_per_minute": window["values"][0]["messages_per_minute"],
+            "bytes_per_minute": window["values"][0]["bytes_per_minute"],
+        }
+    ]
+    assert window["values"][0]["bytes"] > 31 * 100
+
+    # the counts start over in the next window
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow() + const.RATES_WINDOW}
+    )
+    await hass.async_block_till_done()
+    rates = await async_get_rates()
+    assert rates["current_window"]["nodes"] == []
+    assert rates["last_window"]["values"][0]["messages"] == 31
@@ -0,0 +1,69 @@
+"""Test the recording of the MQTT traffic."""
+from unittest.mock import Mock
+
+from custom_components.zwave_mqtt import DOMAIN, const
+from custom_components.zwave_mqtt.recorder import RECEIVED, SENT, read_recording
+
+from tests.common import (
+    async_wait_for_messages,
+    get_fixture_messages,
+    setup_zwave,
+    value_changed_message,
+)
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+
+
+async def test_recording(hass, sent_messages, tmp_path):
+    """Test received and sent messages are recorded until the recording stops."""
+    path = tmp_path / "traffic.jsonl.gz"
+    hass.config.whitelist_external_dirs = {str(tmp_path)}
+    receive_message = await setup_zwave(hass)
+    await hass.services.async_call(
+        DOMAIN,
+        const.SERVICE_START_RECORDING,
+        {const.ATTR_FILENAME: str(path)},
+        blocking=True,
+    )
+    for topic, payload in get_fixture_messages(FIXTURE):
+        receive_message(Mock(topic=topic, payload=payload))
+    await hass.async_block_till_done()
+
+    call = hass.async_create_task(
+        hass.services.async_call(
+            "light",
+            "turn_on",
+            {"entity_id": "light.led_bulb_6_multi_colour_level"},
+            blocking=True,
+        )
+    )
+    await async_wait_for_messages(sent_messages, 1)
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 255))
+    await call
+
+    await hass.services.async_call(DOMAIN, const.SERVICE_STOP_RECORDING, blocking=True)
+    await hass.async_block_till_done()
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 0))
+    await hass.async_block_till_done()
+
+    records = list(read_recording(path))
+    assert [record[2:] for record in records[:-2]] == get_fixture_messages(FIXTURE)
+    assert all(record[1] == RECEIVED for record in records[:-2])
+    assert records[-2][1:3] == (SENT, "OpenZWave/1/command/setvalue/")
+    assert records[-1][1:3] == (RECEIVED, LIGHT_TOPIC)
+    assert records[0][0] <= records[-1][0]
+
+
+async def test_recording_path_not_allowed(hass, caplog, tmp_path):
+    """Test the recording is not started outside the allowed directories."""
+    await setup_zwave(hass)
+    for filename in ("../traffic.jsonl.gz", str(tmp_path / "traffic.jsonl.gz")):
+        await hass.services.async_call(
+            DOMAIN,
+            const.SERVICE_START_RECORDING,
+            {const.ATTR_FILENAME: filename},
+            blocking=True,
+        )
+        assert f"Not allowed to write to {filename}" in caplog.text
+    assert "Recording the MQTT traffic" not in caplog.text
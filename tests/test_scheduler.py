@@ -0,0 +1,185 @@
+"""Test the Z-Wave command scheduler."""
+from custom_components.zwave_mqtt import const
+from custom_components.zwave_mqtt.scheduler import (
+    CommandScheduler,
+    get_node_id_from_value_id_key,
+)
+
+SETVALUE_TOPIC = "OpenZWave/1/command/setvalue/"
+SETVALUE_TOPIC_2 = "OpenZWave/2/command/setvalue/"
+# Switch on node 32, dimmer on node 39 and a configuration parameter of node 39
+SWITCH_VALUE_ID_KEY = 541671440
+DIMMER_VALUE_ID_KEY = 659128337
+CONFIG_VALUE_ID_KEY = DIMMER_VALUE_ID_KEY & ~(0xFF << 14) | (112 << 14)
+
+
+def setvalue(value_id_key, value):
+    """Return the payload of a setvalue command."""
+    return {"ValueIDKey": value_id_key, "Value": value}
+
+
+async def test_in_flight_budget(hass):
+    """Test commands wait for a free slot and are sent round robin."""
+    published = []
+    sent = []
+    scheduler = CommandScheduler(
+        hass,
+        lambda topic, payload: published.append(payload),
+        max_in_flight=1,
+        on_sent=lambda topic, payload: sent.append(payload),
+    )
+
+    for level in (10, 20, 30):
+        scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, level))
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(DIMMER_VALUE_ID_KEY, 99))
+    assert published == [setvalue(SWITCH_VALUE_ID_KEY, 10)]
+
+    stats = scheduler.get_statistics()
+    assert stats["in_flight"] == 1
+    assert stats[const.PRIORITY_INTERACTIVE]["queued"] == 3
+    assert stats[const.PRIORITY_INTERACTIVE]["queued_per_node"] == {
+        (1, 32): 2,
+        (1, 39): 1,
+    }
+
+    # reports of other nodes and other values don't free the slot
+    scheduler.async_value_reported(1, 39, DIMMER_VALUE_ID_KEY)
+    scheduler.async_value_reported(1, 32, SWITCH_VALUE_ID_KEY + 1)
+    scheduler.async_node_reported(1, 32)
+    assert len(published) == 1
+
+    # node 39 gets its turn before the next command of node 32
+    for value_id_key in (SWITCH_VALUE_ID_KEY, SWITCH_VALUE_ID_KEY, DIMMER_VALUE_ID_KEY):
+        scheduler.async_value_reported(
+            1, get_node_id_from_value_id_key(value_id_key), value_id_key
+        )
+    assert published == [
+        setvalue(SWITCH_VALUE_ID_KEY, 10),
+        setvalue(SWITCH_VALUE_ID_KEY, 20),
+        setvalue(DIMMER_VALUE_ID_KEY, 99),
+        setvalue(SWITCH_VALUE_ID_KEY, 30),
+    ]
+    assert scheduler.get_statistics()[const.PRIORITY_INTERACTIVE]["sent"] == 4
+    assert sent == published
+
+    scheduler.async_stop()
+    assert scheduler.get_statistics()["in_flight"] == 0
+
+
+async def test_priorities(hass):
+    """Test interactive commands are sent before background commands."""
+    published = []
+    scheduler = CommandScheduler(
+        hass, lambda topic, payload: published.append(payload), max_in_flight=1
+    )
+
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, True))
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(CONFIG_VALUE_ID_KEY, 1))
+    scheduler.async_send("OpenZWave/1/command/healnetworknode/", {"node": 32})
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, False))
+
+    stats = scheduler.get_statistics()
+    assert stats[const.PRIORITY_INTERACTIVE]["queued"] == 1
+    assert stats[const.PRIORITY_BACKGROUND]["queued"] == 2
+
+    scheduler.async_value_reported(1, 32, SWITCH_VALUE_ID_KEY)
+    scheduler.async_value_reported(1, 32, SWITCH_VALUE_ID_KEY)
+    scheduler.async_value_reported(1, 39, CONFIG_VALUE_ID_KEY)
+    assert published == [
+        setvalue(SWITCH_VALUE_ID_KEY, True),
+        setvalue(SWITCH_VALUE_ID_KEY, False),
+        setvalue(CONFIG_VALUE_ID_KEY, 1),
+        {"node": 32},
+    ]
+    # the info of the node completes the heal
+    scheduler.async_node_reported(1, 32)
+    assert scheduler.get_statistics()["in_flight"] == 0
+    scheduler.async_stop()
+
+
+async def test_starvation(hass):
+    """Test background commands get a turn while interactive commands keep coming."""
+    published = []
+    scheduler = CommandScheduler(
+        hass,
+        lambda topic, payload: published.append(payload),
+        max_in_flight=1,
+        starvation_limit=2,
+    )
+
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(CONFIG_VALUE_ID_KEY, 1))
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(CONFIG_VALUE_ID_KEY, 2))
+    for level in range(5):
+        scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, level))
+    assert published == [setvalue(CONFIG_VALUE_ID_KEY, 1)]
+
+    while scheduler.get_statistics()["in_flight"]:
+        payload = published[-1]
+        scheduler.async_value_reported(
+            1,
+            get_node_id_from_value_id_key(payload["ValueIDKey"]),
+            payload["ValueIDKey"],
+        )
+    assert [payload["Value"] for payload in published] == [1, 0, 1, 2, 2, 3, 4]
+    scheduler.async_stop()
+
+
+async def test_unreachable_nodes(hass):
+    """Test commands for sleeping nodes are published without taking a slot."""
+    published = []
+    sent = []
+    asleep = {39}
+    scheduler = CommandScheduler(
+        hass,
+        lambda topic, payload: published.append(payload),
+        max_in_flight=1,
+        on_sent=lambda topic, payload: sent.append(payload),
+        is_reachable=lambda instance_id, node_id: node_id not in asleep,
+    )
+
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, True))
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(DIMMER_VALUE_ID_KEY, 99))
+    assert published == [
+        setvalue(SWITCH_VALUE_ID_KEY, True),
+        setvalue(DIMMER_VALUE_ID_KEY, 99),
+    ]
+    assert sent == published
+    stats = scheduler.get_statistics()
+    assert stats["in_flight"] == 1
+    assert stats["unreachable"] == 1
+    scheduler.async_stop()
+
+
+async def test_instances(hass):
+    """Test the nodes of different OZW instances with the same node id are apart."""
+    published = []
+    scheduler = CommandScheduler(
+        hass, lambda topic, payload: published.append(topic), max_in_flight=1
+    )
+
+    scheduler.async_send(SETVALUE_TOPIC, setvalue(SWITCH_VALUE_ID_KEY, True))
+    scheduler.async_send(SETVALUE_TOPIC_2, setvalue(SWITCH_VALUE_ID_KEY, True))
+    stats = scheduler.get_statistics()
+    assert stats[const.PRIORITY_INTERACTIVE]["queued_per_node"] == {(2, 32): 1}
+
+    # a report of the node of the other instance doesn't free the slot
+    scheduler.async_value_reported(2, 32, SWITCH_VALUE_ID_KEY)
+    scheduler.async_node_reported(2, 32)
+    assert published == [SETVALUE_TOPIC]
+
+    scheduler.async_value_reported(1, 32, SWITCH_VALUE_ID_KEY)
+    assert published == [SETVALUE_TOPIC, SETVALUE_TOPIC_2]
+    scheduler.async_stop()
+
+
+async def test_controller_commands(hass):
+    """Test commands for the controller are not queued."""
+    published = []
+    scheduler = CommandScheduler(
+        hass, lambda topic, payload: published.append(payload), max_in_flight=0
+    )
+
+    scheduler.async_send("OpenZWave/1/command/addnode/", {"secure": False})
+    scheduler.async_send("OpenZWave/1/command/cancelcontrollercommand/", "")
+    assert published == [{"secure": False}, ""]
+    assert scheduler.get_statistics()["in_flight"] == 0
@@ -1,5 +1,17 @@
 """Test Z-Wave Sensors."""
-from tests.common import setup_zwave
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
+
+from custom_components.zwave_mqtt import DOMAIN, const
+
+from homeassistant.const import ATTR_NOW, EVENT_TIME_CHANGED
+import homeassistant.util.dt as dt_util
+
+from tests.common import setup_zwave, value_changed_message
+
+FIXTURE = "generic_network_dump.csv"
+POWER_TOPIC = "OpenZWave/1/node/32/instance/1/commandclass/50/value/562950495305746/"
+VOLTAGE_TOPIC = "OpenZWave/1/node/32/instance/1/commandclass/50/value/1125900448727058/"
 
 
 async def test_sensor(hass, sent_messages):
@@ -16,3 +28,147 @@ async def test_sensor(hass, sent_messages):
     state = hass.states.get("binary_sensor.trisensor_home_security_motion_detected")
     assert state is not None
     assert state.state == "off"
+
+
+async def test_sensor_throttle(hass, sent_messages):
+    """Test state writes of a sensor are held back by the throttle options."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            const.CONF_THROTTLE: {
+                const.THROTTLE_DEFAULT: {const.CONF_MIN_INTERVAL: 60},
+                "sensor.smart_plug_electric_v": {
+                    const.CONF_DELTA: 1,
+                    const.CONF_MAX_AGE: 300,
+                },
+            }
+        },
+    )
+
+    # changes below the delta are held back until they are too old
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.5))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.5"
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 125.2))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.5"
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 125.6))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "125.6"
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 125.9))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "125.6"
+
+    # other sensors use the default, a minimum interval
+    receive_message(value_changed_message(FIXTURE, POWER_TOPIC, 1.5))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_w").state == "1.5"
+    receive_message(value_changed_message(FIXTURE, POWER_TOPIC, 20.0))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_w").state == "1.5"
+
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow() + timedelta(seconds=61)}
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_w").state == "20.0"
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "125.6"
+
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow() + timedelta(seconds=301)}
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "125.9"
+
+
+async def test_sensor_throttle_delta_within_interval(hass, sent_messages):
+    """Test changes below the delta are not written when the interval passes."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            const.CONF_THROTTLE: {
+                "sensor.smart_plug_electric_v": {
+                    const.CONF_MIN_INTERVAL: 60,
+                    const.CONF_DELTA: 1,
+                }
+            }
+        },
+    )
+    entity = hass.data["sensor"].get_entity("sensor.smart_plug_electric_v")
+    state_writes = entity.values.context.state_writes
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.0))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.0"
+    written = state_writes["written"]
+
+    # reports faster than the interval, each below the delta
+    for voltage in (124.2, 124.4, 124.6, 124.3):
+        receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, voltage))
+        await hass.async_block_till_done()
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow() + timedelta(seconds=61)}
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.0"
+    assert state_writes["written"] == written
+
+    # a change above the delta is written once the interval passed
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 125.0))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.0"
+    hass.bus.async_fire(
+        EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow() + timedelta(seconds=122)}
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "125.0"
+    assert state_writes["written"] == written + 1
+
+
+async def test_unchanged_state_not_written(hass, sent_messages):
+    """Test a value reported again without change doesn't write the state."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    entity = hass.data["sensor"].get_entity("sensor.smart_plug_electric_v")
+    state_writes = entity.values.context.state_writes
+
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.5))
+    await hass.async_block_till_done()
+    written = state_writes["written"]
+    suppressed = state_writes["suppressed"]
+
+    with patch.object(
+        entity, "async_write_ha_state", wraps=entity.async_write_ha_state
+    ) as write_ha_state:
+        receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.5))
+        await hass.async_block_till_done()
+    assert not write_ha_state.called
+    assert state_writes["written"] == written
+    assert state_writes["suppressed"] == suppressed + 1
+
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.6))
+    await hass.async_block_till_done()
+    assert state_writes["written"] == written + 1
+    assert hass.states.get("sensor.smart_plug_electric_v").state == "124.6"
+
+
+async def test_changed_attribute_written(hass, sent_messages):
+    """Test a change of any attribute of the written state writes it."""
+    receive_message = await setup_zwave(hass, FIXTURE)
+    entity = hass.data["sensor"].get_entity("sensor.smart_plug_electric_v")
+    state_writes = entity.values.context.state_writes
+
+    receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.5))
+    await hass.async_block_till_done()
+    written = state_writes["written"]
+
+    with patch.object(
+        type(entity), "icon", new_callable=PropertyMock, return_value="mdi:flash"
+    ):
+        receive_message(value_changed_message(FIXTURE, VOLTAGE_TOPIC, 124.5))
+        await hass.async_block_till_done()
+    assert state_writes["written"] == written + 1
+    state = hass.states.get("sensor.smart_plug_electric_v")
+    assert state.attributes["icon"] == "mdi:flash"
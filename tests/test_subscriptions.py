@@ -0,0 +1,57 @@
+"""Test the MQTT subscriptions."""
+from custom_components.zwave_mqtt import DOMAIN, const
+from custom_components.zwave_mqtt.subscriptions import get_instance_topics
+
+from homeassistant.helpers.entity_registry import async_get_registry
+
+from tests.common import ENTRY_ID, setup_zwave
+
+SWITCH_TOPIC = "OpenZWave/1/node/32/instance/1/commandclass/37/value/541671440/"
+
+
+def test_get_instance_topics():
+    """Test optional topic families can be dropped."""
+    topics = get_instance_topics(1)
+    assert "OpenZWave/1/statistics/" in topics
+    assert "OpenZWave/1/node/+/association/#" in topics
+    assert not any("command" in topic for topic in topics)
+
+    topics = get_instance_topics(1, [const.TOPIC_FAMILY_STATISTICS])
+    assert not any("statistics" in topic for topic in topics)
+    assert "OpenZWave/1/node/+/association/#" in topics
+
+
+async def test_node_subscriptions(hass, mqtt_subscriptions):
+    """Test the values of every node get their own subscription."""
+    await setup_zwave(hass, fixture="generic_network_dump.csv")
+    topics = {call[0][1] for call in mqtt_subscriptions.call_args_list}
+    assert "OpenZWave/+/status/" in topics
+    assert "OpenZWave/1/node/32/instance/#" in topics
+    assert "OpenZWave/#" not in topics
+
+    # a node of which all entities are disabled only keeps its events
+    subscriptions = hass.data[DOMAIN][ENTRY_ID]["subscriptions"]
+    registry = await async_get_registry(hass)
+    entries = [
+        entry
+        for entry in registry.entities.values()
+        if entry.unique_id.startswith("1-32-")
+    ]
+    for entry in entries:
+        registry.async_update_entity(entry.entity_id, disabled_by="user")
+    await hass.async_block_till_done()
+    topics = {call[0][1] for call in mqtt_subscriptions.call_args_list}
+    assert "OpenZWave/1/node/32/instance/+/commandclass/91/#" in topics
+    assert subscriptions._nodes["1-32"][0] is True
+    assert subscriptions._nodes["1-39"][0] is False
+    assert not subscriptions.is_subscribed(SWITCH_TOPIC)
+    assert subscriptions.is_subscribed(
+        "OpenZWave/1/node/32/instance/1/commandclass/91/value/1/"
+    )
+    assert subscriptions.is_subscribed("OpenZWave/1/node/32/")
+
+    # all values are received again once an entity is enabled
+    registry.async_update_entity(entries[0].entity_id, disabled_by=None)
+    await hass.async_block_till_done()
+    assert subscriptions._nodes["1-32"][0] is False
+    assert subscriptions.is_subscribed(SWITCH_TOPIC)
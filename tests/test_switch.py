@@ -1,10 +1,13 @@
 """Test Z-Wave Switches."""
-from tests.common import setup_zwave
+from tests.common import async_wait_for_messages, setup_zwave, value_changed_message
+
+FIXTURE = "generic_network_dump.csv"
+SWITCH_TOPIC = "OpenZWave/1/node/32/instance/1/commandclass/37/value/541671440/"
 
 
 async def test_switch(hass, sent_messages):
     """Test setting up config entry."""
-    await setup_zwave(hass, "generic_network_dump.csv")
+    receive_message = await setup_zwave(hass, FIXTURE)
 
     # Test loaded
     state = hass.states.get("switch.smart_plug_switch")
@@ -12,19 +15,43 @@ async def test_switch(hass, sent_messages):
     assert state.state == "off"
 
     # Test turning on
-    await hass.services.async_call(
-        "switch", "turn_on", {"entity_id": "switch.smart_plug_switch"}, blocking=True
+    call = hass.async_create_task(
+        hass.services.async_call(
+            "switch",
+            "turn_on",
+            {"entity_id": "switch.smart_plug_switch"},
+            blocking=True,
+        )
     )
+    await async_wait_for_messages(sent_messages, 1)
     assert len(sent_messages) == 1
     msg = sent_messages[0]
     assert msg["topic"] == "OpenZWave/1/command/setvalue/"
     assert msg["payload"] == {"Value": True, "ValueIDKey": 541671440}
 
+    # The service call returns when the node confirms the new value
+    assert not call.done()
+    receive_message(value_changed_message(FIXTURE, SWITCH_TOPIC, True))
+    await call
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.smart_plug_switch").state == "on"
+
     # Test turning off
-    await hass.services.async_call(
-        "switch", "turn_off", {"entity_id": "switch.smart_plug_switch"}, blocking=True
+    call = hass.async_create_task(
+        hass.services.async_call(
+            "switch",
+            "turn_off",
+            {"entity_id": "switch.smart_plug_switch"},
+            blocking=True,
+        )
     )
+    await async_wait_for_messages(sent_messages, 2)
     assert len(sent_messages) == 2
     msg = sent_messages[1]
     assert msg["topic"] == "OpenZWave/1/command/setvalue/"
     assert msg["payload"] == {"Value": False, "ValueIDKey": 541671440}
+
+    receive_message(value_changed_message(FIXTURE, SWITCH_TOPIC, False))
+    await call
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.smart_plug_switch").state == "off"
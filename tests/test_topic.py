@@ -0,0 +1,19 @@
+"""Test the parsing of the topics of the OZW daemon."""
+from custom_components.zwave_mqtt.topic import parse_topic
+
+
+def test_parse_topic():
+    """Test the command class and ValueIDKey are parsed from value topics only."""
+    topic = parse_topic(
+        "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+    )
+    assert topic.parts[3] == "39"
+    assert topic.command_class == 38
+    assert topic.value_id_key == 659128337
+
+    topic = parse_topic("OpenZWave/1/node/39/instance/1/commandclass/38/")
+    assert (topic.command_class, topic.value_id_key) == (38, None)
+
+    topic = parse_topic("OpenZWave/1/status/")
+    assert topic.parts == ["OpenZWave", "1", "status", ""]
+    assert (topic.command_class, topic.value_id_key) == (None, None)
@@ -0,0 +1,66 @@
+"""Test the trace of the values."""
+import json
+import time
+
+from custom_components.zwave_mqtt import DOMAIN, const
+from custom_components.zwave_mqtt.trace import (
+    TRACE_VALUE_ADDED,
+    TRACE_VALUE_CHANGED,
+    TraceBuffer,
+)
+
+from tests.common import setup_zwave, value_changed_message
+
+FIXTURE = "generic_network_dump.csv"
+LIGHT_TOPIC = "OpenZWave/1/node/39/instance/1/commandclass/38/value/659128337/"
+
+
+def test_ring_buffer(hass):
+    """Test the oldest records are overwritten when the buffer is full."""
+    trace = TraceBuffer(hass, size=3)
+    assert trace.get_records() == []
+
+    for value_id_key in range(2):
+        trace.async_record(TRACE_VALUE_CHANGED, 2, value_id_key, time.perf_counter())
+    assert [record[3] for record in trace.get_records()] == [0, 1]
+
+    for value_id_key in range(2, 5):
+        trace.async_record(TRACE_VALUE_CHANGED, 2, value_id_key, time.perf_counter())
+    assert [record[3] for record in trace.get_records()] == [2, 3, 4]
+
+
+async def test_dump(hass, tmp_path):
+    """Test the trace of a dump and a value change is written to a file."""
+    path = tmp_path / "trace.jsonl"
+    hass.config.whitelist_external_dirs = {str(tmp_path)}
+    receive_message = await setup_zwave(hass, FIXTURE)
+    receive_message(value_changed_message(FIXTURE, LIGHT_TOPIC, 50))
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        const.SERVICE_DUMP_TRACE,
+        {const.ATTR_FILENAME: str(path)},
+        blocking=True,
+    )
+    with path.open("rt") as fp:
+        records = [json.loads(line) for line in fp]
+
+    assert records[0][1] == TRACE_VALUE_ADDED
+    assert records[-1][1:4] == [TRACE_VALUE_CHANGED, 39, 659128337]
+    assert records[-1][0] >= records[0][0] > time.time() - 60
+    assert all(record[4] >= 0 for record in records)
+
+
+async def test_dump_path_not_allowed(hass, caplog, tmp_path):
+    """Test the trace is not written outside the allowed directories."""
+    await setup_zwave(hass, FIXTURE)
+    path = tmp_path / "trace.jsonl"
+    await hass.services.async_call(
+        DOMAIN,
+        const.SERVICE_DUMP_TRACE,
+        {const.ATTR_FILENAME: str(path)},
+        blocking=True,
+    )
+    assert f"Not allowed to write to {path}" in caplog.text
+    assert not path.exists()